@@ -0,0 +1 @@
+"""Offline benchmarks that run the real bot code against fake Discord objects"""
@@ -0,0 +1,372 @@
+import asyncio
+import itertools
+import random
+from datetime import datetime, timezone
+
+import discord
+
+_ids = itertools.count(10_000_000_000)
+
+def next_id() -> int:
+    return next(_ids)
+
+class SimulatedREST:
+    """Stands in for the Discord API: every call sleeps for a jittered latency and is counted"""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 20.0, seed: int = None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class FakeAsset:
+    def __init__(self, object_id: int):
+        self.url = f"https://cdn.discordapp.com/avatars/{object_id}/benchmark.png"
+
+class FakeRole:
+    def __init__(self, guild, name: str, role_id: int = None):
+        self.id = role_id or next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeRole) and other.id == self.id
+
+class FakeUser:
+    def __init__(self, rest: SimulatedREST, name: str, user_id: int = None):
+        self.id = user_id or next_id()
+        self.rest = rest
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{self.id}>"
+        self.display_avatar = FakeAsset(self.id)
+        self.avatar = self.display_avatar
+        self.bot = False
+        self.created_at = datetime.now(timezone.utc)
+        self.dms = []
+
+    def __str__(self):
+        return self.name
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, 'id', None) == self.id
+
+    def mentioned_in(self, message) -> bool:
+        return message.mention_everyone or any(user.id == self.id for user in message.mentions)
+
+    async def send(self, content=None, **kwargs):
+        await self.rest.call()
+        message = FakeMessage(None, self, content, **kwargs)
+        self.dms.append(message)
+        return message
+
+class FakeMember(FakeUser):
+    def __init__(self, guild, name: str, roles=(), administrator: bool = False):
+        super().__init__(guild.rest, name)
+        self.guild = guild
+        self.roles = [guild.default_role, *roles]
+        self.guild_permissions = discord.Permissions(administrator=administrator)
+        self.joined_at = self.created_at
+        self.top_role = self.roles[-1]
+
+class FakeAttachment:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.url = f"https://cdn.discordapp.com/attachments/{next_id()}/{filename}"
+
+class FakeMessage:
+    def __init__(self, channel, author, content=None, embed=None, embeds=None, view=None, file=None, attachments=(), mentions=(), **kwargs):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = getattr(channel, 'guild', None)
+        self.author = author
+        self.content = content or ""
+        self.embeds = embeds or ([embed] if embed else [])
+        self.attachments = list(attachments)
+        self.view = view
+        self.file = file
+        self.mentions = list(mentions)
+        self.mention_everyone = False
+        self.reference = None
+        self.created_at = datetime.now(timezone.utc)
+
+    async def reply(self, content=None, mention_author=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def edit(self, **kwargs):
+        await self.channel.guild.rest.call()
+        if 'embed' in kwargs:
+            self.embeds = [kwargs['embed']]
+        if 'view' in kwargs:
+            self.view = kwargs['view']
+        return self
+
+    async def delete(self):
+        await self.channel.guild.rest.call()
+        self.channel.remove_message(self.id)
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, **kwargs):
+        message = self.channel.get_message(self.id)
+        if message is None:
+            await self.channel.guild.rest.call()
+            raise discord.NotFound(FakeHTTPResponse(404), "Unknown Message")
+        return await message.edit(**kwargs)
+
+class FakeHTTPResponse:
+    """Enough of an aiohttp response for discord.HTTPException to build itself"""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "Benchmark"
+
+class FakeCategory:
+    def __init__(self, guild, name: str):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.channels = []
+
+class FakeTextChannel:
+    def __init__(self, guild, name: str, category=None, overwrites=None, topic=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.overwrites = overwrites or {}
+        self.topic = topic
+        self.mention = f"<#{self.id}>"
+        self.messages = {}
+        self.created_at = datetime.now(timezone.utc)
+        self.deleted = False
+
+    def __str__(self):
+        return self.name
+
+    def seed_history(self, authors, count: int, attachment_every: int = 10):
+        """Add `count` messages without REST cost, as if the conversation had already happened"""
+        for index in range(count):
+            attachments = [FakeAttachment(f"screenshot-{index}.png")] if attachment_every and index % attachment_every == 0 else ()
+            message = FakeMessage(self, authors[index % len(authors)], f"Benchmark message {index} " + "lorem ipsum " * 8, attachments=attachments)
+            self.messages[message.id] = message
+
+    def get_message(self, message_id: int):
+        return self.messages.get(message_id)
+
+    def remove_message(self, message_id: int):
+        self.messages.pop(message_id, None)
+
+    def get_partial_message(self, message_id: int):
+        return FakePartialMessage(self, message_id)
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.rest.call()
+        message = FakeMessage(self, self.guild.me, content, **kwargs)
+        self.messages[message.id] = message
+        return message
+
+    async def history(self, limit=100, oldest_first=False):
+        messages = list(self.messages.values())
+        if not oldest_first:
+            messages.reverse()
+        if limit is not None:
+            messages = messages[:limit]
+
+        # Discord pages history 100 messages per request
+        for page_start in range(0, len(messages), 100):
+            await self.guild.rest.call()
+            for message in messages[page_start:page_start + 100]:
+                yield message
+
+    async def edit(self, name=None, reason=None, **kwargs):
+        await self.guild.rest.call()
+        if name is not None:
+            self.name = name
+        return self
+
+    async def delete(self, reason=None):
+        await self.guild.rest.call()
+        self.deleted = True
+        self.guild.channels.pop(self.id, None)
+        self.guild.bot.channels.pop(self.id, None)
+
+class FakeGuild:
+    def __init__(self, bot, rest: SimulatedREST, name: str = "Benchmark Guild"):
+        self.id = next_id()
+        self.bot = bot
+        self.rest = rest
+        self.name = name
+        self.icon = None
+        self.roles = {}
+        self.members = {}
+        self.channels = {}
+        self.categories = []
+        self.default_role = self.create_role_sync("@everyone", role_id=self.id)
+        self.me = FakeMember(self, "Ticket Bot", administrator=True)
+        self.members[self.me.id] = self.me
+        self.member_count = 1
+
+    def create_role_sync(self, name: str, role_id: int = None) -> FakeRole:
+        role = FakeRole(self, name, role_id)
+        self.roles[role.id] = role
+        return role
+
+    def add_member(self, name: str, roles=(), administrator: bool = False) -> FakeMember:
+        member = FakeMember(self, name, roles, administrator)
+        self.members[member.id] = member
+        self.bot.users[member.id] = member
+        self.member_count = len(self.members)
+        return member
+
+    def add_text_channel(self, name: str) -> FakeTextChannel:
+        channel = FakeTextChannel(self, name)
+        self.channels[channel.id] = channel
+        self.bot.channels[channel.id] = channel
+        return channel
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    async def create_category(self, name: str, reason=None, **kwargs):
+        await self.rest.call()
+        category = FakeCategory(self, name)
+        self.categories.append(category)
+        return category
+
+    async def create_text_channel(self, name: str, category=None, overwrites=None, topic=None, reason=None, **kwargs):
+        await self.rest.call()
+        channel = FakeTextChannel(self, name, category, overwrites, topic)
+        self.channels[channel.id] = channel
+        self.bot.channels[channel.id] = channel
+        return channel
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+        self.type = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, response_type):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        await self._interaction.guild.rest.call()
+        self._done = True
+        self.type = response_type
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond(discord.InteractionResponseType.channel_message)
+        self._interaction.sent.append(FakeMessage(self._interaction.channel, self._interaction.guild.me, content, **kwargs))
+
+    async def defer(self, ephemeral: bool = False, thinking: bool = False):
+        await self._respond(discord.InteractionResponseType.deferred_channel_message)
+
+    async def edit_message(self, **kwargs):
+        await self._respond(discord.InteractionResponseType.message_update)
+
+    async def send_modal(self, modal):
+        await self._respond(discord.InteractionResponseType.modal)
+        self._interaction.sent.append(modal)
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        await self._interaction.guild.rest.call()
+        message = FakeMessage(self._interaction.channel, self._interaction.guild.me, content, **kwargs)
+        self._interaction.sent.append(message)
+        return message
+
+class FakeInteraction:
+    def __init__(self, guild, channel, user, message=None):
+        self.id = next_id()
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.channel_id = channel.id
+        self.user = user
+        self.message = message
+        self.client = guild.bot
+        self.extras = {}
+        self.sent = []
+        self.created_at = datetime.now(timezone.utc)
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+
+class FakeBot:
+    """The attributes of TicketBot that the ticket code reaches for, without a gateway connection"""
+
+    def __init__(self, rest: SimulatedREST):
+        from utils.stats import StatsCache
+        from utils.activity import TicketActivityTracker
+        from utils.rename_queue import ChannelRenameQueue
+        from utils.rate_limiter import SlidingWindowRateLimiter
+        from utils.sla import SLATracker
+
+        self.rest = rest
+        self.db = None
+        self.db_supervisor = None
+        self.triggers_db = None
+        self.active_setups = {}
+        self.guilds = []
+        self.users = {}
+        self.channels = {}
+        self.latency = 0.0
+        self.start_time = datetime.now()
+        self.user = FakeUser(rest, "Ticket Bot")
+        self.stats_cache = StatsCache(self)
+        self.ticket_activity = TicketActivityTracker(self)
+        self.rename_queue = ChannelRenameQueue(self)
+        self.rate_limiter = SlidingWindowRateLimiter(self)
+        self.sla = SLATracker(self)
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def add_guild(self, name: str = "Benchmark Guild") -> FakeGuild:
+        guild = FakeGuild(self, self.rest, name)
+        self.guilds.append(guild)
+        return guild
+
+    def get_guild(self, guild_id):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    async def fetch_user(self, user_id):
+        await self.rest.call()
+        user = self.users.get(user_id)
+        if user is None:
+            raise discord.NotFound(FakeHTTPResponse(404), "Unknown User")
+        return user
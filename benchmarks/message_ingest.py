@@ -0,0 +1,163 @@
+"""Replay synthetic guild messages through every on_message listener and measure the per-message cost.
+
+    python -m benchmarks.message_ingest --guilds 10 --triggers 0 10 100 --messages 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import aiosqlite
+
+from benchmarks.fakes import FakeBot, FakeMessage, SimulatedREST
+from utils.instrumented_db import InstrumentedConnection, query_stats
+from utils.metrics import RollingWindow, format_ms
+
+WORDS = (
+    "ticket", "support", "please", "help", "order", "account", "payment", "server", "role", "channel",
+    "thanks", "when", "will", "this", "be", "fixed", "again", "still", "broken", "hello", "anyone", "here"
+)
+
+class IngestResult:
+    def __init__(self, listeners):
+        self.latencies = {name: RollingWindow(100_000) for name in listeners}
+        self.messages = 0
+        self.elapsed = 0.0
+        self.cpu = 0.0
+        self.statements = 0
+        self.rest_calls = 0
+        self.errors = 0
+
+def synthetic_content(rng: random.Random, length: int, keyword: str = None) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    if keyword:
+        words.insert(rng.randrange(len(words) + 1), keyword)
+    return " ".join(words)
+
+async def build_environment(directory: str, rest: SimulatedREST, guild_count: int, triggers_per_guild: int):
+    from cogs.tickets import SupportSystem
+    from cogs.triggers import TriggerSystem
+    from cogs.on_mention import OnMention
+
+    bot = FakeBot(rest)
+    # Connect before building the cog: its __init__ schedules a setup task that opens ./triggers.db if none is set
+    triggers_db = InstrumentedConnection(await aiosqlite.connect(os.path.join(directory, 'triggers.db')), 'triggers')
+    triggers = TriggerSystem(bot)
+    triggers.triggers_db = triggers_db
+    await triggers.setup_triggers_database()
+
+    guilds = []
+    for index in range(guild_count):
+        guild = bot.add_guild(f"Guild {index}")
+        guild.general = guild.add_text_channel("general")
+        guild.ticket = guild.add_text_channel("ticket-0001")
+        guild.authors = [guild.add_member(f"member{member}") for member in range(20)]
+        guild.keywords = [f"keyword{index}x{trigger}" for trigger in range(triggers_per_guild)]
+        bot.ticket_activity.track(guild.ticket.id)
+        guilds.append(guild)
+
+    async with triggers.triggers_db.cursor() as cur:
+        await cur.executemany(
+            "INSERT INTO triggers (guild_id, keyword, message, created_by) VALUES (?, ?, ?, ?)",
+            [(guild.id, keyword, f"Automatic reply for {keyword}", guild.me.id) for guild in guilds for keyword in guild.keywords]
+        )
+    await triggers.triggers_db.commit()
+
+    listeners = {
+        'SupportSystem': SupportSystem(bot).on_message,
+        'TriggerSystem': triggers.on_message,
+        'OnMention': OnMention(bot).on_message,
+    }
+    return bot, guilds, listeners, triggers
+
+def generate_messages(bot, guilds, args, rng: random.Random):
+    for _ in range(args.messages):
+        guild = rng.choice(guilds)
+        channel = guild.ticket if rng.random() < args.ticket_share else guild.general
+        keyword = rng.choice(guild.keywords) if guild.keywords and rng.random() < args.trigger_rate else None
+        mentions = [bot.user] if rng.random() < args.mention_rate else []
+        content = synthetic_content(rng, args.length, keyword)
+        yield FakeMessage(channel, rng.choice(guild.authors), content, mentions=mentions)
+
+async def timed(result: IngestResult, name: str, listener, message):
+    start = time.perf_counter()
+    try:
+        await listener(message)
+    except Exception:
+        result.errors += 1
+    finally:
+        result.latencies[name].add(time.perf_counter() - start)
+
+async def run_scenario(triggers_per_guild: int, args) -> IngestResult:
+    directory = tempfile.mkdtemp(prefix='ticketbot-ingest-')
+    rest = SimulatedREST(args.latency_ms, args.jitter_ms, args.seed)
+    bot, guilds, listeners, triggers = await build_environment(directory, rest, args.guilds, triggers_per_guild)
+    rng = random.Random(args.seed)
+    messages = list(generate_messages(bot, guilds, args, rng))
+    result = IngestResult(listeners)
+
+    rest.calls = 0
+    statements_before = sum(stats.calls for stats in query_stats.statements.values())
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    try:
+        # discord.py schedules every listener as its own task per message; replay in bursts of --batch
+        for offset in range(0, len(messages), args.batch):
+            await asyncio.gather(*(
+                timed(result, name, listener, message)
+                for message in messages[offset:offset + args.batch]
+                for name, listener in listeners.items()
+            ))
+            result.messages += len(messages[offset:offset + args.batch])
+    finally:
+        result.elapsed = time.perf_counter() - start
+        result.cpu = time.process_time() - cpu_start
+        result.rest_calls = rest.calls
+        result.statements = sum(stats.calls for stats in query_stats.statements.values()) - statements_before
+        await triggers.cog_unload()
+        shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+def print_report(triggers_per_guild: int, args, result: IngestResult):
+    messages = result.messages or 1
+    print(f"\n{args.guilds} guild(s) x {triggers_per_guild} trigger(s), {result.messages} messages of ~{args.length} chars "
+          f"in {result.elapsed:.2f}s")
+    print(f"  {result.messages / result.elapsed:,.0f} msgs/s • {result.cpu / messages * 1e6:,.0f}µs CPU/msg • "
+          f"{result.statements / messages:.2f} DB statements/msg • {result.rest_calls / messages:.3f} REST calls/msg"
+          f"{f' • {result.errors} listener errors' if result.errors else ''}")
+    print(f"  {'listener':<15}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, window in result.latencies.items():
+        p50, p95, p99 = window.percentiles(50, 95, 99)
+        print(f"  {name:<15}{format_ms(p50):>10}{format_ms(p95):>10}{format_ms(p99):>10}")
+
+async def main(args):
+    print(f"Simulated REST latency {args.latency_ms:.0f}ms ±{args.jitter_ms:.0f}ms, "
+          f"{args.mention_rate:.1%} mentions, {args.trigger_rate:.1%} trigger hits, {args.ticket_share:.0%} in ticket channels")
+    for triggers_per_guild in args.triggers:
+        print_report(triggers_per_guild, args, await run_scenario(triggers_per_guild, args))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guilds', type=int, default=10, help="Guilds the messages are spread across")
+    parser.add_argument('--triggers', type=int, nargs='+', default=[0, 10, 100], help="Triggers per guild, one run per value")
+    parser.add_argument('--messages', type=int, default=5000, help="Messages replayed per run")
+    parser.add_argument('--length', type=int, default=120, help="Approximate message length in characters")
+    parser.add_argument('--batch', type=int, default=200, help="Messages dispatched concurrently")
+    parser.add_argument('--trigger-rate', type=float, default=0.05, help="Share of messages containing a trigger keyword")
+    parser.add_argument('--mention-rate', type=float, default=0.01, help="Share of messages mentioning the bot")
+    parser.add_argument('--ticket-share', type=float, default=0.2, help="Share of messages sent in ticket channels")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Mean simulated Discord API latency")
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help="Uniform jitter around the mean latency")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for message generation and latency jitter")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
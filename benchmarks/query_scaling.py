@@ -0,0 +1,263 @@
+"""Time every literal SQL statement in the bot against a seeded database.
+
+    python -m benchmarks.seed_data bench.db --guilds 10000 --tickets 5000000
+    python -m benchmarks.query_scaling bench.db --save before.json
+    python -m benchmarks.query_scaling bench.db --compare before.json
+
+Statements are found by parsing the source, so new queries are picked up without touching this file.
+Parameters are bound from the column each placeholder is compared with, using real guilds, channels
+and users sampled from the database. Writes run inside a savepoint that is rolled back.
+"""
+import argparse
+import ast
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiosqlite
+
+from utils.instrumented_db import explain, fingerprint
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = ('utils', 'cogs', 'views')
+WRAPPERS = ('utils/instrumented_db.py',)
+SKIPPED_VERBS = ('CREATE', 'ALTER', 'DROP', 'PRAGMA', 'EXPLAIN', 'VACUUM', 'ANALYZE', 'BEGIN', 'COMMIT', 'ROLLBACK')
+WRITE_VERBS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_COMPARED_COLUMN_RE = re.compile(r'([A-Za-z_][\w.]*)\s*(?:=|==|!=|<>|<=|>=|<|>|\bLIKE|\bIN\s*\(|\bIS)\s*$', re.IGNORECASE)
+_LIST_CONTINUATION_RE = re.compile(r',\s*$')
+_PAGING_RE = re.compile(r'\b(LIMIT|OFFSET)\s*$', re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r'\?(\d*)')
+_INSERT_RE = re.compile(r'INSERT\s+(?:OR\s+\w+\s+)?INTO\s+\w+\s*\(([^)]*)\)\s*VALUES\s*\(([^)]*)\)', re.IGNORECASE | re.DOTALL)
+
+class Statement:
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.locations = []
+        self.timings = []
+        self.rows = 0
+        self.plan = None
+        self.error = None
+
+    @property
+    def verb(self) -> str:
+        return self.sql.lstrip().split(None, 1)[0].upper()
+
+    @property
+    def full_scan(self) -> bool:
+        return bool(self.plan) and any(
+            line.strip().startswith('SCAN') and 'COVERING INDEX' not in line for line in self.plan.splitlines()
+        )
+
+def collect_statements(sources=SOURCES):
+    """Every execute/executemany call whose SQL is a string literal, grouped by fingerprint"""
+    statements = {}
+    dynamic = []
+    for source in sources:
+        for path in sorted((ROOT / source).rglob('*.py')):
+            if path.relative_to(ROOT).as_posix() in WRAPPERS:
+                continue
+            tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+            for node in ast.walk(tree):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and node.func.attr in ('execute', 'executemany') and node.args):
+                    continue
+
+                location = f"{path.relative_to(ROOT)}:{node.lineno}"
+                argument = node.args[0]
+                if not (isinstance(argument, ast.Constant) and isinstance(argument.value, str)):
+                    dynamic.append(location)
+                    continue
+
+                sql = argument.value.strip()
+                if not sql or sql.split(None, 1)[0].upper() in SKIPPED_VERBS:
+                    continue
+
+                statement = statements.setdefault(fingerprint(sql), Statement(sql))
+                statement.locations.append(location)
+    return list(statements.values()), dynamic
+
+def placeholder_columns(sql: str):
+    """The column each parameter is bound to, in parameter order, or None where it cannot be told from the text.
+
+    Numbering follows SQLite: `?NNN` is parameter NNN and a bare `?` is the one after the highest so far, so a
+    parameter used in several places is mapped once, from its first use."""
+    insert = _INSERT_RE.search(sql)
+    inserted = [column.strip() for column in insert.group(1).split(',')] if insert else []
+
+    bound = {}
+    last = None
+    highest = 0
+    for match in _PLACEHOLDER_RE.finditer(sql):
+        index = int(match.group(1)) if match.group(1) else highest + 1
+        highest = max(highest, index)
+        if index in bound:
+            continue
+
+        prefix = sql[:match.start()]
+        if insert and insert.start(2) <= match.start() < insert.end(2):
+            # Anything after VALUES (e.g. ON CONFLICT ... = ?) falls back to comparison parsing
+            position = sql.count(',', insert.start(2), match.start())
+            bound[index] = inserted[position] if position < len(inserted) else None
+        elif _COMPARED_COLUMN_RE.search(prefix):
+            last = _COMPARED_COLUMN_RE.search(prefix).group(1).split('.')[-1].lower()
+            bound[index] = last
+        elif _PAGING_RE.search(prefix):
+            bound[index] = _PAGING_RE.search(prefix).group(1).lower()
+        elif _LIST_CONTINUATION_RE.search(prefix) and last:
+            bound[index] = last
+        else:
+            bound[index] = None
+    return [bound.get(index) for index in range(1, highest + 1)]
+
+class Sampler:
+    """Picks a real ticket, weighted towards the busy guilds, and answers parameter values from it"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.max_ticket = 0
+        self.sample = {}
+
+    async def prepare(self, db):
+        async with db.execute("SELECT MAX(id) FROM ticket_instances") as cur:
+            self.max_ticket = (await cur.fetchone())[0] or 0
+
+    async def next(self, db):
+        row = None
+        if self.max_ticket:
+            async with db.execute(
+                "SELECT guild_id, channel_id, creator_id, ticket_number, claimed_by, category FROM ticket_instances WHERE id >= ? LIMIT 1",
+                (self.rng.randint(1, self.max_ticket),)
+            ) as cur:
+                row = await cur.fetchone()
+
+        guild_id, channel_id, creator_id, ticket_number, claimed_by, category = row or (0, 0, 0, 1, None, "General Support")
+        async with db.execute(
+            "SELECT role_id, category_id, log_channel_id, ping_role_id, channel_id FROM tickets WHERE guild_id = ?", (guild_id,)
+        ) as cur:
+            config = await cur.fetchone() or (0, 0, 0, 0, 0)
+
+        now = datetime.now(timezone.utc)
+        self.sample = {
+            'guild_id': guild_id, 'channel_id': channel_id, 'creator_id': creator_id, 'user_id': creator_id,
+            'ticket_number': ticket_number, 'claimed_by': claimed_by or creator_id, 'category': category,
+            'category_name': category, 'role_id': config[0], 'category_id': config[1], 'log_channel_id': config[2],
+            'ping_role_id': config[3], 'panel_channel_id': config[4], 'status': 'open', 'priority': 'High',
+            'rating': 5, 'feedback': "Benchmark", 'staff_member': str(claimed_by), 'bucket': 'ticket',
+            'hit_at': now.timestamp(), 'limit': 10, 'offset': 0, 'created_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'created_at_ms': int(now.timestamp() * 1000) - 30 * 86400 * 1000,
+        }
+
+    def value(self, column, fresh_ids: bool = False):
+        if fresh_ids and column and column.endswith('_id'):
+            # Plain INSERTs would hit UNIQUE constraints with ids that already exist
+            return self.rng.randint(2 ** 62, 2 ** 63 - 1)
+        if column in self.sample:
+            return self.sample[column]
+        if column and column.endswith('_id'):
+            return self.sample['creator_id']
+        if column and column.endswith('_at'):
+            return self.sample['created_at']
+        if column and column.endswith('_ms'):
+            return self.sample['created_at_ms']
+        return 1
+
+async def time_statement(db, statement: Statement, sampler: Sampler, repeat: int):
+    columns = placeholder_columns(statement.sql)
+    is_write = statement.verb in WRITE_VERBS or (statement.verb == 'WITH' and re.search(r'\b(INSERT|UPDATE|DELETE)\b', statement.sql, re.I))
+    fresh_ids = re.match(r'\s*INSERT\s+INTO', statement.sql, re.I) is not None
+    for attempt in range(repeat):
+        await sampler.next(db)
+        parameters = tuple(sampler.value(column, fresh_ids) for column in columns)
+        if attempt == 0:
+            statement.plan = await explain(db, 'bench', statement.sql, parameters)
+
+        if is_write:
+            await db.execute("SAVEPOINT benchmark")
+        try:
+            start = time.perf_counter()
+            async with db.execute(statement.sql, parameters) as cur:
+                rows = await cur.fetchall()
+            statement.timings.append(time.perf_counter() - start)
+            statement.rows = max(statement.rows, len(rows))
+        except Exception as e:
+            statement.error = f"{type(e).__name__}: {e}"
+            return
+        finally:
+            if is_write:
+                await db.execute("ROLLBACK TO benchmark")
+                await db.execute("RELEASE benchmark")
+
+def summarise(statements):
+    return {
+        statement.sql: {
+            'median_ms': statistics.median(statement.timings) * 1000,
+            'max_ms': max(statement.timings) * 1000,
+            'full_scan': statement.full_scan,
+        }
+        for statement in statements if statement.timings
+    }
+
+def print_report(statements, dynamic, baseline, top: int):
+    timed_statements = sorted((s for s in statements if s.timings), key=lambda s: statistics.median(s.timings), reverse=True)
+    print(f"\n{'median':>9}{'max':>9}{'Δ':>9} {'rows':>6} scan  statement (first location)")
+    for statement in timed_statements[:top]:
+        median = statistics.median(statement.timings) * 1000
+        before = baseline.get(statement.sql)
+        delta = f"{(median / before['median_ms'] - 1) * 100:+.0f}%" if before and before['median_ms'] else ""
+        text = fingerprint(statement.sql)
+        print(f"{median:>7.2f}ms{max(statement.timings) * 1000:>7.1f}ms{delta:>9} {statement.rows:>6} "
+              f"{'SCAN' if statement.full_scan else '    '}  {text[:90]}{'...' if len(text) > 90 else ''}")
+        print(f"{'':>42}{statement.locations[0]}{f' (+{len(statement.locations) - 1} more)' if len(statement.locations) > 1 else ''}")
+
+    total = sum(statistics.median(s.timings) for s in timed_statements) * 1000
+    scans = sum(1 for s in timed_statements if s.full_scan)
+    print(f"\n{len(timed_statements)} statements timed, {scans} with full table scans, sum of medians {total:.1f}ms")
+    if baseline:
+        before_total = sum(entry['median_ms'] for sql, entry in baseline.items() if any(s.sql == sql for s in timed_statements))
+        if before_total:
+            print(f"Baseline sum of medians for the same statements: {before_total:.1f}ms ({(total / before_total - 1) * 100:+.0f}%)")
+
+    failed = [s for s in statements if s.error]
+    if failed:
+        print(f"\n{len(failed)} statement(s) could not run against this schema:")
+        for statement in failed:
+            print(f"  {statement.locations[0]}: {statement.error}")
+    if dynamic:
+        print(f"\n{len(dynamic)} call(s) build their SQL at runtime and were not timed: {', '.join(dynamic)}")
+
+async def main(args):
+    statements, dynamic = collect_statements()
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else {}
+
+    db = await aiosqlite.connect(args.path)
+    try:
+        sampler = Sampler(random.Random(args.seed))
+        await sampler.prepare(db)
+        for statement in statements:
+            await time_statement(db, statement, sampler, args.repeat)
+    finally:
+        await db.close()
+
+    print_report(statements, dynamic, baseline, args.top)
+    if args.save:
+        Path(args.save).write_text(json.dumps(summarise(statements), indent=2))
+        print(f"\nSaved timings to {args.save}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="Database seeded by benchmarks.seed_data")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per statement, each with a freshly sampled ticket")
+    parser.add_argument('--top', type=int, default=40, help="Statements to list, slowest first")
+    parser.add_argument('--save', help="Write median timings to this JSON file")
+    parser.add_argument('--compare', help="JSON file from an earlier --save to compare against")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for ticket sampling")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,201 @@
+"""Seed a bot.db with realistic volumes of guilds, tickets, ratings and rate limit hits.
+
+    python -m benchmarks.seed_data bench.db --guilds 10000 --tickets 5000000
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import aiosqlite
+
+CATEGORIES = ("General Support", "Billing", "Bug Report", "Partnership", "Appeal", "Report User", "Technical", "Other")
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+PRIORITY_WEIGHTS = (30, 45, 20, 5)
+RATING_WEIGHTS = (5, 5, 15, 30, 45)
+SUBJECTS = ("Cannot access my account", "Payment went through twice", "Bot is not responding", "Question about roles",
+            "Report a user", "Partnership request", "Refund", "Bug in the ticket panel")
+BATCH_SIZE = 20_000
+GUILD_ID_BASE = 1_100_000_000_000_000_000
+
+class SeedBot:
+    """Just enough of TicketBot for the schema setup code to run against an arbitrary file"""
+
+    def __init__(self, db):
+        self.db = db
+        self.triggers_db = db
+        self.active_setups = {}
+
+async def create_schema(db):
+    """Create the schema exactly as the bot does; triggers share the file instead of living in triggers.db"""
+    from main import TicketBot
+    from cogs.tickets import SupportSystem
+    from cogs.triggers import TriggerSystem
+
+    bot = SeedBot(db)
+    await TicketBot.setup_database(bot)
+    await SupportSystem(bot).cog_load()
+    await TriggerSystem.setup_triggers_database(bot)
+
+def guild_ticket_counts(guilds: int, tickets: int, skew: float):
+    """Split `tickets` across guilds with a Zipf-like long tail: a few huge servers, many quiet ones"""
+    weights = [1 / (rank + 1) ** skew for rank in range(guilds)]
+    scale = tickets / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in range(tickets - sum(counts)):
+        counts[index % guilds] += 1
+    return counts
+
+def sqlite_time(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+def epoch_ms(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
+
+class Seeder:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.next_snowflake = 1_200_000_000_000_000_000
+        self.rows = {}
+
+    def snowflake(self) -> int:
+        self.next_snowflake += self.rng.randint(1, 4096)
+        return self.next_snowflake
+
+    def skewed_index(self, size: int) -> int:
+        """Mostly low indexes, so a handful of members open most of a guild's tickets"""
+        return min(size - 1, int(size * self.rng.random() ** 3))
+
+    async def insert(self, db, table: str, sql: str, rows):
+        if rows:
+            await db.executemany(sql, rows)
+            self.rows[table] = self.rows.get(table, 0) + len(rows)
+
+    async def seed_guild(self, db, guild_id: int, ticket_count: int, pending):
+        rng = self.rng
+        role_id, log_channel_id, panel_channel_id = self.snowflake(), self.snowflake(), self.snowflake()
+        categories = rng.sample(CATEGORIES, rng.randint(2, 6))
+        members = [self.snowflake() for _ in range(max(10, ticket_count // 3))]
+        staff = [self.snowflake() for _ in range(rng.randint(1, 12))]
+
+        pending['tickets'].append((guild_id, panel_channel_id, role_id, self.snowflake(), log_channel_id, None,
+                                   rng.choice((1, 2, 3, 5)), rng.choice(('dropdown', 'button'))))
+        pending['ticket_panels'].append((guild_id, panel_channel_id, self.snowflake()))
+        pending['ticket_categories'].extend((guild_id, name, None) for name in categories)
+        if rng.random() < 0.2:
+            pending['additional_support_roles'].append((guild_id, self.snowflake()))
+        for index in range(rng.randint(0, 2 * self.args.triggers)):
+            pending['triggers'].append((guild_id, f"keyword{index}", "Automatic reply", rng.choice(staff)))
+        for _ in range(rng.randint(0, 3) if ticket_count > 50 else 0):
+            pending['ticket_blacklist'].append((guild_id, rng.choice(members), rng.choice(staff), epoch_ms(self.now)))
+
+        span = timedelta(days=self.args.days)
+        open_from = ticket_count - max(1 if ticket_count else 0, math.ceil(ticket_count * self.args.open_share))
+        for number in range(1, ticket_count + 1):
+            created = self.now - span + span * (number / (ticket_count + 1)) + timedelta(seconds=rng.randint(0, 600))
+            created = min(created, self.now)
+            creator = members[self.skewed_index(len(members))]
+            is_open = number > open_from
+            claimed_by = rng.choice(staff) if rng.random() < (0.4 if is_open else 0.75) else None
+            closed = None if is_open else created + timedelta(seconds=rng.lognormvariate(9.5, 1.2))
+            closed_at = None if is_open else sqlite_time(closed)
+            closed_at_ms = None if is_open else epoch_ms(closed)
+            channel_id = self.snowflake()
+            message_count = int(rng.lognormvariate(2.5, 1.0))
+
+            pending['ticket_instances'].append((
+                guild_id, channel_id, creator, rng.choice(categories), rng.choice(SUBJECTS),
+                "Synthetic ticket generated for benchmarks.", rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                'open' if is_open else 'closed', claimed_by, number, sqlite_time(created), closed_at,
+                epoch_ms(created), closed_at_ms, channel_id + 1, message_count, epoch_ms(created)
+            ))
+
+            if not is_open and rng.random() < self.args.rating_share:
+                pending['ticket_ratings'].append((
+                    guild_id, number, creator, rng.choices((1, 2, 3, 4, 5), RATING_WEIGHTS)[0],
+                    rng.choice((None, None, "Thanks!", "Slow response", "Very helpful")),
+                    str(claimed_by or staff[0]), closed_at, closed_at_ms
+                ))
+
+            if is_open and rng.random() < 0.5:
+                pending['rate_limit_hits'].append(('ticket', guild_id, creator, created.timestamp()))
+
+            if len(pending['ticket_instances']) >= BATCH_SIZE:
+                await self.flush(db, pending)
+
+    async def flush(self, db, pending):
+        statements = {
+            'tickets': "INSERT INTO tickets (guild_id, channel_id, role_id, category_id, log_channel_id, ping_role_id, ticket_limit, panel_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            'ticket_panels': "INSERT INTO ticket_panels (guild_id, channel_id, message_id) VALUES (?, ?, ?)",
+            'ticket_categories': "INSERT INTO ticket_categories (guild_id, category_name, emoji) VALUES (?, ?, ?)",
+            'additional_support_roles': "INSERT INTO additional_support_roles (guild_id, role_id) VALUES (?, ?)",
+            'ticket_blacklist': "INSERT OR IGNORE INTO ticket_blacklist (guild_id, user_id, blacklisted_by, blacklisted_at_ms) VALUES (?, ?, ?, ?)",
+            'ticket_instances': """INSERT INTO ticket_instances
+                (guild_id, channel_id, creator_id, category, subject, description, priority, status, claimed_by,
+                 ticket_number, created_at, closed_at, created_at_ms, closed_at_ms, control_message_id, message_count,
+                 last_message_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            'ticket_ratings': "INSERT INTO ticket_ratings (guild_id, ticket_number, user_id, rating, feedback, staff_member, created_at, created_at_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            'rate_limit_hits': "INSERT INTO rate_limit_hits (bucket, guild_id, user_id, hit_at) VALUES (?, ?, ?, ?)",
+            'triggers': "INSERT INTO triggers (guild_id, keyword, message, created_by) VALUES (?, ?, ?, ?)",
+        }
+        for table, sql in statements.items():
+            await self.insert(db, table, sql, pending[table])
+            pending[table].clear()
+        await db.commit()
+
+    async def run(self, db):
+        pending = {table: [] for table in (
+            'tickets', 'ticket_panels', 'ticket_categories', 'additional_support_roles', 'ticket_blacklist',
+            'ticket_instances', 'ticket_ratings', 'rate_limit_hits', 'triggers'
+        )}
+        counts = guild_ticket_counts(self.args.guilds, self.args.tickets, self.args.skew)
+        for index, ticket_count in enumerate(counts):
+            await self.seed_guild(db, GUILD_ID_BASE + index, ticket_count, pending)
+        await self.flush(db, pending)
+
+async def main(args):
+    if os.path.exists(args.path):
+        if not args.force:
+            raise SystemExit(f"{args.path} already exists, pass --force to replace it")
+        os.remove(args.path)
+
+    start = time.perf_counter()
+    db = await aiosqlite.connect(args.path)
+    try:
+        await create_schema(db)
+        await db.execute("PRAGMA synchronous = OFF")
+        await db.execute("PRAGMA journal_mode = MEMORY")
+
+        seeder = Seeder(args)
+        await seeder.run(db)
+        await db.execute("ANALYZE")
+        await db.commit()
+    finally:
+        await db.close()
+
+    print(f"Seeded {args.path} in {time.perf_counter() - start:.1f}s ({os.path.getsize(args.path) / 1e6:,.1f} MB)")
+    for table, count in sorted(seeder.rows.items()):
+        print(f"  {table:<26}{count:>12,}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="Database file to create")
+    parser.add_argument('--guilds', type=int, default=1000, help="Configured guilds")
+    parser.add_argument('--tickets', type=int, default=200_000, help="Tickets across all guilds")
+    parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent of tickets per guild; 0 spreads them evenly")
+    parser.add_argument('--days', type=int, default=3 * 365, help="History the tickets are spread over")
+    parser.add_argument('--open-share', type=float, default=0.03, help="Share of each guild's newest tickets still open")
+    parser.add_argument('--rating-share', type=float, default=0.35, help="Share of closed tickets that were rated")
+    parser.add_argument('--triggers', type=int, default=5, help="Average keyword triggers per guild")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed, so runs are reproducible")
+    parser.add_argument('--force', action='store_true', help="Overwrite an existing file")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
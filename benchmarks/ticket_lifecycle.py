@@ -0,0 +1,187 @@
+"""Drive create, claim, priority change and close through the real ticket code with fake Discord objects.
+
+    python -m benchmarks.ticket_lifecycle --concurrency 1 10 100 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+from discord.ui.select import selected_values
+
+from benchmarks.fakes import FakeBot, FakeInteraction, SimulatedREST
+from utils.db_supervisor import DatabaseSupervisor
+from utils.instrumented_db import InstrumentedConnection, query_stats
+from utils.metrics import RollingWindow, format_ms
+
+OPERATIONS = ('create', 'claim', 'priority', 'close')
+
+class NoCloseDelay:
+    """Module stand-in for views.ticket_views so the cosmetic pause before deleting a channel is skipped"""
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+    async def sleep(self, delay, result=None):
+        return result
+
+class LifecycleResult:
+    def __init__(self):
+        self.latencies = {operation: RollingWindow(100_000) for operation in OPERATIONS}
+        self.failures = {operation: 0 for operation in OPERATIONS}
+        self.errors = Counter()
+        self.elapsed = 0.0
+        self.rest_calls = 0
+        self.statements = 0
+
+async def build_environment(directory: str, rest: SimulatedREST, users: int):
+    from main import TicketBot
+
+    bot = FakeBot(rest)
+    bot.db_supervisor = DatabaseSupervisor(bot, os.path.join(directory, 'bot.db'))
+    bot.db = InstrumentedConnection(await bot.db_supervisor.connect(), 'bot')
+    await TicketBot.setup_database(bot)
+
+    guild = bot.add_guild()
+    support_role = guild.create_role_sync("Support")
+    staff = guild.add_member("Support Agent", roles=[support_role])
+    log_channel = guild.add_text_channel("ticket-logs")
+    members = [guild.add_member(f"user{index:03d}") for index in range(users)]
+
+    async with bot.db.cursor() as cur:
+        await cur.execute(
+            "INSERT INTO tickets (guild_id, role_id, log_channel_id) VALUES (?, ?, ?)",
+            (guild.id, support_role.id, log_channel.id)
+        )
+        await cur.execute(
+            "INSERT INTO ticket_categories (guild_id, category_name) VALUES (?, ?)",
+            (guild.id, "General Support")
+        )
+    await bot.db.commit()
+    return bot, guild, staff, members
+
+async def timed(result: LifecycleResult, operation: str, coro):
+    """Await one operation, recording its latency; exceptions escaping the handler count as errors"""
+    start = time.perf_counter()
+    try:
+        return await coro
+    except Exception as e:
+        result.errors[f"{operation}: {type(e).__name__}: {e}"] += 1
+        return None
+    finally:
+        result.latencies[operation].add(time.perf_counter() - start)
+
+async def ticket_row(bot, creator_id: int):
+    async with bot.db.cursor() as cur:
+        await cur.execute(
+            "SELECT channel_id, ticket_number, claimed_by, priority, status FROM ticket_instances "
+            "WHERE creator_id = ? ORDER BY id DESC LIMIT 1",
+            (creator_id,)
+        )
+        # Drain the cursor: a half-read LIMIT 1 statement makes concurrent commits fail with "SQL statements in progress"
+        rows = await cur.fetchall()
+        return rows[0] if rows else None
+
+async def run_lifecycle(bot, guild, staff, user, history: int, result: LifecycleResult):
+    from utils.tickets import create_ticket_channel
+    from views.ticket_views import TicketControlView, TicketCloseConfirmationView
+
+    outcome = await timed(result, 'create', create_ticket_channel(
+        bot, guild, user, None, "General Support", "Benchmark subject",
+        "Something is broken and I need help with it.", "Medium"
+    ))
+    row = await ticket_row(bot, user.id)
+    if not outcome or not outcome[0] or row is None or row[4] != 'open':
+        result.failures['create'] += 1
+        return
+
+    channel_id, ticket_number = row[0], row[1]
+    channel = guild.get_channel(channel_id)
+    channel.seed_history([user, staff], history)
+    ticket_data = {
+        'channel_id': channel_id,
+        'creator_id': user.id,
+        'ticket_number': ticket_number,
+        'category': "General Support",
+        'priority': "Medium"
+    }
+
+    view = TicketControlView(bot, ticket_data)
+    await timed(result, 'claim', view.claim_button.callback(FakeInteraction(guild, channel, staff)))
+    if (await ticket_row(bot, user.id))[2] != staff.id:
+        result.failures['claim'] += 1
+
+    selected_values.set({'priority_select_menu': ['High']})
+    await timed(result, 'priority', view.priority_select_callback(FakeInteraction(guild, channel, staff)))
+    if (await ticket_row(bot, user.id))[3] != 'High':
+        result.failures['priority'] += 1
+
+    confirmation = TicketCloseConfirmationView(bot, ticket_data)
+    await timed(result, 'close', confirmation.confirm_close.callback(FakeInteraction(guild, channel, staff)))
+    if not channel.deleted or (await ticket_row(bot, user.id))[4] != 'closed':
+        result.failures['close'] += 1
+
+async def run_level(concurrency: int, args) -> LifecycleResult:
+    directory = tempfile.mkdtemp(prefix='ticketbot-bench-')
+    rest = SimulatedREST(args.latency_ms, args.jitter_ms, args.seed)
+    bot, guild, staff, members = await build_environment(directory, rest, concurrency)
+    result = LifecycleResult()
+
+    async def user_session(member):
+        for _ in range(args.tickets):
+            await run_lifecycle(bot, guild, staff, member, args.history, result)
+
+    rest.calls = 0
+    statements_before = sum(stats.calls for stats in query_stats.statements.values())
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(user_session(member) for member in members))
+    finally:
+        result.elapsed = time.perf_counter() - start
+        result.rest_calls = rest.calls
+        result.statements = sum(stats.calls for stats in query_stats.statements.values()) - statements_before
+        await bot.rename_queue.stop()
+        await bot.db.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+def print_report(concurrency: int, tickets: int, result: LifecycleResult):
+    lifecycles = concurrency * tickets
+    print(f"\n{concurrency} concurrent user(s), {lifecycles} ticket lifecycle(s) in {result.elapsed:.2f}s "
+          f"- {lifecycles / result.elapsed:.1f} lifecycles/s, "
+          f"{result.rest_calls / lifecycles:.1f} REST calls and {result.statements / lifecycles:.1f} DB statements per lifecycle")
+    print(f"  {'operation':<10}{'ops':>6}{'failed':>8}{'ops/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for operation in OPERATIONS:
+        window = result.latencies[operation]
+        p50, p95, p99 = window.percentiles(50, 95, 99)
+        print(f"  {operation:<10}{len(window):>6}{result.failures[operation]:>8}{len(window) / result.elapsed:>9.1f}"
+              f"{format_ms(p50):>10}{format_ms(p95):>10}{format_ms(p99):>10}")
+    for error, count in result.errors.most_common(5):
+        print(f"  ! {count}x {error}")
+
+async def main(args):
+    if not args.keep_close_delay:
+        import views.ticket_views
+        views.ticket_views.asyncio = NoCloseDelay()
+
+    print(f"Simulated REST latency {args.latency_ms:.0f}ms ±{args.jitter_ms:.0f}ms, "
+          f"{args.history} messages of history per ticket, {args.tickets} ticket(s) per user")
+    for concurrency in args.concurrency:
+        print_report(concurrency, args.tickets, await run_level(concurrency, args))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 100], help="Concurrent users per run")
+    parser.add_argument('--tickets', type=int, default=3, help="Tickets each user opens and closes")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Mean simulated Discord API latency")
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help="Uniform jitter around the mean latency")
+    parser.add_argument('--history', type=int, default=50, help="Messages in each ticket before it is closed")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for the latency jitter")
+    parser.add_argument('--keep-close-delay', action='store_true', help="Keep the one second pause before the channel is deleted")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
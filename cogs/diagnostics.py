@@ -0,0 +1,159 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import logging
+from typing import Literal
+from utils.helpers import utc_to_gmt
+from utils.instrumented_db import query_stats, fingerprint
+from utils.log_pipeline import log_pipeline
+from utils.metrics import REST_WINDOW, DB_WINDOW, format_ms, format_percentiles, measure_db_round_trip
+
+logger = logging.getLogger('discord')
+
+def format_ratio(hits: int, misses: int) -> str:
+    total = hits + misses
+    if not total:
+        return "N/A"
+    return f"{hits / total:.0%} ({hits}/{total})"
+
+class Diagnostics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.hybrid_command(name="db-top", description="Show the database statements that took the most time.")
+    @app_commands.describe(
+        limit="Number of statements to show (1-15)",
+        order="Sort by total time, average time, worst time or number of calls"
+    )
+    @commands.has_permissions(administrator=True)
+    async def db_top(self, ctx: commands.Context, limit: int = 10, order: Literal['total', 'average', 'max', 'calls'] = 'total'):
+        logger.info(f"DB top command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
+        try:
+            limit = max(1, min(limit, 15))
+            top = query_stats.top(limit, order)
+
+            current_time = utc_to_gmt(discord.utils.utcnow())
+            embed = discord.Embed(
+                title="<:disk_icons:1384042698192715899> Database Statements",
+                color=0x00D4FF,
+                timestamp=current_time
+            )
+
+            if not top:
+                embed.description = "**No statements recorded yet.**\n\nQuery statistics are collected while `SLOW_QUERY_THRESHOLD_MS` or `METRICS_ENABLED` is set."
+            else:
+                total_seconds = sum(stats.total_seconds for stats in query_stats.statements.values()) or 1
+                embed.description = f"**Top {len(top)} by {order}** across {len(query_stats.statements)} distinct statements"
+                for rank, ((database, statement), stats) in enumerate(top, start=1):
+                    statement_text = statement if len(statement) <= 300 else statement[:297] + "..."
+                    embed.add_field(
+                        name=f"#{rank} • {database} • {stats.total_seconds * 1000:.0f}ms total ({stats.total_seconds / total_seconds:.0%})",
+                        value=f"**Calls:** {stats.calls} • **Avg:** {stats.average_seconds * 1000:.1f}ms • "
+                              f"**Max:** {stats.max_seconds * 1000:.1f}ms • **Slow:** {stats.slow_calls}\n"
+                              f"```sql\n{statement_text}\n```",
+                        inline=False
+                    )
+
+            embed.set_footer(text="Support System • Query Statistics")
+            await ctx.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in db_top: {e}")
+            await ctx.send(f"<:icons_Wrong:1382701332955402341> | An error occurred: {e}", ephemeral=True)
+
+    @commands.hybrid_command(name="diagnostics", description="Show live latency, cache and queue diagnostics.")
+    @commands.has_permissions(administrator=True)
+    async def diagnostics(self, ctx: commands.Context):
+        logger.info(f"Diagnostics command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
+        try:
+            db_latency = await measure_db_round_trip(self.bot)
+            loop_monitor = self.bot.loop_monitor
+            tracer = self.bot.interaction_tracer
+
+            current_time = utc_to_gmt(discord.utils.utcnow())
+            embed = discord.Embed(
+                title="<:stats_1:1382703019334045830> Bot Diagnostics",
+                description="**Live figures from rolling in-memory windows**",
+                color=0x00D4FF,
+                timestamp=current_time
+            )
+
+            supervisor = self.bot.db_supervisor
+            embed.add_field(
+                name="<:icons_clock:1382701751206936697> **Latency**",
+                value=f"• **Gateway Heartbeat:** {format_ms(self.bot.latency)}\n"
+                      f"• **Database Round Trip:** {format_ms(db_latency)}\n"
+                      f"• **Database Breaker:** {supervisor.state.replace('_', '-')}, {supervisor.trips} trip(s), "
+                      f"{supervisor.rejected} rejected, {supervisor.reconnects} reconnect(s)\n"
+                      f"• **Database Statements:** {format_percentiles(*DB_WINDOW.percentiles(50, 95, 99))}\n"
+                      f"• **Discord API:** {format_percentiles(*REST_WINDOW.percentiles(50, 95, 99))}\n"
+                      f"• **Event Loop Lag:** {format_percentiles(*loop_monitor.percentiles())}",
+                inline=False
+            )
+
+            worst_handlers = ", ".join(f"`{handler}` ({count})" for handler, count in tracer.misses.most_common(3))
+            embed.add_field(
+                name="<:warning:1382701413284446228> **Interactions & Stalls**",
+                value=f"• **Deadline Misses:** {sum(tracer.misses.values())}"
+                      f"{f' - {worst_handlers}' if worst_handlers else ''}\n"
+                      f"• **Auto-Deferred:** {sum(tracer.auto_deferred.values())}\n"
+                      f"• **Event Loop Stalls:** {loop_monitor.stalls}",
+                inline=False
+            )
+
+            fingerprint_cache = fingerprint.cache_info()
+            embed.add_field(
+                name="<:disk_icons:1384042698192715899> **Cache Hit Ratios**",
+                value=f"• **Server Stats:** {format_ratio(self.bot.stats_cache.hits, self.bot.stats_cache.misses)}\n"
+                      f"• **Ticket Message Counts:** {format_ratio(self.bot.ticket_activity.hits, self.bot.ticket_activity.misses)}\n"
+                      f"• **Query Fingerprints:** {format_ratio(fingerprint_cache.hits, fingerprint_cache.misses)}",
+                inline=False
+            )
+
+            log_backlog = sum(listener.queue.qsize() for listener in log_pipeline.listeners)
+            embed.add_field(
+                name="<:icons_refresh:1382701477759549523> **Queue Depths**",
+                value=f"• **Pending Channel Renames:** {len(self.bot.rename_queue.pending)}\n"
+                      f"• **Unflushed Activity Counters:** {len(self.bot.ticket_activity.dirty)}\n"
+                      f"• **Rate Limit Keys:** {len(self.bot.rate_limiter.hits)}\n"
+                      f"• **Queued Log Records:** {log_backlog}\n"
+                      f"• **Pending Tasks:** {len(asyncio.all_tasks())}",
+                inline=False
+            )
+
+            maintenance = self.bot.maintenance.reports
+            if maintenance:
+                embed.add_field(
+                    name="<:icons_wrench:1382702984940617738> **Last Database Maintenance**",
+                    value="\n".join(
+                        f"• **{database}:** {discord.utils.format_dt(report.finished_at, 'R')} - "
+                        f"{report.reclaimed_bytes / 1e6:.2f} MB reclaimed, locked {format_ms(report.locked_seconds)}"
+                        f"{' (out of budget)' if report.skipped else ''}"
+                        for database, report in maintenance.items()
+                    ),
+                    inline=False
+                )
+
+            backups = self.bot.backups.reports
+            if backups:
+                embed.add_field(
+                    name="<:icons_wrench:1382702984940617738> **Last Backup**",
+                    value="\n".join(
+                        f"• **{database}:** {discord.utils.format_dt(report.finished_at, 'R')} - "
+                        f"{report.compressed_bytes / 1e6:.2f} MB in {report.seconds:.1f}s, "
+                        f"query p95 {format_ms(report.latency_before[1])} → {format_ms(report.latency_during[1])}"
+                        for database, report in backups.items()
+                    ),
+                    inline=False
+                )
+
+            embed.set_footer(text="Support System • Diagnostics")
+            await ctx.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in diagnostics: {e}")
+            await ctx.send(f"<:icons_Wrong:1382701332955402341> | An error occurred: {e}", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -4,6 +4,8 @@ from discord import app_commands
 import logging
 from utils.helpers import utc_to_gmt
 from utils.database import user_has_support_role
+from utils.stats import format_duration
+from utils.metrics import REST_WINDOW, format_ms, format_percentiles, measure_db_round_trip
 import time
 from datetime import datetime, timezone
 
@@ -127,32 +129,37 @@ class HelpSystem(commands.Cog):
                 await ctx.response.defer(ephemeral=True)
 
             latency = round(self.bot.latency * 1000)
+            db_latency = await measure_db_round_trip(self.bot)
+            rest_p50, rest_p95, rest_p99 = REST_WINDOW.percentiles(50, 95, 99)
+            lag_p50, lag_p95, lag_p99 = self.bot.loop_monitor.percentiles()
 
-            if latency < 50:
+            slowest = max(latency, round((rest_p95 or 0) * 1000))
+
+            if slowest < 50:
                 status_text = "Excellent"
                 status_emoji = "<a:green_circle2:1382704526057930794>"
                 color = 0x00FF88
-                description = f"<:UA_Rocket_icons:1382701592851124254> **Lightning Fast!** - {latency}ms response time"
-            elif latency < 100:
+                description = f"<:UA_Rocket_icons:1382701592851124254> **Lightning Fast!** - {latency}ms gateway heartbeat"
+            elif slowest < 100:
                 status_text = "Very Good"
                 status_emoji = "<a:green_circle2:1382704526057930794>"
                 color = 0x00D4FF
-                description = f"<:Rise:1382704106808016917> **Excellent Performance** - {latency}ms response time"
-            elif latency < 150:
+                description = f"<:Rise:1382704106808016917> **Excellent Performance** - {latency}ms gateway heartbeat"
+            elif slowest < 150:
                 status_text = "Good"
                 status_emoji = "<:Yellow_circle:1382704571377258559>"
                 color = 0xFFAA00
-                description = f"<:icons_wrench:1382702984940617738> **Stable Connection** - {latency}ms response time"
-            elif latency < 250:
+                description = f"<:icons_wrench:1382702984940617738> **Stable Connection** - {latency}ms gateway heartbeat"
+            elif slowest < 250:
                 status_text = "Fair"
                 status_emoji = "<:Yellow_circle:1382704571377258559>"
                 color = 0xFF8C00
-                description = f"<:Target:1382706193855942737> **Moderate Delays** - {latency}ms response time"
+                description = f"<:Target:1382706193855942737> **Moderate Delays** - {latency}ms gateway heartbeat"
             else:
                 status_text = "Poor"
                 status_emoji = "<:icons_Wrong:1382701332955402341>"
                 color = 0xFF6B6B
-                description = f"<:icons_Wrong:1382701332955402341> **High Latency Detected** - {latency}ms response time"
+                description = f"<:icons_Wrong:1382701332955402341> **High Latency Detected** - {latency}ms gateway heartbeat"
 
             embed = discord.Embed(
                 title="<:stats_1:1382703019334045830> Real-Time Connection Status",
@@ -162,61 +169,32 @@ class HelpSystem(commands.Cog):
             )
 
             embed.add_field(
-                name="<:icons_refresh:1382701477759549523> **Ping Latency**",
+                name="<:icons_refresh:1382701477759549523> **Gateway Heartbeat**",
                 value=f"```{latency}ms```",
                 inline=True
             )
 
             embed.add_field(
-                name="<:Rise:1382704106808016917> **Connection Quality**",
-                value=f"{status_emoji} **{status_text}**",
+                name="<:disk_icons:1384042698192715899> **Database Round Trip**",
+                value=f"```{format_ms(db_latency)}```",
                 inline=True
             )
 
             embed.add_field(
-                name="<:robot:1382702105722228824> **WebSocket Status**",
-                value="<a:green_circle2:1382704526057930794> **Online**",
+                name="<:Rise:1382704106808016917> **Overall Status**",
+                value=f"{status_emoji} **{status_text}**",
                 inline=True
             )
 
-            if latency < 50:
-                embed.add_field(
-                    name="<:UA_Rocket_icons:1382701592851124254> **Performance Analysis**",
-                    value="Perfect for gaming and real-time applications!",
-                    inline=False
-                )
-            elif latency < 100:
-                embed.add_field(
-                    name="<:Rise:1382704106808016917> **Performance Analysis**",
-                    value="Excellent for all Discord operations",
-                    inline=False
-                )
-            elif latency < 150:
-                embed.add_field(
-                    name="<:icons_wrench:1382702984940617738> **Performance Analysis**",
-                    value="Good for normal Discord usage",
-                    inline=False
-                )
-            elif latency < 250:
-                embed.add_field(
-                    name="<:Target:1382706193855942737> **Performance Analysis**",
-                    value="May notice slight delays in responses",
-                    inline=False
-                )
-            else:
-                embed.add_field(
-                    name="<:icons_Wrong:1382701332955402341> **Performance Analysis**",
-                    value="Experiencing significant delays - check connection",
-                    inline=False
-                )
-
             embed.add_field(
                 name="<:icons_clock:1382701751206936697> **Response Time Details**",
-                value=f"• **API Latency:** {latency}ms\n• **WebSocket:** Connected\n• **Status:** {status_text}",
+                value=f"• **Discord API:** {format_percentiles(rest_p50, rest_p95, rest_p99)} ({len(REST_WINDOW)} recent requests)\n"
+                      f"• **Event Loop Lag:** {format_percentiles(lag_p50, lag_p95, lag_p99)}\n"
+                      f"• **Status:** {status_text}",
                 inline=False
             )
 
-            embed.set_footer(text="Live connection metrics • Updated every request")
+            embed.set_footer(text="Live connection metrics • Percentiles over recent activity")
 
             if isinstance(ctx, discord.Interaction):
                 await ctx.followup.send(embed=embed, ephemeral=True)
@@ -264,12 +242,12 @@ class HelpSystem(commands.Cog):
                 inline=False
             )
 
+            member_counters = await self.bot.stats_cache.get_member_counters(guild)
             embed.add_field(
                 name="<:Rise:1382704106808016917> **Member Statistics**",
                 value=f"• **Total Members:** {guild.member_count:,}\n"
-                      f"• **Online Members:** {len([m for m in guild.members if m.status != discord.Status.offline]):,}\n"
-                      f"• **Bots:** {len([m for m in guild.members if m.bot]):,}\n"
-                      f"• **Humans:** {len([m for m in guild.members if not m.bot]):,}",
+                      f"• **Bots:** {member_counters.bots:,}\n"
+                      f"• **Humans:** {member_counters.humans:,}",
                 inline=True
             )
 
@@ -282,6 +260,15 @@ class HelpSystem(commands.Cog):
                 inline=True
             )
 
+            ticket_counters = await self.bot.stats_cache.get_ticket_counters(guild.id)
+            embed.add_field(
+                name="<:clipboard1:1383857546410070117> **Ticket Statistics**",
+                value=f"• **Open Tickets:** {ticket_counters.open:,}\n"
+                      f"• **Closed Tickets:** {ticket_counters.closed:,}\n"
+                      f"• **Avg. Resolution Time:** {format_duration(ticket_counters.average_resolution_seconds)}",
+                inline=False
+            )
+
             embed.set_footer(text="Live Statistics • Updated in Real-Time")
             embed.set_thumbnail(url=guild.icon.url if guild.icon else self.bot.user.display_avatar.url)
 
@@ -294,7 +281,19 @@ class HelpSystem(commands.Cog):
             logger.error(f"Error in stats command: {e}")
             raise e
 
-    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.bot.stats_cache.member_joined(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        self.bot.stats_cache.member_left(member)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.bot.stats_cache.forget_guild(guild.id)
+        self.bot.sla.forget_guild(guild.id)
+
 
 class HelpCategoryView(discord.ui.View):
     def __init__(self, bot, user_id):
@@ -419,7 +418,8 @@ class HelpCategoryView(discord.ui.View):
                     name="<:icons_wrench:1382702984940617738> **System Setup**",
                     value="`setup-tickets` - Configure the entire support system\n"
                           "`send-panel <type>` - Deploy support panels\n"
-                          "`reset-categories` - Reset all categories to default",
+                          "`reset-categories` - Reset all categories to default\n"
+                          "`set-ratelimit <burst> <window>` - Limit how many tickets a user can open per window",
                     inline=False
                 )
 
@@ -433,7 +433,12 @@ class HelpCategoryView(discord.ui.View):
 
                 embed.add_field(
                     name="<:stats_1:1382703019334045830> **Analytics & Stats**",
-                    value="`stats` - View comprehensive server statistics",
+                    value="`stats` - View comprehensive server statistics\n"
+                          "`db-top [limit] [order]` - Show the most expensive database statements\n"
+                          "`diagnostics` - Live latency, cache and queue diagnostics\n"
+                          "`sla-report` - First response and resolution times of recent tickets\n"
+                          "`ticket-trends [weeks]` - Weekly ticket volume per category and long-range resolution times\n"
+                          "`export-tickets [format] [since] [until]` - Export tickets and ratings as files (sent by DM for prefix commands)",
                     inline=False
                 )
 
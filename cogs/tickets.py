@@ -7,6 +7,9 @@ import re
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 import time
+import os
+import shutil
+import tempfile
 from utils.helpers import check_rate_limit, set_rate_limit, generate_transcript, utc_to_gmt
 from utils.database import (
     check_database_connection, get_ticket_channel, get_ticket_role, get_ticket_category,
@@ -14,15 +17,37 @@ from utils.database import (
     add_ticket_category, remove_ticket_category, reset_ticket_categories, get_user_open_tickets,
     check_user_ticket_limit
 )
-from utils.tickets import is_ticket_channel, get_ticket_creator
+from utils.tickets import is_ticket_channel, get_ticket_creator, backfill_control_message_ids
+from utils.stats import format_duration
+from utils.export import export_guild, parse_date
+from utils.timestamps import from_ms, now_ms
 from views.ticket_views import TicketSetupView, TicketPanelView, TicketButtonPanelView, TicketChannelView
 
 
 logger = logging.getLogger('discord')
 
+def rename_error_embed(error: discord.HTTPException, sanitized_name: str) -> discord.Embed:
+    error_msg = str(error).lower()
+    if "name" in error_msg or "invalid" in error_msg:
+        return discord.Embed(
+            title="<:icons_Wrong:1382701332955402341> Invalid Channel Name",
+            description=f"**Discord rejected the channel name.**\n\n"
+                       f"**Error:** {str(error)}\n"
+                       f"**Attempted name:** `{sanitized_name}`\n\n"
+                       "Please try a different name with only letters, numbers, dashes, and underscores.",
+            color=0xFF6B6B
+        )
+    return discord.Embed(
+        title="<:icons_Wrong:1382701332955402341> Discord API Error",
+        description=f"**Discord rejected the rename request.**\n\n"
+                   f"**Error:** {str(error)}\n\n"
+                   "This might be due to rate limiting or invalid characters. Please try again in a moment.",
+        color=0xFF6B6B
+    )
+
 async def update_ticket_panel(bot, guild_id: int, panel_type: str = None) -> tuple[bool, str]:
     try:
-        if not await check_database_connection(bot):
+        if not check_database_connection(bot):
             return False, "Database connection failed. Please try again later."
 
         async with bot.db.cursor() as cur:
@@ -113,9 +138,15 @@ async def update_ticket_panel(bot, guild_id: int, panel_type: str = None) -> tup
 class SupportSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.control_messages_backfilled = False
+        self.export_tasks = {}
         if not hasattr(bot, 'active_setups'):
             bot.active_setups = {}
 
+    async def cog_unload(self):
+        for task in self.export_tasks.values():
+            task.cancel()
+
     async def cog_load(self):
         try:
             async with self.bot.db.cursor() as cur:
@@ -222,7 +253,9 @@ class SupportSystem(commands.Cog):
                         status TEXT DEFAULT 'open',
                         claimed_by INTEGER,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        closed_at TIMESTAMP
+                        closed_at TIMESTAMP,
+                        created_at_ms INTEGER,
+                        closed_at_ms INTEGER
                     )
                 """)
 
@@ -235,7 +268,8 @@ class SupportSystem(commands.Cog):
                         rating INTEGER,
                         feedback TEXT,
                         staff_member TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        created_at_ms INTEGER
                     )
                 """)
 
@@ -267,9 +301,11 @@ class SupportSystem(commands.Cog):
                 """)
 
                 await cur.execute("""
-                    CREATE TABLE IF NOT EXISTS rate_limits (
-                        user_id INTEGER PRIMARY KEY,
-                        last_ticket_time REAL
+                    CREATE TABLE IF NOT EXISTS rate_limit_hits (
+                        bucket TEXT,
+                        guild_id INTEGER,
+                        user_id INTEGER,
+                        hit_at REAL
                     )
                 """)
 
@@ -280,10 +316,15 @@ class SupportSystem(commands.Cog):
                         user_id INTEGER,
                         blacklisted_by INTEGER,
                         blacklisted_at TEXT,
+                        blacklisted_at_ms INTEGER,
                         UNIQUE(guild_id, user_id)
                     )
                 """)
 
+                await cur.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_ticket_blacklist_guild_at ON ticket_blacklist (guild_id, blacklisted_at_ms)"
+                )
+
                 await cur.execute("""
                     CREATE TABLE IF NOT EXISTS additional_support_roles (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -310,6 +351,10 @@ class SupportSystem(commands.Cog):
         except Exception as e:
             logger.error(f"Error in on_ready persistent view registration: {e}")
 
+        if not self.control_messages_backfilled:
+            self.control_messages_backfilled = True
+            asyncio.create_task(backfill_control_message_ids(self.bot))
+
     async def register_persistent_views(self):
         """Register persistent views for all guilds with ticket systems"""
         try:
@@ -343,9 +388,16 @@ class SupportSystem(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author.bot or not message.guild:
+        if not message.guild:
             return
 
+        self.bot.ticket_activity.record_message(message)
+
+        if message.author.bot:
+            return
+
+        await self.bot.sla.record_message(message)
+
         if message.guild.id in self.bot.active_setups:
             view = self.bot.active_setups[message.guild.id]
             if hasattr(view, 'handle_custom_message'):
@@ -360,7 +412,7 @@ class SupportSystem(commands.Cog):
             if isinstance(ctx, discord.Interaction):
                 await ctx.response.defer(ephemeral=True)
 
-            if not await check_database_connection(self.bot):
+            if not check_database_connection(self.bot):
                 message = "<:icons_Wrong:1382701332955402341> | Database connection failed. Please try again later."
                 if isinstance(ctx, discord.Interaction):
                     await ctx.followup.send(message, ephemeral=True)
@@ -834,6 +886,74 @@ class SupportSystem(commands.Cog):
             else:
                 await ctx.send(error_message, ephemeral=True)
 
+    @commands.hybrid_command(name="set-ratelimit", description="Set how many tickets a user can create within a time window.")
+    @app_commands.describe(
+        burst="Tickets a user can create within the window (1-10)",
+        window="Length of the window in seconds (10-86400)"
+    )
+    @commands.has_permissions(administrator=True)
+    async def set_ratelimit(self, ctx: commands.Context, burst: int, window: int):
+        logger.info(f"Set ratelimit command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}: {burst}/{window}s")
+        try:
+            if isinstance(ctx, discord.Interaction):
+                await ctx.response.defer(ephemeral=True)
+
+            if burst < 1 or burst > 10 or window < 10 or window > 86400:
+                embed = discord.Embed(
+                    title="<:icons_Wrong:1382701332955402341> Invalid Rate Limit",
+                    description="Burst must be between 1 and 10 and the window between 10 and 86400 seconds.",
+                    color=0xFF0000
+                )
+                if isinstance(ctx, discord.Interaction):
+                    await ctx.followup.send(embed=embed, ephemeral=True)
+                else:
+                    await ctx.send(embed=embed, ephemeral=True)
+                return
+
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    "UPDATE tickets SET rate_limit_burst = ?, rate_limit_window = ? WHERE guild_id = ?",
+                    (burst, window, ctx.guild.id)
+                )
+
+                if cur.rowcount == 0:
+                    embed = discord.Embed(
+                        title="<:icons_Wrong:1382701332955402341> Setup Required",
+                        description="Please run `/setup-tickets` first to configure the ticket system.",
+                        color=0xFF0000
+                    )
+                    if isinstance(ctx, discord.Interaction):
+                        await ctx.followup.send(embed=embed, ephemeral=True)
+                    else:
+                        await ctx.send(embed=embed, ephemeral=True)
+                    return
+
+                await self.bot.db.commit()
+
+            self.bot.rate_limiter.set_policy(ctx.guild.id, burst, window)
+
+            current_time = utc_to_gmt(discord.utils.utcnow())
+            embed = discord.Embed(
+                title="<:j_icons_Correct:1382701297987485706> Rate Limit Updated",
+                description=f"**New rate limit:** {burst} ticket(s) per {window} seconds\n\nUsers can now create up to {burst} ticket(s) in any {window} second window.",
+                color=0x00D4FF,
+                timestamp=current_time
+            )
+            embed.set_footer(text=f"Updated at {current_time.strftime('%I:%M %p GMT')}")
+
+            if isinstance(ctx, discord.Interaction):
+                await ctx.followup.send(embed=embed, ephemeral=True)
+            else:
+                await ctx.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in set_ratelimit: {e}")
+            error_message = f"<:icons_Wrong:1382701332955402341> | An error occurred: {e}"
+            if isinstance(ctx, discord.Interaction):
+                await ctx.followup.send(error_message, ephemeral=True)
+            else:
+                await ctx.send(error_message, ephemeral=True)
+
     @commands.hybrid_command(name="reset-categories", description="Reset all ticket categories.")
     @commands.has_permissions(administrator=True)
     async def reset_categories(self, ctx: commands.Context):
@@ -1094,13 +1214,13 @@ class SupportSystem(commands.Cog):
                 return
 
             ticket_creator = ctx.guild.get_member(ticket_info['creator_id'])
-            created_time = discord.utils.parse_time(ticket_info['created_at']) if ticket_info['created_at'] else discord.utils.utcnow()
+            created_time = ticket_info['created_at'] if ticket_info['created_at'] else discord.utils.utcnow()
 
             current_time = utc_to_gmt(discord.utils.utcnow())
 
-            message_count = 0
-            async for _ in ctx.channel.history(limit=None):
-                message_count += 1
+            message_count = await self.bot.ticket_activity.get_message_count(ctx.channel)
+            activity = self.bot.ticket_activity.get(ctx.channel.id)
+            last_activity = discord.utils.format_dt(datetime.fromtimestamp(activity.last_message_at / 1000, timezone.utc), 'R') if activity and activity.last_message_at else "No messages yet"
 
             accessible_users = []
             for member in ctx.guild.members:
@@ -1119,7 +1239,8 @@ class SupportSystem(commands.Cog):
                 name="<:Ticket_icons:1382703084815257610> Ticket Details",
                 value=f"**Number:** #{ticket_info['ticket_number']:04d}\n"
                       f"**Status:** <:j_icons_Correct:1382701297987485706> Open\n"
-                      f"**Messages:** {message_count}",
+                      f"**Messages:** {message_count}\n"
+                      f"**Last Activity:** {last_activity}",
                 inline=True
             )
 
@@ -1170,6 +1291,7 @@ class SupportSystem(commands.Cog):
     @app_commands.describe(name="New name for the ticket channel")
     async def rename_ticket(self, ctx: commands.Context, *, name: str):
         logger.info(f"Rename ticket command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
+        sanitized_name = name
         try:
             if isinstance(ctx, discord.Interaction):
                 await ctx.response.defer(ephemeral=True)
@@ -1274,7 +1396,7 @@ class SupportSystem(commands.Cog):
                     await ctx.send(embed=embed, ephemeral=True)
                 return
 
-            old_name = ctx.channel.name
+            old_name = self.bot.rename_queue.pending_name(ctx.channel)
 
             if old_name == sanitized_name:
                 embed = discord.Embed(
@@ -1316,31 +1438,36 @@ class SupportSystem(commands.Cog):
                 else:
                     await ctx.send(embed=preview_embed, ephemeral=True)
 
-            try:
-                await ctx.channel.edit(
-                    name=sanitized_name, 
-                    reason=f"Ticket renamed by {invoker.display_name} ({invoker.id})"
+            rename_delay = self.bot.rename_queue.request(
+                ctx.channel,
+                sanitized_name,
+                reason=f"Ticket renamed by {invoker.display_name} ({invoker.id})"
+            )
+            outcome = self.bot.rename_queue.outcome(ctx.channel)
+
+            current_time = utc_to_gmt(discord.utils.utcnow())
+
+            if rename_delay > 0:
+                # Discord's rename limit is spent: report the rename when the queue applies it, not now
+                queued_embed = discord.Embed(
+                    title="<:icons_clock:1382701751206936697> Ticket Rename Queued",
+                    description=f"**This channel will be renamed to `{sanitized_name}`**\n\n"
+                               f"Discord limits how often a channel can be renamed, so the new name "
+                               f"will be applied {discord.utils.format_dt(current_time + timedelta(seconds=rename_delay), 'R')}.",
+                    color=0xFF8C00,
+                    timestamp=current_time
                 )
-            except discord.HTTPException as e:
-                error_msg = str(e).lower()
-                if "name" in error_msg or "invalid" in error_msg:
-                    embed = discord.Embed(
-                        title="<:icons_Wrong:1382701332955402341> Invalid Channel Name",
-                        description=f"**Discord rejected the channel name.**\n\n"
-                                   f"**Error:** {str(e)}\n"
-                                   f"**Attempted name:** `{sanitized_name}`\n\n"
-                                   "Please try a different name with only letters, numbers, dashes, and underscores.",
-                        color=0xFF6B6B
+                await ctx.channel.send(embed=queued_embed)
+                asyncio.create_task(self.announce_rename(ctx.channel, outcome, invoker, old_name, sanitized_name))
+                if isinstance(ctx, discord.Interaction):
+                    await ctx.followup.send(
+                        f"<:icons_clock:1382701751206936697> **Rename to `{sanitized_name}` queued**", ephemeral=True
                     )
-                    if isinstance(ctx, discord.Interaction):
-                        await ctx.followup.send(embed=embed, ephemeral=True)
-                    else:
-                        await ctx.send(embed=embed, ephemeral=True)
-                    return
-                else:
-                    raise  # Re-raise if it's not a name-related error
+                return
 
-            current_time = utc_to_gmt(discord.utils.utcnow())
+            if await outcome != sanitized_name:
+                await ctx.channel.send(f"<:icons_Wrong:1382701332955402341> The rename to `{sanitized_name}` was replaced by a newer rename.")
+                return
 
             success_embed = discord.Embed(
                 title="<:j_icons_Correct:1382701297987485706> Ticket Renamed Successfully",
@@ -1349,40 +1476,7 @@ class SupportSystem(commands.Cog):
                 timestamp=current_time
             )
             await ctx.channel.send(embed=success_embed)
-
-            try:
-                log_channel = await get_ticket_log_channel(self.bot, ctx.guild.id)
-                if log_channel:
-                    from utils.tickets import get_ticket_info
-                    ticket_info = await get_ticket_info(self.bot, ctx.channel.id)
-
-                    ticket_number_str = f"#{ticket_info['ticket_number']:04d}" if ticket_info else "#0000"
-
-                    log_embed = discord.Embed(
-                        title="<:clipboard1:1383857546410070117> Ticket Renamed",
-                        description=f"Ticket `{ticket_number_str}` has been renamed by {invoker.mention}",
-                        color=0x00D4FF,
-                        timestamp=current_time
-                    )
-                    log_embed.add_field(
-                        name="Channel Details",
-                        value=f"**Channel:** {ctx.channel.mention} (`{ctx.channel.id}`)\n"
-                              f"**Old Name:** `{old_name}`\n"
-                              f"**New Name:** `{sanitized_name}`",
-                        inline=False
-                    )
-                    log_embed.add_field(
-                        name="Action Details", 
-                        value=f"**Renamed By:** {invoker.display_name} (`{invoker.id}`)\n"
-                              f"**Time:** {discord.utils.format_dt(current_time, 'F')}",
-                        inline=False
-                    )
-                    log_embed.set_footer(text=" Support System • Channel Rename")
-
-                    await log_channel.send(embed=log_embed)
-
-            except Exception as log_error:
-                logger.error(f"Error logging rename action: {log_error}")
+            await self.log_rename(ctx.channel, invoker, old_name, sanitized_name)
 
             confirmation_message = f"<:j_icons_Correct:1382701297987485706> **Ticket successfully renamed to `{sanitized_name}`**"
             if isinstance(ctx, discord.Interaction):
@@ -1411,13 +1505,7 @@ class SupportSystem(commands.Cog):
 
         except discord.HTTPException as e:
             logger.error(f"HTTP error renaming ticket: {e}")
-            embed = discord.Embed(
-                title="<:icons_Wrong:1382701332955402341> Discord API Error",
-                description=f"**Discord rejected the rename request.**\n\n"
-                           f"**Error:** {str(e)}\n\n"
-                           "This might be due to rate limiting or invalid characters. Please try again in a moment.",
-                color=0xFF6B6B
-            )
+            embed = rename_error_embed(e, sanitized_name)
             if isinstance(ctx, discord.Interaction):
                 await ctx.followup.send(embed=embed, ephemeral=True)
             else:
@@ -1440,6 +1528,66 @@ class SupportSystem(commands.Cog):
             else:
                 await ctx.send(embed=embed, ephemeral=True)
 
+    async def announce_rename(self, channel, outcome, invoker, old_name: str, new_name: str):
+        """Report a queued rename in the ticket once Discord has accepted or rejected it"""
+        try:
+            if await outcome != new_name:
+                return
+            embed = discord.Embed(
+                title="<:j_icons_Correct:1382701297987485706> Ticket Renamed Successfully",
+                description=f"**Channel has been renamed to `{new_name}`**",
+                color=0x00FF88,
+                timestamp=utc_to_gmt(discord.utils.utcnow())
+            )
+            await channel.send(embed=embed)
+            await self.log_rename(channel, invoker, old_name, new_name)
+        except asyncio.CancelledError:
+            pass
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            logger.error(f"HTTP error renaming ticket: {e}")
+            try:
+                await channel.send(content=invoker.mention, embed=rename_error_embed(e, new_name))
+            except discord.HTTPException:
+                pass
+
+    async def log_rename(self, channel, invoker, old_name: str, new_name: str):
+        try:
+            log_channel = await get_ticket_log_channel(self.bot, channel.guild.id)
+            if log_channel:
+                from utils.tickets import get_ticket_info
+                ticket_info = await get_ticket_info(self.bot, channel.id)
+
+                ticket_number_str = f"#{ticket_info['ticket_number']:04d}" if ticket_info else "#0000"
+                current_time = utc_to_gmt(discord.utils.utcnow())
+
+                log_embed = discord.Embed(
+                    title="<:clipboard1:1383857546410070117> Ticket Renamed",
+                    description=f"Ticket `{ticket_number_str}` has been renamed by {invoker.mention}",
+                    color=0x00D4FF,
+                    timestamp=current_time
+                )
+                log_embed.add_field(
+                    name="Channel Details",
+                    value=f"**Channel:** {channel.mention} (`{channel.id}`)\n"
+                          f"**Old Name:** `{old_name}`\n"
+                          f"**New Name:** `{new_name}`",
+                    inline=False
+                )
+                log_embed.add_field(
+                    name="Action Details", 
+                    value=f"**Renamed By:** {invoker.display_name} (`{invoker.id}`)\n"
+                          f"**Time:** {discord.utils.format_dt(current_time, 'F')}",
+                    inline=False
+                )
+                log_embed.set_footer(text=" Support System • Channel Rename")
+
+                await log_channel.send(embed=log_embed)
+
+        except Exception as log_error:
+            logger.error(f"Error logging rename action: {log_error}")
+
     @commands.hybrid_command(name="claim", description="Claim the current ticket.")
     async def claim_ticket(self, ctx: commands.Context):
         logger.info(f"Claim ticket command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
@@ -1668,8 +1816,8 @@ class SupportSystem(commands.Cog):
                     return
 
                 await cur.execute(
-                    "INSERT INTO ticket_blacklist (guild_id, user_id, blacklisted_by, blacklisted_at) VALUES (?, ?, ?, ?)",
-                    (ctx.guild.id, user.id, ctx.author.id if isinstance(ctx, commands.Context) else ctx.user.id, discord.utils.utcnow().isoformat())
+                    "INSERT INTO ticket_blacklist (guild_id, user_id, blacklisted_by, blacklisted_at_ms) VALUES (?, ?, ?, ?)",
+                    (ctx.guild.id, user.id, ctx.author.id if isinstance(ctx, commands.Context) else ctx.user.id, now_ms())
                 )
                 await self.bot.db.commit()
 
@@ -1716,7 +1864,7 @@ class SupportSystem(commands.Cog):
 
             async with self.bot.db.cursor() as cur:
                 await cur.execute(
-                    "SELECT blacklisted_by, blacklisted_at FROM ticket_blacklist WHERE guild_id = ? AND user_id = ?",
+                    "SELECT blacklisted_by, blacklisted_at_ms FROM ticket_blacklist WHERE guild_id = ? AND user_id = ?",
                     (ctx.guild.id, user.id)
                 )
                 result = await cur.fetchone()
@@ -1782,7 +1930,7 @@ class SupportSystem(commands.Cog):
 
             async with self.bot.db.cursor() as cur:
                 await cur.execute(
-                    "SELECT user_id, blacklisted_by, blacklisted_at FROM ticket_blacklist WHERE guild_id = ? ORDER BY blacklisted_at DESC",
+                    "SELECT user_id, blacklisted_by, blacklisted_at_ms FROM ticket_blacklist WHERE guild_id = ? ORDER BY blacklisted_at_ms DESC",
                     (ctx.guild.id,)
                 )
                 blacklisted = await cur.fetchall()
@@ -1816,11 +1964,7 @@ class SupportSystem(commands.Cog):
                 user_display = user.mention if user else f"<@{user_id}>"
                 blacklister_display = blacklister.display_name if blacklister else "Unknown"
                 
-                try:
-                    blacklist_date = discord.utils.parse_time(blacklisted_at)
-                    date_display = discord.utils.format_dt(blacklist_date, 'R')
-                except:
-                    date_display = "Unknown date"
+                date_display = discord.utils.format_dt(from_ms(blacklisted_at), 'R') if blacklisted_at else "Unknown date"
                 
                 blacklist_text += f"• {user_display} - by {blacklister_display} {date_display}\n"
 
@@ -2249,6 +2393,244 @@ class SupportSystem(commands.Cog):
             else:
                 await ctx.send(error_message, ephemeral=True)
 
+    @commands.hybrid_command(name="sla-report", description="Show first response and resolution times of recent tickets.")
+    @commands.has_permissions(administrator=True)
+    async def sla_report(self, ctx: commands.Context):
+        logger.info(f"SLA report command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
+        try:
+            if isinstance(ctx, discord.Interaction):
+                await ctx.response.defer(ephemeral=True)
+
+            rollup = await self.bot.sla.get_guild(ctx.guild.id)
+
+            def describe(buckets, key):
+                window = buckets.get(key)
+                if not window:
+                    return "No data"
+                p50, p90, p95 = window.percentiles(50, 90, 95)
+                return f"p50 {format_duration(p50)} • p90 {format_duration(p90)} • p95 {format_duration(p95)} ({len(window)})"
+
+            embed = discord.Embed(
+                title="<:stats_1:1382703019334045830> Support SLA Report",
+                description=f"**Response and resolution times of the last {self.bot.sla.sample_size:,} tickets.**",
+                color=0x00D4FF,
+                timestamp=discord.utils.utcnow()
+            )
+
+            waiting, oldest = self.bot.sla.awaiting_in(ctx.guild.id)
+            embed.add_field(
+                name="<:clipboard1:1383857546410070117> Overall",
+                value=f"• **First Response:** {describe(rollup.first_response, ('all', None))}\n"
+                      f"• **Resolution:** {describe(rollup.resolution, ('all', None))}\n"
+                      f"• **Awaiting Staff:** {waiting}"
+                      f"{f' (oldest {format_duration(time.time() - oldest)})' if oldest else ''}",
+                inline=False
+            )
+
+            for dimension, title in (('priority', "Per Priority"), ('category', "Per Category")):
+                names = sorted({name for kind, name in (*rollup.first_response, *rollup.resolution) if kind == dimension})
+                lines = [
+                    f"**{name}**\n└ Response {describe(rollup.first_response, (dimension, name))}\n"
+                    f"└ Resolution {describe(rollup.resolution, (dimension, name))}"
+                    for name in names[:10]
+                ]
+                embed.add_field(
+                    name=f"<:Target:1382706193855942737> {title}",
+                    value="\n".join(lines)[:1024] if lines else "No data",
+                    inline=False
+                )
+
+            embed.set_footer(text="Support System • Percentiles • (samples)")
+
+            if isinstance(ctx, discord.Interaction):
+                await ctx.followup.send(embed=embed, ephemeral=True)
+            else:
+                await ctx.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in sla_report: {e}")
+            error_message = f"<:icons_Wrong:1382701332955402341> An error occurred: {e}"
+            if isinstance(ctx, discord.Interaction):
+                await ctx.followup.send(error_message, ephemeral=True)
+            else:
+                await ctx.send(error_message, ephemeral=True)
+
+    @commands.hybrid_command(name="ticket-trends", description="Show weekly ticket volume per category and long-range resolution times.")
+    @app_commands.describe(weeks="How many weeks to cover (1-52)")
+    @commands.has_permissions(administrator=True)
+    async def ticket_trends(self, ctx: commands.Context, weeks: int = 12):
+        logger.info(f"Ticket trends command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
+        try:
+            if isinstance(ctx, discord.Interaction):
+                await ctx.response.defer(ephemeral=True)
+
+            snapshot = await self.bot.analytics.get_snapshot()
+            if snapshot is None:
+                await ctx.send("<:icons_Wrong:1382701332955402341> | No analytics snapshot is available yet. Please try again later.", ephemeral=True)
+                return
+
+            weeks = max(1, min(weeks, 52))
+            week_starts, categories, counts = snapshot.weekly_volume(ctx.guild.id, weeks)
+            since = int(week_starts[0])
+
+            # Keep the table inside an embed field: the five busiest categories, everything else folded into Other
+            top = counts.sum(axis=0).argsort()[::-1][:5]
+            other = counts.sum(axis=1) - counts[:, top].sum(axis=1)
+            header = "Week  " + "".join(f"{str(categories[index])[:9]:>10}" for index in top) + f"{'Other':>7}"
+            lines = [
+                datetime.fromtimestamp(int(start), timezone.utc).strftime('%m-%d ') +
+                "".join(f"{int(counts[row, index]):>10}" for index in top) + f"{int(other[row]):>7}"
+                for row, start in enumerate(week_starts)
+            ]
+            table = "\n".join([header, *lines[-15:]])
+
+            embed = discord.Embed(
+                title="<:stats_1:1382703019334045830> Ticket Trends",
+                description=f"**Tickets opened per week over the last {weeks} week(s).**\n```\n{table[:3900]}\n```",
+                color=0x00D4FF,
+                timestamp=discord.utils.utcnow()
+            )
+
+            resolution = snapshot.resolution_by_priority(ctx.guild.id, since)
+            embed.add_field(
+                name="<:clipboard1:1383857546410070117> Resolution Time",
+                value="\n".join(
+                    f"• **{priority}:** p50 {format_duration(p50)} • p90 {format_duration(p90)} ({tickets:,})"
+                    for priority, (tickets, (p50, p90)) in resolution.items()
+                ) or "No closed tickets",
+                inline=False
+            )
+
+            responded, (p50, p90) = snapshot.first_response(ctx.guild.id, since)
+            rated, average, stars = snapshot.ratings(ctx.guild.id, since)
+            embed.add_field(
+                name="<:Target:1382706193855942737> Service",
+                value=f"• **First Response:** p50 {format_duration(p50)} • p90 {format_duration(p90)} ({responded:,})\n"
+                      f"• **Average Rating:** {f'{average:.2f}/5' if average is not None else 'N/A'} ({rated:,})\n"
+                      f"• **Stars 1-5:** {' / '.join(str(count) for count in stars)}",
+                inline=False
+            )
+
+            embed.set_footer(text="Support System • Analytics snapshot")
+            embed.add_field(
+                name="Snapshot",
+                value=f"Taken {discord.utils.format_dt(datetime.fromtimestamp(snapshot.snapshot_at, timezone.utc), 'R')}",
+                inline=False
+            )
+
+            await ctx.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in ticket_trends: {e}")
+            await ctx.send(f"<:icons_Wrong:1382701332955402341> An error occurred: {e}", ephemeral=True)
+
+    @commands.hybrid_command(name="export-tickets", description="Export this server's tickets and ratings as compressed files.")
+    @app_commands.describe(
+        file_format="CSV for spreadsheets, JSON Lines for scripts",
+        since="First day to include (YYYY-MM-DD)",
+        until="Last day to include (YYYY-MM-DD)"
+    )
+    @app_commands.choices(file_format=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="JSON Lines", value="jsonl")
+    ])
+    @commands.has_permissions(administrator=True)
+    async def export_tickets(self, ctx: commands.Context, file_format: str = "csv", since: Optional[str] = None, until: Optional[str] = None):
+        logger.info(f"Export tickets command invoked by {ctx.author if isinstance(ctx, commands.Context) else ctx.user}")
+        try:
+            if isinstance(ctx, discord.Interaction):
+                await ctx.response.defer(ephemeral=True)
+
+            try:
+                since_date, until_date = parse_date(since), parse_date(until)
+            except ValueError:
+                await ctx.send("<:icons_Wrong:1382701332955402341> | Dates must use the YYYY-MM-DD format.", ephemeral=True)
+                return
+
+            if file_format not in ("csv", "jsonl"):
+                await ctx.send("<:icons_Wrong:1382701332955402341> | Format must be `csv` or `jsonl`.", ephemeral=True)
+                return
+
+            running = self.export_tasks.get(ctx.guild.id)
+            if running and not running.done():
+                await ctx.send("<:icons_Wrong:1382701332955402341> | An export for this server is already running.", ephemeral=True)
+                return
+
+            self.export_tasks[ctx.guild.id] = asyncio.create_task(
+                self.run_export(ctx, file_format, since_date, until_date)
+            )
+
+            # Prefix commands cannot reply privately in the channel, so their files go by DM
+            delivery = "posted here, visible only to you" if ctx.interaction else "sent to you by direct message"
+            embed = discord.Embed(
+                title="<:clipboard1:1383857546410070117> Export Started",
+                description=f"**Exporting tickets and ratings as gzip-compressed {file_format.upper()}.**\n\n"
+                            f"**From:** {since or 'the first ticket'}\n"
+                            f"**Until:** {until or 'today'}\n\n"
+                            f"The files will be {delivery} when the export finishes.",
+                color=0x00D4FF,
+                timestamp=discord.utils.utcnow()
+            )
+            embed.set_footer(text="Support System • Export")
+            await ctx.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in export_tickets: {e}")
+            await ctx.send(f"<:icons_Wrong:1382701332955402341> An error occurred: {e}", ephemeral=True)
+
+    async def run_export(self, ctx: commands.Context, file_format: str, since_date, until_date):
+        """Runs in the background; the rows never sit in memory, only the finished files are uploaded"""
+        directory = tempfile.mkdtemp(prefix='ticket-export-')
+        try:
+            started = time.perf_counter()
+            writers = await export_guild(self.bot.db, ctx.guild.id, directory, file_format, since_date, until_date)
+            size = sum(os.path.getsize(writer.path) for writer in writers)
+
+            summary = "\n".join(f"• **{os.path.basename(writer.path)}:** {writer.rows:,} rows" for writer in writers)
+            # Boosted servers allow bigger uploads than direct messages do
+            limit = ctx.guild.filesize_limit if ctx.interaction else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+            if size > limit:
+                await self.deliver_export(ctx, content=(
+                    f"<:icons_Wrong:1382701332955402341> | The export is {size / 1e6:.1f} MB, over the "
+                    f"{limit / 1e6:.0f} MB upload limit. Narrow the date range and try again.\n{summary}"
+                ))
+                return
+
+            await self.deliver_export(
+                ctx,
+                content=f"<:j_icons_Correct:1382701297987485706> **Export finished in {time.perf_counter() - started:.1f}s**\n{summary}",
+                files=[discord.File(writer.path, filename=os.path.basename(writer.path)) for writer in writers]
+            )
+        except Exception as e:
+            logger.error(f"Error exporting tickets for guild {ctx.guild.id}: {e}")
+            await self.deliver_export(ctx, content=f"<:icons_Wrong:1382701332955402341> | The export failed: {e}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+            self.export_tasks.pop(ctx.guild.id, None)
+
+    async def deliver_export(self, ctx: commands.Context, **kwargs):
+        """Reply ephemerally to a slash command; DM the invoker for a prefix command or once the interaction token has expired"""
+        if ctx.interaction is not None:
+            try:
+                await ctx.send(ephemeral=True, **kwargs)
+                return
+            except discord.HTTPException:
+                for file in kwargs.get('files', ()):
+                    file.reset()
+
+        try:
+            await ctx.author.send(**kwargs)
+        except discord.HTTPException as e:
+            logger.error(f"Could not deliver ticket export to {ctx.author}: {e}")
+            if ctx.interaction is None:
+                try:
+                    await ctx.send(
+                        f"<:icons_Wrong:1382701332955402341> | {ctx.author.mention}, I couldn't DM you the export. "
+                        f"Allow direct messages from this server and run the command again."
+                    )
+                except discord.HTTPException:
+                    pass
+
     @commands.hybrid_command(name="priority", description="Change the priority of the current ticket.")
     @app_commands.describe(priority="Priority level to set")
     @app_commands.choices(priority=[
@@ -2309,61 +2691,23 @@ class SupportSystem(commands.Cog):
             
             priority_emoji = priority_emojis.get(priority, "🟡")
 
-            current_name = ctx.channel.name
+            current_name = self.bot.rename_queue.pending_name(ctx.channel)
             clean_name = re.sub(r'^[🟢🟡🟠🔴]\s*', '', current_name)
             new_name = f"{priority_emoji} {clean_name}"
-            
-            try:
-                await ctx.channel.edit(
-                    name=new_name,
-                    reason=f"Priority changed to {priority} by {invoker.display_name}"
-                )
-            except discord.HTTPException as e:
-                logger.warning(f"Could not rename channel: {e}")
 
-            try:
-                async for message in ctx.channel.history(limit=50):
-                    if (message.author == self.bot.user and 
-                        message.embeds and 
-                        len(message.embeds) > 0 and
-                        ("Support Ticket" in message.embeds[0].title or "Ticket" in message.embeds[0].title) and
-                        message.components):
-                        
-                        embed = discord.Embed(
-                            title=message.embeds[0].title,
-                            description=message.embeds[0].description,
-                            color=message.embeds[0].color,
-                            timestamp=message.embeds[0].timestamp
-                        )
-                        
-                        for field in message.embeds[0].fields:
-                            if "Ticket Information" in field.name:
-                                field_lines = field.value.split('\n')
-                                updated_lines = []
-                                for line in field_lines:
-                                    if line.startswith('**Priority:**'):
-                                        updated_lines.append(f"**Priority:** {priority_emoji} {priority}")
-                                    else:
-                                        updated_lines.append(line)
-                                embed.add_field(name=field.name, value='\n'.join(updated_lines), inline=field.inline)
-                            else:
-                                embed.add_field(name=field.name, value=field.value, inline=field.inline)
-                        
-                        if message.embeds[0].image:
-                            embed.set_image(url=message.embeds[0].image.url)
-                        if message.embeds[0].footer:
-                            embed.set_footer(text=message.embeds[0].footer.text, icon_url=message.embeds[0].footer.icon_url)
-                        if message.embeds[0].thumbnail:
-                            embed.set_thumbnail(url=message.embeds[0].thumbnail.url)
-                        
-                        from views.ticket_views import TicketControlView
-                        fresh_view = TicketControlView(self.bot, {'priority': priority}, priority_used=True)
-                        await message.edit(embed=embed, view=fresh_view)
-                        logger.info(f"Successfully updated control panel embed with new priority: {priority}")
-                        break
-                        
-            except Exception as edit_error:
-                logger.warning(f"Could not update control menu embed: {edit_error}")
+            self.bot.rename_queue.request(
+                ctx.channel,
+                new_name,
+                reason=f"Priority changed to {priority} by {invoker.display_name}"
+            )
+
+            from utils.tickets import update_ticket_control_message
+            from views.ticket_views import TicketControlView
+            fresh_view = TicketControlView(self.bot, {'priority': priority}, priority_used=True)
+            if await update_ticket_control_message(self.bot, ctx.channel, fresh_view):
+                logger.info(f"Successfully updated control panel embed with new priority: {priority}")
+            else:
+                logger.warning(f"Could not update control menu embed for channel {ctx.channel.id}")
 
             embed = discord.Embed(
                 title=f"<:j_icons_Correct:1382701297987485706> Priority Updated",
@@ -3,6 +3,8 @@ from discord.ext import commands
 from discord import app_commands
 import aiosqlite
 import logging
+from utils.config import config
+from utils.instrumented_db import instrument_connection
 
 logger = logging.getLogger('discord')
 
@@ -16,9 +18,14 @@ class TriggerSystem(commands.Cog):
         """Setup the triggers database"""
         try:
             if not self.triggers_db:
-                self.triggers_db = await aiosqlite.connect('triggers.db')
+                self.triggers_db = instrument_connection(await aiosqlite.connect('triggers.db'), 'triggers')
 
             async with self.triggers_db.cursor() as cur:
+                # Must come before the WAL switch, which writes the file header
+                await cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                if config.DATABASE_WAL:
+                    await cur.execute("PRAGMA journal_mode = WAL")
+
                 await cur.execute("""
                     CREATE TABLE IF NOT EXISTS triggers (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
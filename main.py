@@ -1,12 +1,31 @@
+import sys
+from utils.startup_profiler import startup_profiler
+
+if __name__ == "__main__" and '--profile-startup' in sys.argv:
+    startup_profiler.install()
+
 import discord
 from discord.ext import commands
-import aiosqlite
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 from utils.config import config
+from utils.stats import StatsCache
+from utils.activity import TicketActivityTracker
+from utils.rename_queue import ChannelRenameQueue
+from utils.rate_limiter import SlidingWindowRateLimiter
+from utils.sla import SLATracker
+from utils.analytics import AnalyticsSnapshotter
+from utils.archive import TicketArchiver, ARCHIVE_TABLE_SQL
+from utils.maintenance import DatabaseMaintenance
+from utils.backup import BackupManager
+from utils.metrics import metrics, COMMAND_LATENCY, create_http_trace, register_bot_gauges
+from utils.db_supervisor import DatabaseSupervisor
+from utils.interaction_tracer import InteractionTracer
+from utils.loop_monitor import LoopLagMonitor
 
 load_dotenv()
 
@@ -18,8 +37,6 @@ logging.getLogger('discord.http').setLevel(logging.CRITICAL)
 logger = logging.getLogger('discord')
 
 def print_bot_ready(bot_name):
-    ascii_art = """
-    print(ascii_art)
     print(f"\033[92mLogin successful logged in as {bot_name}\033[0m")
 
 def print_error(message):
@@ -57,21 +74,79 @@ class TicketBot(commands.Bot):
             intents=intents,
             help_command=None,
             heartbeat_timeout=60.0,
-            chunk_guilds_at_startup=False
+            chunk_guilds_at_startup=False,
+            http_trace=create_http_trace()
         )
 
         self.db = None
+        self.db_supervisor = DatabaseSupervisor(
+            self, config.DATABASE_PATH, 'bot', config.DATABASE_RECONNECT_MIN_BACKOFF, config.DATABASE_RECONNECT_MAX_BACKOFF,
+            config.DATABASE_BREAKER_THRESHOLD, config.DATABASE_BREAKER_WINDOW
+        )
         self.triggers_db = None
         self.active_setups = {}
         self.start_time = datetime.now()
+        self.stats_cache = StatsCache(self, config.TICKET_COUNTER_RECONCILE_INTERVAL)
+        self.ticket_activity = TicketActivityTracker(self, config.ACTIVITY_FLUSH_INTERVAL)
+        self.rename_queue = ChannelRenameQueue(self)
+        self.rate_limiter = SlidingWindowRateLimiter(self, config.RATE_LIMIT_SNAPSHOT_INTERVAL)
+        self.sla = SLATracker(self, config.SLA_SAMPLE_SIZE)
+        self.analytics = AnalyticsSnapshotter(config.DATABASE_PATH, config.ANALYTICS_SNAPSHOT_PATH, config.ANALYTICS_SNAPSHOT_INTERVAL)
+        self.ticket_archiver = TicketArchiver(
+            self, config.TICKET_ARCHIVE_AFTER_DAYS, config.TICKET_ARCHIVE_BATCH_SIZE, config.TICKET_ARCHIVE_INTERVAL
+        )
+        self.maintenance = DatabaseMaintenance(
+            self, config.MAINTENANCE_INTERVAL, config.MAINTENANCE_WINDOW, config.MAINTENANCE_BUDGET_SECONDS,
+            config.MAINTENANCE_VACUUM_MAX_MB
+        )
+        self.backups = BackupManager(
+            self, config.BACKUP_DIRECTORY, config.BACKUP_INTERVAL, config.BACKUP_RETENTION,
+            config.BACKUP_PAGES_PER_STEP, config.BACKUP_STEP_PAUSE
+        )
+
+        self.loop_monitor = LoopLagMonitor(
+            interval=config.LOOP_MONITOR_INTERVAL,
+            debug=config.LOOP_BLOCKING_DEBUG,
+            threshold_ms=config.LOOP_BLOCKING_THRESHOLD_MS
+        )
+        self.interaction_tracer = InteractionTracer(
+            self,
+            auto_defer=config.AUTO_DEFER_ENABLED,
+            budget=config.AUTO_DEFER_BUDGET,
+            exclude=config.AUTO_DEFER_EXCLUDE
+        )
+        if config.INTERACTION_TRACING:
+            self.interaction_tracer.install()
+
+        if config.METRICS_ENABLED:
+            self.before_invoke(self.start_command_timer)
+            self.after_invoke(self.observe_command_latency)
+
+    async def start_command_timer(self, ctx):
+        ctx.started_at = time.perf_counter()
+
+    async def observe_command_latency(self, ctx):
+        started_at = getattr(ctx, 'started_at', None)
+        if started_at is not None:
+            COMMAND_LATENCY.observe(
+                time.perf_counter() - started_at,
+                ctx.command.qualified_name,
+                'error' if ctx.command_failed else 'ok'
+            )
 
     async def setup_database(self):
         try:
             print_loading("Database initialization")
             if not self.db:
-                self.db = await aiosqlite.connect('bot.db')
+                self.db = await self.db_supervisor.open()
 
             async with self.db.cursor() as cur:
+                # Only takes effect on a new file, and only before the WAL switch writes its header;
+                # older files are switched over by the maintenance task
+                await cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                if config.DATABASE_WAL:
+                    await cur.execute("PRAGMA journal_mode = WAL")
+
                 await cur.execute("""
                     CREATE TABLE IF NOT EXISTS tickets (
                         guild_id INTEGER PRIMARY KEY,
@@ -89,9 +164,11 @@ class TicketBot(commands.Bot):
                 """)
 
                 await cur.execute("""
-                    CREATE TABLE IF NOT EXISTS rate_limits (
-                        user_id INTEGER PRIMARY KEY,
-                        last_ticket_time REAL
+                    CREATE TABLE IF NOT EXISTS rate_limit_hits (
+                        bucket TEXT,
+                        guild_id INTEGER,
+                        user_id INTEGER,
+                        hit_at REAL
                     )
                 """)
 
@@ -120,6 +197,8 @@ class TicketBot(commands.Bot):
                         ticket_number INTEGER,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         closed_at TIMESTAMP,
+                        created_at_ms INTEGER,
+                        closed_at_ms INTEGER,
                         FOREIGN KEY (guild_id) REFERENCES tickets (guild_id)
                     )
                 """)
@@ -132,7 +211,22 @@ class TicketBot(commands.Bot):
                         user_id INTEGER,
                         rating INTEGER,
                         feedback TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        created_at_ms INTEGER
+                    )
+                """)
+
+                await cur.execute(ARCHIVE_TABLE_SQL)
+
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS guild_ticket_counters (
+                        guild_id INTEGER PRIMARY KEY,
+                        open_count INTEGER NOT NULL DEFAULT 0,
+                        closed_count INTEGER NOT NULL DEFAULT 0,
+                        categories INTEGER NOT NULL DEFAULT 0,
+                        resolution_seconds REAL NOT NULL DEFAULT 0,
+                        resolved INTEGER NOT NULL DEFAULT 0,
+                        reconciled_at TIMESTAMP
                     )
                 """)
 
@@ -158,14 +252,38 @@ class TicketBot(commands.Bot):
 
     async def setup_hook(self):
         try:
-            await self.setup_database()
+            startup_profiler.mark("login")
+            self.loop_monitor.start()
+            with startup_profiler.phase("database"):
+                await self.setup_database()
+
+            with startup_profiler.phase("activity, SLA & rate limit state"):
+                await self.ticket_activity.load()
+                self.ticket_activity.start()
+                await self.sla.load()
+                await self.rate_limiter.load()
+                self.rate_limiter.start()
+                self.stats_cache.start()
+                self.ticket_archiver.start()
+                self.maintenance.start()
+                self.backups.start()
+                self.analytics.start()
+
+            if config.METRICS_ENABLED:
+                try:
+                    with startup_profiler.phase("metrics endpoint"):
+                        await metrics.start_server(config.METRICS_HOST, config.METRICS_PORT)
+                        register_bot_gauges(self)
+                except Exception as e:
+                    print_error(f"Failed to start metrics endpoint: {e}")
 
             print_loading("Loading modules")
-            extensions = ['cogs.tickets', 'cogs.help', 'cogs.triggers', 'cogs.on_mention', 'utils.error_handler']
+            extensions = ['cogs.tickets', 'cogs.help', 'cogs.triggers', 'cogs.on_mention', 'cogs.diagnostics', 'utils.error_handler']
 
             for extension in extensions:
                 try:
-                    await self.load_extension(extension)
+                    with startup_profiler.phase(f"load {extension}"):
+                        await self.load_extension(extension)
                     print_success(f"✓ {extension} loaded")
                 except Exception as e:
                     print_error(f"✗ Failed to load {extension}: {e}")
@@ -180,72 +298,65 @@ class TicketBot(commands.Bot):
 
 
     async def on_ready(self):
+        first_ready = startup_profiler.time_to_ready is None
         try:
+            if first_ready:
+                startup_profiler.mark("gateway connect")
             print_loading("Initializing persistent views")
-            from views.panel_views import TicketPanelView
-            from views.ticket_views import TicketControlView
-            from utils.author_info import UserAvatarView
-            from utils.rating_system import RatingView
+            with startup_profiler.phase("persistent views"):
+                from views.panel_views import TicketPanelView
+                from views.ticket_views import TicketControlView
 
-            self.add_view(TicketControlView(self, {}))
+                self.add_view(TicketControlView(self, {}))
             print_success("Views registered")
 
             print_loading("Syncing guild configurations")
-            for guild in self.guilds:
-                try:
-                    from utils.database import get_ticket_categories
-                    categories = await get_ticket_categories(self, guild.id)
-                    if categories:
-                        try:
-                            if len(categories) > 0:  # Only create view if categories exist
-                                panel_view = TicketPanelView(self, categories, guild.id)
-                                if panel_view.children and all(hasattr(item, 'custom_id') and item.custom_id for item in panel_view.children):
-                                    self.add_view(panel_view)
-                        except Exception as view_error:
-                            logger.warning(f"Skipping panel view for guild {guild.id}: {view_error}")
-
-                    async with self.db.cursor() as cur:
-                        await cur.execute("""
-                            SELECT DISTINCT t.ticket_number, t.creator_id, t.guild_id 
-                            FROM ticket_instances t
-                            LEFT JOIN ticket_ratings r ON t.guild_id = r.guild_id 
-                                AND t.ticket_number = r.ticket_number 
-                                AND t.creator_id = r.user_id
-                            WHERE t.guild_id = ? AND t.status = 'closed' AND r.rating IS NULL
-                        """, (guild.id,))
-                        unrated_tickets = await cur.fetchall()
-
-                        for ticket_number, creator_id, guild_id in unrated_tickets:
+            with startup_profiler.phase(f"guild sync ({len(self.guilds)} guilds)"):
+                for guild in self.guilds:
+                    try:
+                        from utils.database import get_ticket_categories
+                        categories = await get_ticket_categories(self, guild.id)
+                        if categories:
                             try:
-                                rating_view = RatingView(self, ticket_number, creator_id, "Support Staff", guild_id)
-                                rating_view._timeout = None
-                                rating_view.timeout = None
-                                self.add_view(rating_view)
-                                logger.info(f"Registered persistent rating view for unrated ticket #{ticket_number:04d}")
-                            except Exception as rating_error:
-                                logger.warning(f"Skipping rating view for ticket {ticket_number}: {rating_error}")
-
-                except Exception as e:
-                    logger.warning(f"Guild {guild.id} sync failed: {e}")
+                                if len(categories) > 0:  # Only create view if categories exist
+                                    panel_view = TicketPanelView(self, categories, guild.id)
+                                    if panel_view.children and all(hasattr(item, 'custom_id') and item.custom_id for item in panel_view.children):
+                                        self.add_view(panel_view)
+                            except Exception as view_error:
+                                logger.warning(f"Skipping panel view for guild {guild.id}: {view_error}")
+
+                        async with self.db.cursor() as cur:
+                            await cur.execute("""
+                                SELECT DISTINCT t.ticket_number, t.creator_id, t.guild_id 
+                                FROM ticket_instances t
+                                LEFT JOIN ticket_ratings r ON t.guild_id = r.guild_id 
+                                    AND t.ticket_number = r.ticket_number 
+                                    AND t.creator_id = r.user_id
+                                WHERE t.guild_id = ? AND t.status = 'closed' AND r.rating IS NULL
+                            """, (guild.id,))
+                            unrated_tickets = await cur.fetchall()
+
+                            if unrated_tickets:
+                                # The rating module is only needed once a closed ticket is still waiting for a rating
+                                from utils.rating_system import RatingView
+
+                            for ticket_number, creator_id, guild_id in unrated_tickets:
+                                try:
+                                    rating_view = RatingView(self, ticket_number, creator_id, "Support Staff", guild_id)
+                                    rating_view._timeout = None
+                                    rating_view.timeout = None
+                                    self.add_view(rating_view)
+                                    logger.info(f"Registered persistent rating view for unrated ticket #{ticket_number:04d}")
+                                except Exception as rating_error:
+                                    logger.warning(f"Skipping rating view for ticket {ticket_number}: {rating_error}")
+
+                    except Exception as e:
+                        logger.warning(f"Guild {guild.id} sync failed: {e}")
             print_success("Guild configurations synced")
 
             print_loading("Synchronizing slash commands")
-            try:
-                synced = await asyncio.wait_for(self.tree.sync(), timeout=30.0)
-                print_success(f"Commands synchronized ({len(synced)} commands)")
-
-                for cmd in synced:
-                    logger.info(f"Synced command: /{cmd.name}")
-
-            except asyncio.TimeoutError:
-                print_error("Command sync timed out - bot will continue running")
-            except discord.HTTPException as e:
-                if "429" in str(e):
-                    print_error("Rate limited during command sync - commands will sync later")
-                else:
-                    print_error(f"Command sync failed: {e}")
-            except Exception as e:
-                print_error(f"Command sync failed: {e}")
+            with startup_profiler.phase("command sync"):
+                await self.sync_command_tree()
 
             try:
                 status_type = config.BOT_STATUS_TYPE
@@ -279,7 +390,8 @@ class TicketBot(commands.Bot):
                 elif config.BOT_STATUS_TYPE == 'INVISIBLE':
                     status = discord.Status.invisible
 
-                await self.change_presence(activity=activity, status=status)
+                with startup_profiler.phase("presence"):
+                    await self.change_presence(activity=activity, status=status)
                 print_success(f"Bot status set: {config.BOT_STATUS} ({status_type})")
             except Exception as status_error:
                 print_error(f"Failed to set bot status: {status_error}")
@@ -292,9 +404,61 @@ class TicketBot(commands.Bot):
             if hasattr(self, 'user') and self.user:
                 print_bot_ready(self.user.name)
 
+        if first_ready:
+            self.report_startup()
+
+    async def sync_command_tree(self):
+        """Upload the command tree on every ready; Discord keeps whatever was uploaded last"""
+        try:
+            synced = await asyncio.wait_for(self.tree.sync(), timeout=30.0)
+            print_success(f"Commands synchronized ({len(synced)} commands)")
+
+            for cmd in synced:
+                logger.info(f"Synced command: /{cmd.name}")
+
+        except asyncio.TimeoutError:
+            print_error("Command sync timed out - bot will continue running")
+        except discord.HTTPException as e:
+            if "429" in str(e):
+                print_error("Rate limited during command sync - commands will sync later")
+            else:
+                print_error(f"Command sync failed: {e}")
+        except Exception as e:
+            print_error(f"Command sync failed: {e}")
+
+    def report_startup(self):
+        time_to_ready = startup_profiler.mark_ready()
+        budget = config.STARTUP_BUDGET_SECONDS
+        if time_to_ready <= budget:
+            print_success(f"Ready in {time_to_ready:.2f}s (budget {budget:.0f}s)")
+        else:
+            print_error(f"Ready in {time_to_ready:.2f}s - {time_to_ready - budget:.2f}s over the {budget:.0f}s startup budget")
+
+        if startup_profiler.enabled:
+            print(startup_profiler.report(budget))
+            try:
+                startup_profiler.write_history(config.STARTUP_PROFILE_LOG, budget, guilds=len(self.guilds), discord_py=discord.__version__)
+                print_success(f"Startup profile appended to {config.STARTUP_PROFILE_LOG}")
+            except OSError as e:
+                print_error(f"Could not write startup profile: {e}")
+
     async def close(self):
         print_loading("Shutting down bot")
 
+        self.loop_monitor.stop()
+        await self.rename_queue.stop()
+        await metrics.stop_server()
+
+        await self.db_supervisor.stop()
+        if self.db:
+            await self.ticket_activity.stop()
+            await self.rate_limiter.stop()
+            await self.stats_cache.stop()
+            await self.ticket_archiver.stop()
+            await self.maintenance.stop()
+            await self.backups.stop()
+            await self.analytics.stop()
+
         if hasattr(self, 'db') and self.db:
             try:
                 await self.db.close()
@@ -329,6 +493,7 @@ if __name__ == "__main__":
         exit(1)
 
     print("Bot logging in...")
+    startup_profiler.mark("imports")
 
     try:
         asyncio.run(bot.start(config.TOKEN))
@@ -340,4 +505,5 @@ if __name__ == "__main__":
     except Exception as e:
         print_error(f"Bot failed to start: {e}")
     finally:
+        config.shutdown_logging()
         print_success("Bot process ended")
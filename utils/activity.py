@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger('discord')
+
+class TicketActivity:
+    __slots__ = ('message_count', 'last_message_at')
+
+    def __init__(self, message_count=0, last_message_at=None):
+        self.message_count = message_count
+        self.last_message_at = last_message_at
+
+class TicketActivityTracker:
+    """Per-ticket message counters kept in memory and flushed to SQLite periodically"""
+
+    def __init__(self, bot, flush_interval: int = 30):
+        self.bot = bot
+        self.flush_interval = flush_interval
+        self.tickets = {}
+        self.dirty = set()
+        self.hits = 0
+        self.misses = 0
+        self._task = None
+
+    async def load(self):
+        """Load counters for every open ticket so on_message lookups never touch the database"""
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    "SELECT channel_id, message_count, last_message_at FROM ticket_instances WHERE status = 'open'"
+                )
+                rows = await cur.fetchall()
+
+            self.tickets = {
+                channel_id: TicketActivity(message_count, last_message_at)
+                for channel_id, message_count, last_message_at in rows
+            }
+            logger.info(f"Loaded activity counters for {len(self.tickets)} open tickets")
+        except Exception as e:
+            logger.error(f"Error loading ticket activity counters: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def track(self, channel_id: int):
+        """Start counting a newly created ticket"""
+        self.tickets[channel_id] = TicketActivity(0, None)
+
+    def record_message(self, message) -> bool:
+        activity = self.tickets.get(message.channel.id)
+        if activity is None:
+            return False
+
+        if activity.message_count is not None:
+            activity.message_count += 1
+        activity.last_message_at = int(message.created_at.timestamp() * 1000)
+        self.dirty.add(message.channel.id)
+        return True
+
+    def get(self, channel_id: int) -> Optional[TicketActivity]:
+        return self.tickets.get(channel_id)
+
+    async def get_message_count(self, channel) -> int:
+        """Return the message count of a ticket, counting its history once if it predates tracking"""
+        activity = self.tickets.get(channel.id)
+        if activity is None:
+            activity = TicketActivity(None, None)
+            self.tickets[channel.id] = activity
+
+        if activity.message_count is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            message_count = 0
+            async for _ in channel.history(limit=None):
+                message_count += 1
+            activity.message_count = message_count
+            self.dirty.add(channel.id)
+
+        return activity.message_count
+
+    async def forget(self, channel_id: int):
+        """Persist the final counters of a closed ticket and stop tracking it"""
+        await self.flush([channel_id])
+        self.tickets.pop(channel_id, None)
+
+    async def flush(self, channel_ids=None):
+        if channel_ids is None:
+            channel_ids = list(self.dirty)
+        else:
+            channel_ids = [channel_id for channel_id in channel_ids if channel_id in self.dirty]
+
+        if not channel_ids:
+            return
+
+        rows = []
+        for channel_id in channel_ids:
+            self.dirty.discard(channel_id)
+            activity = self.tickets.get(channel_id)
+            if activity is not None:
+                rows.append((activity.message_count, activity.last_message_at, channel_id))
+
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.executemany(
+                    "UPDATE ticket_instances SET message_count = ?, last_message_at = ? WHERE channel_id = ?",
+                    rows
+                )
+                await self.bot.db.commit()
+        except Exception as e:
+            self.dirty.update(channel_ids)
+            logger.error(f"Error flushing ticket activity counters: {e}")
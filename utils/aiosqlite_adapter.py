@@ -0,0 +1,53 @@
+import sqlite3
+
+import aiosqlite
+from aiosqlite.context import contextmanager
+
+# The bot reaches into aiosqlite in a few places that its public API does not cover: running a function on the
+# connection's worker thread, the sqlite3 connection itself, and a hook around every queued operation. All of
+# it goes through this module, so an aiosqlite upgrade that moves these internals needs changes here only.
+PRIVATE_MEMBERS = ('_execute', '_conn')
+
+missing = [name for name in PRIVATE_MEMBERS if not hasattr(aiosqlite.Connection, name)]
+if missing:
+    raise ImportError(
+        f"aiosqlite {getattr(aiosqlite, '__version__', '?')} has no Connection.{', Connection.'.join(missing)}; "
+        f"update utils/aiosqlite_adapter.py for this version"
+    )
+
+__all__ = ['contextmanager', 'unwrap', 'sqlite_connection', 'run_in_connection_thread', 'HookedConnection']
+
+def unwrap(conn) -> aiosqlite.Connection:
+    """The aiosqlite connection behind a wrapper such as InstrumentedConnection"""
+    while not isinstance(conn, aiosqlite.Connection):
+        conn = conn._conn
+    return conn
+
+def sqlite_connection(conn) -> sqlite3.Connection:
+    """The sqlite3 connection behind an aiosqlite or wrapped connection; only touch it on the connection's thread"""
+    return unwrap(conn)._conn
+
+async def run_in_connection_thread(conn, fn, *args, **kwargs):
+    """Run fn on the connection's worker thread, queued behind the statements already waiting there"""
+    return await unwrap(conn)._execute(fn, *args, **kwargs)
+
+class HookedConnection(aiosqlite.Connection):
+    """aiosqlite connection with hooks around every statement, fetch and commit it queues"""
+
+    def before_execute(self):
+        pass
+
+    def execute_failed(self, error: Exception):
+        pass
+
+    async def _execute(self, fn, *args, **kwargs):
+        self.before_execute()
+        try:
+            return await super()._execute(fn, *args, **kwargs)
+        except Exception as e:
+            self.execute_failed(e)
+            raise
+
+    async def run_unhooked(self, fn, *args, **kwargs):
+        """Run fn on the worker thread without the hooks"""
+        return await super()._execute(fn, *args, **kwargs)
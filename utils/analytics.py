@@ -0,0 +1,212 @@
+import array
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger('discord')
+
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+WEEK = 7 * 86400
+# The Unix epoch was a Thursday; weeks in reports start on Monday
+WEEK_OFFSET = 4 * 86400
+CHUNK_ROWS = 5000
+
+# Each chunk is its own short statement, so the read lock on bot.db is only held for a few milliseconds at a time
+TICKET_CHUNK_SQL = """
+    SELECT id, guild_id, created_at_ms / 1000, IFNULL(closed_at_ms / 1000, -1),
+        status = 'closed', IFNULL(priority, 'Medium'), IFNULL(category, 'Unknown'),
+        IFNULL((first_staff_response_at - created_at_ms) / 1000.0, -1.0)
+    FROM {table}
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+RATING_CHUNK_SQL = """
+    SELECT id, guild_id, created_at_ms / 1000, rating
+    FROM ticket_ratings
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+
+def available() -> bool:
+    return np is not None
+
+def _read_table(conn, sql: str, typecodes, columns=None, dictionaries=None):
+    """Page through a table by primary key, the first column, into one typed array per column; text columns are
+    dictionary encoded. Pass the columns and dictionaries of an earlier call to append another table with the same shape."""
+    if columns is None:
+        columns = [array.array(typecode) if typecode != 'text' else [] for typecode in typecodes]
+        dictionaries = [{} if typecode == 'text' else None for typecode in typecodes]
+    last_id = 0
+    while True:
+        rows = conn.execute(sql, (last_id, CHUNK_ROWS)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for index, values in enumerate(zip(*rows)):
+            target, dictionary = columns[index], dictionaries[index]
+            if dictionary is None:
+                target.extend(value if value is not None else -1 for value in values)
+            else:
+                target.extend(dictionary.setdefault(value, len(dictionary)) for value in values)
+    return columns, dictionaries
+
+def build_snapshot(database_path: str, snapshot_path: str) -> int:
+    """Copy tickets and ratings into a compressed .npz of typed column arrays; runs in a worker thread"""
+    conn = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    try:
+        ticket_typecodes = ('q', 'q', 'q', 'q', 'b', 'text', 'text', 'd')
+        tickets, ticket_dictionaries = _read_table(conn, TICKET_CHUNK_SQL.format(table='ticket_instances'), ticket_typecodes)
+        _read_table(conn, TICKET_CHUNK_SQL.format(table='ticket_archive'), ticket_typecodes, tickets, ticket_dictionaries)
+        ratings, _ = _read_table(conn, RATING_CHUNK_SQL, ('q', 'q', 'q', 'b'))
+    finally:
+        conn.close()
+
+    # The archiver can move a ticket between the two passes, and archived rows keep their id; keep the first copy read
+    _, keep = np.unique(np.asarray(tickets[0], dtype=np.int64), return_index=True)
+    keep.sort()
+    _, guild_id, created, closed, is_closed, priority, category, first_response = (
+        np.asarray(column)[keep] for column in tickets
+    )
+    priority_names = list(ticket_dictionaries[5])
+    categories = list(ticket_dictionaries[6])
+    # Store priorities as indexes into PRIORITIES so reports can order them, unknown names sort last
+    priority_codes = np.array(
+        [PRIORITIES.index(name) if name in PRIORITIES else len(PRIORITIES) for name in priority_names], dtype=np.int8
+    )
+
+    temporary_path = f"{snapshot_path}.tmp.npz"
+    np.savez_compressed(
+        temporary_path,
+        snapshot_at=np.array(int(time.time()), dtype=np.int64),
+        ticket_guild_id=np.asarray(guild_id, dtype=np.int64),
+        ticket_created=np.asarray(created, dtype=np.int64),
+        ticket_closed=np.asarray(closed, dtype=np.int64),
+        ticket_is_closed=np.asarray(is_closed, dtype=np.int8) == 1,
+        ticket_priority=priority_codes[np.asarray(priority, dtype=np.intp)],
+        ticket_category=np.asarray(category, dtype=np.int32),
+        ticket_first_response=np.asarray(first_response, dtype=np.float32),
+        categories=np.array(categories, dtype=str),
+        rating_guild_id=np.asarray(ratings[1], dtype=np.int64),
+        rating_created=np.asarray(ratings[2], dtype=np.int64),
+        rating_value=np.asarray(ratings[3], dtype=np.int8),
+    )
+    os.replace(temporary_path, snapshot_path)
+    return len(guild_id)
+
+class Snapshot:
+    """Read-only column arrays of one snapshot file, with the report queries as vectorised aggregations"""
+
+    def __init__(self, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            self.arrays = {name: data[name] for name in data.files}
+        self.snapshot_at = int(self.arrays['snapshot_at'])
+        self.categories = self.arrays['categories']
+
+    def tickets(self, guild_id: int, since: int = None):
+        mask = self.arrays['ticket_guild_id'] == guild_id
+        if since is not None:
+            mask &= self.arrays['ticket_created'] >= since
+        return mask
+
+    def weekly_volume(self, guild_id: int, weeks: int):
+        """(week start timestamps, category names, weeks x categories count matrix), most recent week last"""
+        end = self.snapshot_at - (self.snapshot_at - WEEK_OFFSET) % WEEK + WEEK
+        start = end - weeks * WEEK
+        mask = self.tickets(guild_id, start) & (self.arrays['ticket_created'] < end)
+        week_index = (self.arrays['ticket_created'][mask] - start) // WEEK
+        category = self.arrays['ticket_category'][mask]
+
+        used, category = np.unique(category, return_inverse=True)
+        counts = np.bincount(week_index * len(used) + category, minlength=weeks * len(used)).reshape(weeks, len(used))
+        return np.arange(start, end, WEEK), self.categories[used], counts
+
+    def resolution_by_priority(self, guild_id: int, since: int = None, quantiles=(50, 90)):
+        """{priority: (tickets, resolution seconds at each quantile)} for closed tickets"""
+        mask = self.tickets(guild_id, since) & self.arrays['ticket_is_closed'] & (self.arrays['ticket_closed'] >= 0)
+        seconds = (self.arrays['ticket_closed'][mask] - self.arrays['ticket_created'][mask]).astype(np.float64)
+        priority = self.arrays['ticket_priority'][mask]
+
+        result = {}
+        for code, name in enumerate(PRIORITIES):
+            values = seconds[priority == code]
+            if len(values):
+                result[name] = (len(values), np.percentile(values, quantiles).tolist())
+        return result
+
+    def first_response(self, guild_id: int, since: int = None, quantiles=(50, 90)):
+        values = self.arrays['ticket_first_response'][self.tickets(guild_id, since)]
+        values = values[values >= 0]
+        return len(values), (np.percentile(values, quantiles).tolist() if len(values) else [None] * len(quantiles))
+
+    def ratings(self, guild_id: int, since: int = None):
+        """(ratings, average, count of each star from 1 to 5)"""
+        mask = self.arrays['rating_guild_id'] == guild_id
+        if since is not None:
+            mask &= self.arrays['rating_created'] >= since
+        values = self.arrays['rating_value'][mask]
+        values = values[(values >= 1) & (values <= 5)]
+        return len(values), (float(values.mean()) if len(values) else None), np.bincount(values, minlength=6)[1:].tolist()
+
+class AnalyticsSnapshotter:
+    """Rebuilds the snapshot file periodically from a read-only connection, off the event loop"""
+
+    def __init__(self, database_path: str, snapshot_path: str, interval: int = 3600):
+        self.database_path = database_path
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.last_duration = None
+        self._snapshot = None
+        self._snapshot_mtime = None
+        self._task = None
+
+    def start(self):
+        if not available():
+            logger.warning("numpy is not installed, analytics snapshots are disabled")
+            return
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _snapshot_loop(self):
+        while True:
+            # A restart should not rebuild a snapshot that is still fresh
+            age = time.time() - os.path.getmtime(self.snapshot_path) if os.path.exists(self.snapshot_path) else None
+            if age is None or age >= self.interval:
+                await self.refresh()
+                age = 0
+            await asyncio.sleep(self.interval - age)
+
+    async def refresh(self) -> bool:
+        try:
+            start = time.perf_counter()
+            tickets = await asyncio.to_thread(build_snapshot, self.database_path, self.snapshot_path)
+            self.last_duration = time.perf_counter() - start
+            logger.info(f"Analytics snapshot of {tickets} tickets written in {self.last_duration:.1f}s")
+            return True
+        except Exception as e:
+            logger.error(f"Error building analytics snapshot: {e}")
+            return False
+
+    async def get_snapshot(self):
+        """The latest snapshot, reloaded only when the file has been replaced; None when there is none yet"""
+        if not available() or not os.path.exists(self.snapshot_path):
+            return None
+
+        mtime = os.path.getmtime(self.snapshot_path)
+        if self._snapshot is None or mtime != self._snapshot_mtime:
+            self._snapshot = await asyncio.to_thread(Snapshot, self.snapshot_path)
+            self._snapshot_mtime = mtime
+        return self._snapshot
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+
+from utils.timestamps import days_ago_ms
+
+logger = logging.getLogger('discord')
+
+# ticket_archive has the same columns as ticket_instances; ids are kept so the two tables never overlap
+ARCHIVED_COLUMNS = (
+    "id, guild_id, channel_id, creator_id, category, subject, description, priority, status, claimed_by, "
+    "ticket_number, created_at, closed_at, created_at_ms, closed_at_ms, control_message_id, message_count, "
+    "last_message_at, first_staff_response_at"
+)
+
+ARCHIVE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS ticket_archive (
+        id INTEGER PRIMARY KEY,
+        guild_id INTEGER,
+        channel_id INTEGER,
+        creator_id INTEGER,
+        category TEXT,
+        subject TEXT,
+        description TEXT,
+        priority TEXT,
+        status TEXT,
+        claimed_by INTEGER,
+        ticket_number INTEGER,
+        created_at TIMESTAMP,
+        closed_at TIMESTAMP,
+        created_at_ms INTEGER,
+        closed_at_ms INTEGER,
+        control_message_id INTEGER,
+        message_count INTEGER,
+        last_message_at INTEGER,
+        first_staff_response_at INTEGER
+    )
+"""
+
+NEXT_TICKET_NUMBER_SQL = """
+    SELECT COALESCE(MAX(ticket_number), 0) + 1 FROM (
+        SELECT MAX(ticket_number) AS ticket_number FROM ticket_instances WHERE guild_id = ?1
+        UNION ALL
+        SELECT MAX(ticket_number) FROM ticket_archive WHERE guild_id = ?1
+    )
+"""
+
+class TicketArchiver:
+    """Moves closed tickets older than max_age_days out of ticket_instances, one small transaction per batch"""
+
+    def __init__(self, bot, max_age_days: float = 30, batch_size: int = 500, interval: int = 3600):
+        self.bot = bot
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.archived = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None and self.max_age_days > 0 and self.interval > 0:
+            self._task = asyncio.create_task(self._archive_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _archive_loop(self):
+        while True:
+            await self.archive()
+            await asyncio.sleep(self.interval)
+
+    async def archive_batch(self, cutoff_ms: int) -> int:
+        """Move the oldest batch of closed tickets; returns how many rows moved"""
+        async with self.bot.db.cursor() as cur:
+            await cur.execute("""
+                SELECT MAX(closed_at_ms) FROM (
+                    SELECT closed_at_ms FROM ticket_instances
+                    WHERE status = 'closed' AND closed_at_ms < ?
+                    ORDER BY closed_at_ms
+                    LIMIT ?
+                )
+            """, (cutoff_ms, self.batch_size))
+            boundary = (await cur.fetchall())[0][0]
+            if boundary is None:
+                return 0
+
+            # Closed tickets are never written again, so both statements see the same rows
+            await cur.execute(f"""
+                INSERT OR REPLACE INTO ticket_archive ({ARCHIVED_COLUMNS})
+                SELECT {ARCHIVED_COLUMNS} FROM ticket_instances
+                WHERE status = 'closed' AND closed_at_ms <= ?
+            """, (boundary,))
+            await cur.execute(
+                "DELETE FROM ticket_instances WHERE status = 'closed' AND closed_at_ms <= ?", (boundary,)
+            )
+            moved = cur.rowcount
+            await self.bot.db.commit()
+        return moved
+
+    async def archive(self) -> int:
+        try:
+            cutoff_ms = days_ago_ms(self.max_age_days)
+            moved = 0
+            while True:
+                batch = await self.archive_batch(cutoff_ms)
+                moved += batch
+                if batch < self.batch_size:
+                    break
+                # Let queued ticket writes run between batches
+                await asyncio.sleep(0)
+
+            self.archived += moved
+            if moved:
+                logger.info(f"Archived {moved} closed tickets older than {self.max_age_days:g} days")
+            return moved
+        except Exception as e:
+            logger.error(f"Error archiving closed tickets: {e}")
+            return 0
@@ -0,0 +1,321 @@
+"""Online, gzip-compressed backups of bot.db and triggers.db, and restoring them while the bot is stopped.
+
+    python -m utils.backup create
+    python -m utils.backup list
+    python -m utils.backup restore backups/bot-20250101T030000Z.db.gz --database bot.db
+"""
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from utils.config import config
+from utils.db_supervisor import is_busy_failure
+from utils.maintenance import database_connections, database_path
+from utils.metrics import RollingWindow
+
+logger = logging.getLogger('discord')
+
+BACKUP_NAME_RE = re.compile(r'^(?P<database>\w+)-(?P<stamp>\d{8}T\d{6}Z)\.db\.gz$')
+LATENCY_PROBE_INTERVAL = 0.05
+
+class BackupReport:
+    """One backup file and what taking it cost"""
+
+    def __init__(self, database: str, path: str):
+        self.database = database
+        self.path = path
+        self.finished_at = None
+        self.seconds = 0.0
+        self.pages = 0
+        self.steps = 0
+        self.database_bytes = 0
+        self.compressed_bytes = 0
+        self.latency_before = (None, None)
+        self.latency_during = (None, None)
+
+    def summary(self) -> str:
+        before = "/".join(f"{value * 1000:.1f}" if value is not None else "-" for value in self.latency_before)
+        during = "/".join(f"{value * 1000:.1f}" if value is not None else "-" for value in self.latency_during)
+        return (f"{self.database}: {self.pages} pages in {self.steps} steps, {self.seconds:.2f}s, "
+                f"{self.database_bytes / 1e6:.2f} MB -> {self.compressed_bytes / 1e6:.2f} MB; "
+                f"query round trip p50/p95 {before}ms before, {during}ms during")
+
+def copy_database(source_path: str, target_path: str, pages: int = 256, pause: float = 0.005):
+    """Copy a live database with the online backup API on its own connection; runs in a worker thread.
+
+    Returns (pages copied, steps taken)."""
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    progress = {'pages': 0, 'steps': 0}
+
+    def on_progress(status, remaining, total):
+        progress['pages'] = total
+        progress['steps'] += 1
+
+    try:
+        wal = source.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        if wal:
+            # Pin one WAL snapshot for the whole copy; otherwise every commit by the bot restarts the backup
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchall()
+        else:
+            # With a rollback journal a held read lock would block the bot's commits, so copy in a single step
+            pages = -1
+
+        source.backup(target, pages=pages, progress=on_progress, sleep=pause)
+        if wal:
+            source.execute("COMMIT")
+
+        result = target.execute("PRAGMA quick_check").fetchone()[0]
+        if result != 'ok':
+            raise sqlite3.DatabaseError(f"Backup of {source_path} failed its integrity check: {result}")
+    finally:
+        target.close()
+        source.close()
+    return progress['pages'], progress['steps']
+
+def compress(path: str, archive_path: str):
+    temporary_path = f"{archive_path}.tmp"
+    with open(path, 'rb') as source, gzip.open(temporary_path, 'wb', compresslevel=6) as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    os.replace(temporary_path, archive_path)
+
+def list_backups(directory: str, database: str = None):
+    """(database, taken at, path) of every backup in the directory, oldest first"""
+    backups = []
+    if not os.path.isdir(directory):
+        return backups
+    for name in os.listdir(directory):
+        match = BACKUP_NAME_RE.match(name)
+        if match and database in (None, match['database']):
+            taken_at = datetime.strptime(match['stamp'], '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+            backups.append((match['database'], taken_at, os.path.join(directory, name)))
+    return sorted(backups, key=lambda backup: backup[1])
+
+def prune_backups(directory: str, database: str, retention: int):
+    """Delete all but the newest `retention` backups of one database; returns the deleted paths"""
+    backups = list_backups(directory, database)
+    expired = [path for _, _, path in backups[:max(len(backups) - retention, 0)]]
+    for path in expired:
+        os.remove(path)
+    return expired
+
+def create_backup(source_path: str, directory: str, database: str, pages: int = 256, pause: float = 0.005) -> BackupReport:
+    """Copy, check and compress one database into `directory`; blocking, call it from a thread"""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    report = BackupReport(database, os.path.join(directory, f"{database}-{stamp}.db.gz"))
+    copy_path = os.path.join(directory, f".{database}-{stamp}.db")
+
+    start = time.perf_counter()
+    try:
+        report.pages, report.steps = copy_database(source_path, copy_path, pages, pause)
+        report.database_bytes = os.path.getsize(copy_path)
+        compress(copy_path, report.path)
+    finally:
+        if os.path.exists(copy_path):
+            os.remove(copy_path)
+
+    report.seconds = time.perf_counter() - start
+    report.compressed_bytes = os.path.getsize(report.path)
+    report.finished_at = datetime.now(timezone.utc)
+    return report
+
+def database_files():
+    """(backup name, file) of every database the bot keeps"""
+    return (('bot', config.DATABASE_PATH), ('triggers', 'triggers.db'))
+
+def backup_name(database_path: str) -> str:
+    """The name backups of this file are taken under"""
+    for name, path in database_files():
+        if os.path.abspath(path) == os.path.abspath(database_path):
+            return name
+    return os.path.splitext(os.path.basename(database_path))[0]
+
+def lock_exclusively(conn: sqlite3.Connection):
+    """Hold an exclusive lock on the file until conn is closed; fails with "database is locked" if anyone else has it open.
+
+    WAL connections keep a shared lock for as long as they are open, so this fails even while the bot is idle.
+    An idle connection in rollback journal mode holds no lock and cannot be seen."""
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+    conn.execute("BEGIN EXCLUSIVE")
+    conn.execute("COMMIT")
+
+def database_in_use(database_path: str) -> bool:
+    if not os.path.exists(database_path):
+        return False
+    conn = sqlite3.connect(database_path, timeout=0, isolation_level=None)
+    try:
+        lock_exclusively(conn)
+        return False
+    except sqlite3.OperationalError as e:
+        if is_busy_failure(e):
+            return True
+        raise
+    finally:
+        conn.close()
+
+def restore_backup(archive_path: str, database_path: str, directory: str = None, force: bool = False):
+    """Replace database_path with a backup; the bot must be stopped. The current file is backed up first."""
+    match = BACKUP_NAME_RE.match(os.path.basename(archive_path))
+    database = backup_name(database_path)
+    if not force and (match is None or match['database'] != database):
+        found = f"a backup of the {match['database']} database" if match else "not named like a backup"
+        raise RuntimeError(f"{archive_path} is {found}, but {database_path} is the {database} database; pass --force to restore it anyway")
+
+    in_use = f"{database_path} is open in another process, so the bot is still running; stop it first or pass --force"
+    if not force and database_in_use(database_path):
+        raise RuntimeError(in_use)
+
+    copy_path = f"{database_path}.restore"
+    with gzip.open(archive_path, 'rb') as source, open(copy_path, 'wb') as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+
+    try:
+        restored = sqlite3.connect(copy_path)
+        try:
+            result = restored.execute("PRAGMA quick_check").fetchone()[0]
+            if result != 'ok':
+                raise sqlite3.DatabaseError(f"{archive_path} failed its integrity check: {result}")
+
+            safety = None
+            if os.path.exists(database_path):
+                safety = create_backup(database_path, directory or os.path.dirname(archive_path), database, pages=-1)
+
+            # The backup API rewrites the target in place, so its WAL and journal stay consistent
+            target = sqlite3.connect(database_path, timeout=0 if not force else 5.0, isolation_level=None)
+            try:
+                if not force:
+                    # Held until the copy is done, so a bot started since the check above cannot open the file halfway
+                    try:
+                        lock_exclusively(target)
+                    except sqlite3.OperationalError as e:
+                        if is_busy_failure(e):
+                            raise RuntimeError(in_use) from e
+                        raise
+                restored.backup(target)
+            finally:
+                target.close()
+        finally:
+            restored.close()
+    finally:
+        os.remove(copy_path)
+    return safety
+
+class BackupManager:
+    """Backs up every open database once per interval without blocking the event loop, and keeps the newest few"""
+
+    def __init__(self, bot, directory: str = 'backups', interval: int = 86400, retention: int = 7,
+                 pages_per_step: int = 256, step_pause: float = 0.005):
+        self.bot = bot
+        self.directory = directory
+        self.interval = interval
+        self.retention = retention
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self.reports = {}
+        self._task = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._backup_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _backup_loop(self):
+        while True:
+            # A restart should not take another backup while the newest one is still fresh
+            backups = list_backups(self.directory)
+            age = time.time() - backups[-1][1].timestamp() if backups else None
+            if age is None or age >= self.interval:
+                await self.backup_all()
+                age = 0
+            await asyncio.sleep(self.interval - age)
+
+    async def probe_latency(self, conn, window: RollingWindow, done: asyncio.Event = None, samples: int = 5):
+        """Time SELECT 1 round trips until `done` is set, or `samples` times"""
+        while not (done.is_set() if done else len(window) >= samples):
+            start = time.perf_counter()
+            async with conn.execute("SELECT 1") as cur:
+                await cur.fetchall()
+            window.add(time.perf_counter() - start)
+            await asyncio.sleep(LATENCY_PROBE_INTERVAL)
+
+    async def backup(self, database: str, conn) -> BackupReport:
+        source_path = await database_path(conn)
+        before = RollingWindow()
+        await self.probe_latency(conn, before)
+
+        during, done = RollingWindow(), asyncio.Event()
+        probe = asyncio.create_task(self.probe_latency(conn, during, done))
+        try:
+            report = await asyncio.to_thread(
+                create_backup, source_path, self.directory, database, self.pages_per_step, self.step_pause
+            )
+        finally:
+            done.set()
+            await probe
+
+        report.latency_before = tuple(before.percentiles(50, 95))
+        report.latency_during = tuple(during.percentiles(50, 95))
+        await asyncio.to_thread(prune_backups, self.directory, database, self.retention)
+        return report
+
+    async def backup_all(self):
+        for database, conn in database_connections(self.bot):
+            if conn is None:
+                continue
+            try:
+                report = await self.backup(database, conn)
+                self.reports[database] = report
+                logger.info(f"Backup {report.summary()}")
+            except Exception as e:
+                logger.error(f"Error backing up {database} database: {e}")
+        return self.reports
+
+def main(args):
+    if args.command == 'list':
+        for database, taken_at, path in list_backups(args.directory, args.database_name):
+            print(f"  {database:<10}{taken_at:%Y-%m-%d %H:%M:%S} UTC{os.path.getsize(path) / 1e6:>10.2f} MB  {path}")
+
+    elif args.command == 'create':
+        for database, path in database_files():
+            if os.path.exists(path):
+                report = create_backup(path, args.directory, database, config.BACKUP_PAGES_PER_STEP, config.BACKUP_STEP_PAUSE)
+                prune_backups(args.directory, database, config.BACKUP_RETENTION)
+                print(f"  {report.path}  {report.database_bytes / 1e6:.2f} MB -> {report.compressed_bytes / 1e6:.2f} MB in {report.seconds:.2f}s")
+
+    elif args.command == 'restore':
+        safety = restore_backup(args.archive, args.database, args.directory, args.force)
+        if safety:
+            print(f"Previous {args.database} saved as {safety.path}")
+        print(f"Restored {args.database} from {args.archive}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--directory', default=config.BACKUP_DIRECTORY, help="Where backups are kept")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    listing = commands.add_parser('list', help="Show the backups in the directory")
+    listing.add_argument('database_name', nargs='?', help="Only show backups of this database, e.g. bot or triggers")
+
+    commands.add_parser('create', help="Back up bot.db and triggers.db now")
+
+    restore = commands.add_parser('restore', help="Replace a database with a backup; stop the bot first")
+    restore.add_argument('archive', help="A .db.gz file written by a backup")
+    restore.add_argument('--database', default=config.DATABASE_PATH, help="Database file to overwrite")
+    restore.add_argument('--force', action='store_true', help="Restore even though the database looks open or the backup is of another database")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    main(parse_args())
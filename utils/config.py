@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 import logging
+from logging.handlers import RotatingFileHandler
 
 load_dotenv()
 
@@ -12,8 +13,61 @@ class Config:
     BOT_STATUS_TYPE = os.getenv('BOT_STATUS_TYPE', 'STREAMING').upper()
 
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'bot.db')
+    DATABASE_RECONNECT_MIN_BACKOFF = float(os.getenv('DATABASE_RECONNECT_MIN_BACKOFF', '1'))
+    DATABASE_RECONNECT_MAX_BACKOFF = float(os.getenv('DATABASE_RECONNECT_MAX_BACKOFF', '60'))
+    DATABASE_BREAKER_THRESHOLD = int(os.getenv('DATABASE_BREAKER_THRESHOLD', '5'))
+    DATABASE_BREAKER_WINDOW = float(os.getenv('DATABASE_BREAKER_WINDOW', '30'))
+    DATABASE_WAL = os.getenv('DATABASE_WAL', 'True').lower() == 'true'
+
+    ACTIVITY_FLUSH_INTERVAL = int(os.getenv('ACTIVITY_FLUSH_INTERVAL', '30'))
+    RATE_LIMIT_SNAPSHOT_INTERVAL = int(os.getenv('RATE_LIMIT_SNAPSHOT_INTERVAL', '60'))
+    TICKET_COUNTER_RECONCILE_INTERVAL = int(os.getenv('TICKET_COUNTER_RECONCILE_INTERVAL', '3600'))
+    SLA_SAMPLE_SIZE = int(os.getenv('SLA_SAMPLE_SIZE', '1000'))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+    TICKET_ARCHIVE_AFTER_DAYS = float(os.getenv('TICKET_ARCHIVE_AFTER_DAYS', '30'))
+    TICKET_ARCHIVE_BATCH_SIZE = int(os.getenv('TICKET_ARCHIVE_BATCH_SIZE', '500'))
+    TICKET_ARCHIVE_INTERVAL = int(os.getenv('TICKET_ARCHIVE_INTERVAL', '3600'))
+
+    MAINTENANCE_INTERVAL = int(os.getenv('MAINTENANCE_INTERVAL', '86400'))
+    MAINTENANCE_WINDOW = os.getenv('MAINTENANCE_WINDOW', '3-6')
+    MAINTENANCE_BUDGET_SECONDS = float(os.getenv('MAINTENANCE_BUDGET_SECONDS', '5'))
+    MAINTENANCE_VACUUM_MAX_MB = float(os.getenv('MAINTENANCE_VACUUM_MAX_MB', '100'))
+
+    BACKUP_DIRECTORY = os.getenv('BACKUP_DIRECTORY', 'backups')
+    BACKUP_INTERVAL = int(os.getenv('BACKUP_INTERVAL', '86400'))
+    BACKUP_RETENTION = int(os.getenv('BACKUP_RETENTION', '7'))
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', '256'))
+    BACKUP_STEP_PAUSE = float(os.getenv('BACKUP_STEP_PAUSE', '0.005'))
+
+    ANALYTICS_SNAPSHOT_PATH = os.getenv('ANALYTICS_SNAPSHOT_PATH', 'analytics_snapshot.npz')
+    ANALYTICS_SNAPSHOT_INTERVAL = int(os.getenv('ANALYTICS_SNAPSHOT_INTERVAL', '3600'))
+
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() == 'true'
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'slow_queries.log')
+
+    INTERACTION_TRACING = os.getenv('INTERACTION_TRACING', 'True').lower() == 'true'
+    AUTO_DEFER_ENABLED = os.getenv('AUTO_DEFER_ENABLED', 'False').lower() == 'true'
+    AUTO_DEFER_BUDGET = float(os.getenv('AUTO_DEFER_BUDGET', '2.0'))
+    AUTO_DEFER_EXCLUDE = [custom_id.strip() for custom_id in os.getenv('AUTO_DEFER_EXCLUDE', '').split(',') if custom_id.strip()]
+
+    LOOP_MONITOR_INTERVAL = float(os.getenv('LOOP_MONITOR_INTERVAL', '0.5'))
+    LOOP_BLOCKING_DEBUG = os.getenv('LOOP_BLOCKING_DEBUG', 'False').lower() == 'true'
+    LOOP_BLOCKING_THRESHOLD_MS = float(os.getenv('LOOP_BLOCKING_THRESHOLD_MS', '100'))
 
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FILE = os.getenv('LOG_FILE', 'bot.log')
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    LOG_JSON = os.getenv('LOG_JSON', 'False').lower() == 'true'
+    LOG_SAMPLE_BURST = int(os.getenv('LOG_SAMPLE_BURST', '20'))
+    LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', '100'))
+
+    STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '15'))
+    STARTUP_PROFILE_LOG = os.getenv('STARTUP_PROFILE_LOG', 'startup_profile.jsonl')
 
     SUPPORT_SERVER = os.getenv('SUPPORT_SERVER', 'https://discord.gg/codexdev')
 
@@ -21,13 +75,32 @@ class Config:
 
     @classmethod
     def setup_logging(cls):
+        from utils.log_pipeline import log_pipeline, JsonFormatter, CallSiteSampler
+
+        if cls.LOG_JSON:
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        file_handler = RotatingFileHandler(cls.LOG_FILE, maxBytes=cls.LOG_MAX_BYTES, backupCount=cls.LOG_BACKUP_COUNT, encoding='utf-8')
+        stream_handler = logging.StreamHandler()
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+
         logging.basicConfig(
             level=getattr(logging, cls.LOG_LEVEL),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler('bot.log'),
-                logging.StreamHandler()
+                log_pipeline.handler(
+                    file_handler,
+                    stream_handler,
+                    sampler=CallSiteSampler(cls.LOG_SAMPLE_BURST, cls.LOG_SAMPLE_RATE)
+                )
             ]
         )
 
+    @classmethod
+    def shutdown_logging(cls):
+        from utils.log_pipeline import log_pipeline
+        log_pipeline.stop()
+
 config = Config()
\ No newline at end of file
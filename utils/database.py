@@ -1,38 +1,37 @@
 import logging
-import aiosqlite
+import sqlite3
 from typing import Optional, List, Tuple
 import discord
+from utils.db_supervisor import DatabaseUnavailableError
+from utils.stats import apply_ticket_counter_delta
+from utils.timestamps import legacy_to_ms_sql
 
 logger = logging.getLogger('discord')
 
-async def check_database_connection(bot) -> bool:
-    try:
-        if not hasattr(bot, 'db') or bot.db is None:
-            logger.error("Bot database object is None")
-            return False
-
-        async with bot.db.cursor() as cur:
-            await cur.execute("SELECT 1")
-            await cur.fetchone()
-            return True
-    except Exception as e:
-        logger.error(f"Database connection check failed: {e}")
+# (table, epoch ms column, text column it is backfilled from)
+TIMESTAMP_COLUMNS = [
+    ('ticket_instances', 'created_at_ms', 'created_at'),
+    ('ticket_instances', 'closed_at_ms', 'closed_at'),
+    ('ticket_ratings', 'created_at_ms', 'created_at'),
+    ('ticket_blacklist', 'blacklisted_at_ms', 'blacklisted_at'),
+]
+
+# Created after the *_ms columns exist
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_ticket_instances_guild_created ON ticket_instances (guild_id, created_at_ms)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_ratings_guild_created ON ticket_ratings (guild_id, created_at_ms)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_instances_closed ON ticket_instances (closed_at_ms) WHERE status = 'closed'",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_archive_guild_creator ON ticket_archive (guild_id, creator_id, created_at_ms)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_archive_guild_created ON ticket_archive (guild_id, created_at_ms)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_archive_guild_number ON ticket_archive (guild_id, ticket_number)",
+]
+
+def check_database_connection(bot) -> bool:
+    """Whether bot.db is usable; kept in memory by the connection supervisor from real query errors, so it costs no query"""
+    if getattr(bot, 'db', None) is None:
+        logger.error("Bot database object is None")
         return False
-
-async def ensure_database_connection(bot):
-    """Ensure database connection is valid, attempt reconnection if needed"""
-    if not await check_database_connection(bot):
-        try:
-            import aiosqlite
-            if hasattr(bot, 'db') and bot.db:
-                await bot.db.close()
-            bot.db = await aiosqlite.connect('bot.db')
-            logger.info("Database reconnected successfully")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to reconnect to database: {e}")
-            return False
-    return True
+    return bot.db_supervisor.healthy
 
 async def get_ticket_channel(bot, guild_id: int) -> Optional[discord.TextChannel]:
     try:
@@ -42,6 +41,8 @@ async def get_ticket_channel(bot, guild_id: int) -> Optional[discord.TextChannel
             if result and result[0]:
                 guild = bot.get_guild(guild_id)
                 return guild.get_channel(result[0]) if guild else None
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket channel: {e}")
         return None
@@ -54,6 +55,8 @@ async def get_ticket_role(bot, guild_id: int) -> Optional[discord.Role]:
             if result and result[0]:
                 guild = bot.get_guild(guild_id)
                 return guild.get_role(result[0]) if guild else None
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket role: {e}")
         return None
@@ -66,6 +69,8 @@ async def get_ticket_category(bot, guild_id: int) -> Optional[discord.CategoryCh
             if result and result[0]:
                 guild = bot.get_guild(guild_id)
                 return guild.get_channel(result[0]) if guild else None
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket category: {e}")
         return None
@@ -78,6 +83,8 @@ async def get_ticket_log_channel(bot, guild_id: int) -> Optional[discord.TextCha
             if result and result[0]:
                 guild = bot.get_guild(guild_id)
                 return guild.get_channel(result[0]) if guild else None
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket log channel: {e}")
         return None
@@ -90,6 +97,8 @@ async def get_ping_role(bot, guild_id: int) -> Optional[discord.Role]:
             if result and result[0]:
                 guild = bot.get_guild(guild_id)
                 return guild.get_role(result[0]) if guild else None
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ping role: {e}")
         return None
@@ -102,6 +111,8 @@ async def get_ticket_categories(bot, guild_id: int) -> List[Tuple[str, str]]:
             await cur.execute("SELECT category_name, emoji FROM ticket_categories WHERE guild_id = ? ORDER BY category_name", (guild_id,))
             results = await cur.fetchall()
             return [(row[0], row[1]) for row in results]
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket categories: {e}")
         return []
@@ -114,6 +125,8 @@ async def get_ticket_categories_with_emojis(bot, guild_id: int) -> List[Tuple[st
             await cur.execute("SELECT category_name, emoji FROM ticket_categories WHERE guild_id = ? ORDER BY category_name", (guild_id,))
             results = await cur.fetchall()
             return [(row[0], row[1]) for row in results]
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket categories with emojis: {e}")
         return []
@@ -140,10 +153,14 @@ async def add_ticket_category(bot, guild_id: int, category_name: str, emoji: str
                 "INSERT INTO ticket_categories (guild_id, category_name, emoji) VALUES (?, ?, ?)",
                 (guild_id, category_name, emoji)
             )
+            await apply_ticket_counter_delta(cur, guild_id, categories=1)
             await bot.db.commit()
+            bot.stats_cache.categories_changed(guild_id, 1)
 
             emoji_display = f" with emoji {emoji}" if emoji else ""
             return True, f"Category '{category_name}'{emoji_display} has been added successfully."
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error adding ticket category: {e}")
         return False, f"Database error: {str(e)}"
@@ -158,8 +175,12 @@ async def remove_ticket_category(bot, guild_id: int, category_name: str) -> Tupl
             if cur.rowcount == 0:
                 return False, f"Category '{category_name}' not found."
 
+            await apply_ticket_counter_delta(cur, guild_id, categories=-1)
             await bot.db.commit()
+            bot.stats_cache.categories_changed(guild_id, -1)
             return True, f"Category '{category_name}' has been removed successfully."
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error removing ticket category: {e}")
         return False, f"Database error: {str(e)}"
@@ -169,12 +190,17 @@ async def reset_ticket_categories(bot, guild_id: int) -> Tuple[bool, str]:
         async with bot.db.cursor() as cur:
             await cur.execute("DELETE FROM ticket_categories WHERE guild_id = ?", (guild_id,))
             count = cur.rowcount
+            if count:
+                await apply_ticket_counter_delta(cur, guild_id, categories=-count)
             await bot.db.commit()
+            bot.stats_cache.categories_changed(guild_id, -count)
 
             if count == 0:
                 return False, "No categories found to reset."
 
             return True, f"All {count} categories have been reset successfully."
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error resetting ticket categories: {e}")
         return False, f"Database error: {str(e)}"
@@ -206,6 +232,8 @@ async def user_has_support_role(bot, user: discord.Member) -> bool:
                     return True
 
             return False
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error checking support roles for user {user.id} in guild {user.guild.id}: {e}")
         return False
@@ -234,6 +262,8 @@ async def user_has_any_support_role(bot, user):
                     return True
 
             return False
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error checking support roles: {e}")
         return False
@@ -247,7 +277,10 @@ async def add_support_role(bot, guild_id: int, role_id: int):
                 (guild_id, role_id)
             )
             await bot.db.commit()
+            bot.sla.forget_support_roles(guild_id)
             return True, "Support role added successfully."
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error adding support role: {e}")
         return False, f"Failed to add support role: {str(e)}"
@@ -265,7 +298,10 @@ async def remove_support_role(bot, guild_id: int, role_id: int):
                 return False, "Role was not found in additional support roles."
 
             await bot.db.commit()
+            bot.sla.forget_support_roles(guild_id)
             return True, "Support role removed successfully."
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error removing support role: {e}")
         return False, f"Failed to remove support role: {str(e)}"
@@ -277,6 +313,8 @@ async def get_additional_support_roles(bot, guild_id: int):
             await cur.execute("SELECT role_id FROM additional_support_roles WHERE guild_id = ?", (guild_id,))
             results = await cur.fetchall()
             return [row[0] for row in results]
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting additional support roles: {e}")
         return []
@@ -290,6 +328,8 @@ async def get_user_open_tickets(bot, guild_id: int, user_id: int) -> int:
             """, (guild_id, user_id))
             result = await cur.fetchone()
             return result[0] if result else 0
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting user open tickets: {e}")
         return 0
@@ -309,9 +349,10 @@ async def check_user_ticket_limit(bot, guild_id: int, user_id: int) -> Tuple[boo
 
             can_create = count < limit
             return can_create, count, limit
-    except Exception as e:
+    except sqlite3.Error as e:
+        # Fail closed: a limit that cannot be read must not let the ticket through
         logger.error(f"Error checking user ticket limit: {e}")
-        return True, 0, 3
+        raise DatabaseUnavailableError('bot', bot.db_supervisor.retry_after) from e
 
 async def get_user_safe_mention(bot, user_id: int, guild_id: int = None) -> str:
     try:
@@ -395,7 +436,11 @@ async def add_or_update_ticket_config(bot, guild_id: int, **kwargs) -> bool:
                 await cur.execute(query, values)
 
             await bot.db.commit()
+            if 'role_id' in kwargs:
+                bot.sla.forget_support_roles(guild_id)
             return True
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error updating ticket config: {e}")
         return False
@@ -406,6 +451,8 @@ async def get_ticket_limit(bot, guild_id: int) -> int:
             await cur.execute("SELECT ticket_limit FROM tickets WHERE guild_id = ?", (guild_id,))
             result = await cur.fetchone()
             return result[0] if result and result[0] else 3
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting ticket limit: {e}")
         return 3
@@ -419,6 +466,8 @@ async def update_ticket_priority(bot, channel_id: int, priority: str) -> bool:
             )
             await bot.db.commit()
             return cur.rowcount > 0
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error updating ticket priority: {e}")
         return False
@@ -431,6 +480,8 @@ async def is_user_blacklisted(bot, guild_id: int, user_id: int) -> bool:
                 (guild_id, user_id)
             )
             return await cur.fetchone() is not None
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error checking user blacklist status: {e}")
         return False
@@ -446,7 +497,15 @@ async def migrate_database(bot):
                 "ALTER TABLE tickets ADD COLUMN ticket_limit INTEGER DEFAULT 3",
                 "ALTER TABLE ticket_instances ADD COLUMN subject TEXT",
                 "ALTER TABLE ticket_instances ADD COLUMN description TEXT",
-                "ALTER TABLE ticket_instances ADD COLUMN claimed_by INTEGER"
+                "ALTER TABLE ticket_instances ADD COLUMN claimed_by INTEGER",
+                "ALTER TABLE ticket_instances ADD COLUMN control_message_id INTEGER",
+                "ALTER TABLE ticket_instances ADD COLUMN message_count INTEGER",
+                "ALTER TABLE ticket_instances ADD COLUMN last_message_at INTEGER",
+                "ALTER TABLE ticket_instances ADD COLUMN first_staff_response_at INTEGER",
+                "ALTER TABLE tickets ADD COLUMN rate_limit_burst INTEGER DEFAULT 1",
+                "ALTER TABLE tickets ADD COLUMN rate_limit_window INTEGER DEFAULT 60",
+                "CREATE INDEX IF NOT EXISTS idx_ticket_instances_guild_status ON ticket_instances (guild_id, status)",
+                "DROP TABLE IF EXISTS rate_limits"
             ]
 
             for migration in migrations:
@@ -465,7 +524,24 @@ async def migrate_database(bot):
             except:
                 pass
 
+            # The text timestamps stay for older readers, queries filter and sort on the *_ms columns only
+            for table, column, legacy_column in TIMESTAMP_COLUMNS:
+                try:
+                    await cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+                except:
+                    continue
+
+                await cur.execute(
+                    f"UPDATE {table} SET {column} = {legacy_to_ms_sql(legacy_column)} WHERE {legacy_column} IS NOT NULL"
+                )
+                logger.info(f"Backfilled {table}.{column} for {cur.rowcount} rows")
+
+            for index in INDEXES:
+                await cur.execute(index)
+
             await bot.db.commit()
             logger.info("Database migration completed")
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error during database migration: {e}")
\ No newline at end of file
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import deque
+from functools import partial
+
+from utils.aiosqlite_adapter import HookedConnection, sqlite_connection
+from utils.instrumented_db import instrument_connection
+
+logger = logging.getLogger('discord')
+
+# Messages of errors that leave the connection or the file unusable, as opposed to a bad statement or a busy lock
+CONNECTION_FAILURES = (
+    'connection closed',
+    'no active connection',
+    'closed database',
+    'disk i/o error',
+    'unable to open database file',
+    'database disk image is malformed',
+    'file is not a database',
+)
+# The statement waited out the busy timeout; one is contention, a run of them means the database is stuck
+BUSY_FAILURES = ('locked', 'busy')
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+class DatabaseUnavailableError(Exception):
+    """Raised without touching SQLite while the circuit breaker is open"""
+
+    def __init__(self, database: str, retry_after: float):
+        super().__init__(f"The {database} database is temporarily unavailable, try again in {max(retry_after, 1):.0f}s")
+        self.database = database
+        self.retry_after = retry_after
+
+def is_connection_failure(error: BaseException) -> bool:
+    if not isinstance(error, (sqlite3.Error, ValueError)):
+        return False
+    message = str(error).lower()
+    return any(failure in message for failure in CONNECTION_FAILURES)
+
+def is_busy_failure(error: BaseException) -> bool:
+    return isinstance(error, sqlite3.OperationalError) and any(failure in str(error).lower() for failure in BUSY_FAILURES)
+
+class SupervisedConnection(HookedConnection):
+    """aiosqlite connection that reports to its supervisor; every statement, fetch and commit passes its hooks"""
+
+    def __init__(self, connector, supervisor, iter_chunk_size: int = 64):
+        super().__init__(connector, iter_chunk_size)
+        self.supervisor = supervisor
+
+    def before_execute(self):
+        self.supervisor.admit(self)
+
+    def execute_failed(self, error: Exception):
+        self.supervisor.record_failure(self, error)
+
+    def _probe(self):
+        raw = sqlite_connection(self)
+        raw.execute("SELECT COUNT(*) FROM sqlite_master").fetchall()
+        # Take and release the write lock, which is what a stuck database withholds
+        if not raw.in_transaction:
+            raw.execute("BEGIN IMMEDIATE")
+            raw.execute("ROLLBACK")
+
+    async def probe(self):
+        """Check the file is readable and writable again; bypasses the breaker"""
+        await self.run_unhooked(self._probe)
+
+class DatabaseSupervisor:
+    """Owns the bot's connection to one database file and is its circuit breaker.
+
+    Connection failures open the breaker at once and the connection is replaced; `breaker_threshold` busy
+    failures within `breaker_window` seconds open it too. While it is open, queries raise DatabaseUnavailableError without waiting
+    on SQLite, and a background task probes for recovery with exponential backoff."""
+
+    def __init__(self, bot, path: str, name: str = 'bot', min_backoff: float = 1.0, max_backoff: float = 60.0,
+                 breaker_threshold: int = 5, breaker_window: float = 30.0):
+        self.bot = bot
+        self.path = path
+        self.name = name
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_window = breaker_window
+        self.state = CLOSED
+        self.recent_failures = deque()
+        self.broken = False
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self.reconnects = 0
+        self.last_error = None
+        self.next_probe_at = 0.0
+        self._connection = None
+        self._task = None
+
+    @property
+    def healthy(self) -> bool:
+        return self._connection is not None and self.state == CLOSED
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.next_probe_at - time.monotonic(), 0.0)
+
+    async def connect(self) -> SupervisedConnection:
+        """Open a connection to the configured path; the caller decides whether to wrap it"""
+        conn = await SupervisedConnection(partial(sqlite3.connect, self.path), self)
+        self._connection = conn
+        return conn
+
+    async def open(self):
+        return instrument_connection(await self.connect(), self.name)
+
+    def admit(self, conn):
+        # Replaced connections are left to fail on their own
+        if conn is self._connection and self.state != CLOSED:
+            self.rejected += 1
+            raise DatabaseUnavailableError(self.name, self.retry_after)
+
+    def record_failure(self, conn, error: Exception):
+        # Errors from a connection that has already been replaced, or from bad SQL, say nothing about health
+        if conn is not self._connection:
+            return
+        if is_connection_failure(error):
+            self.broken = True
+        elif not is_busy_failure(error):
+            return
+
+        now = time.monotonic()
+        self.failures += 1
+        self.last_error = str(error)
+        self.recent_failures.append(now)
+        while self.recent_failures[0] < now - self.breaker_window:
+            self.recent_failures.popleft()
+        if self.broken or len(self.recent_failures) >= self.breaker_threshold:
+            self.trip()
+
+    def trip(self):
+        if self.state != CLOSED:
+            return
+        self.state = OPEN
+        self.trips += 1
+        self.next_probe_at = time.monotonic() + self.min_backoff
+        logger.error(
+            f"Database {self.name} circuit breaker opened after {len(self.recent_failures)} failure(s): {self.last_error}"
+        )
+        if self._task is None:
+            self._task = asyncio.create_task(self._recovery_loop())
+
+    async def _recovery_loop(self):
+        delay = self.min_backoff
+        try:
+            while True:
+                await asyncio.sleep(self.retry_after)
+                self.state = HALF_OPEN
+                try:
+                    if self.broken:
+                        await self.reconnect()
+                    else:
+                        await self._connection.probe()
+                    self.state = CLOSED
+                    self.recent_failures.clear()
+                    logger.info(f"Database {self.name} circuit breaker closed")
+                    return
+                except Exception as e:
+                    self.last_error = str(e)
+                    self.broken = self.broken or is_connection_failure(e)
+                    delay = min(delay * 2, self.max_backoff)
+                    self.state = OPEN
+                    self.next_probe_at = time.monotonic() + delay
+                    logger.error(f"Database {self.name} recovery probe failed, retrying in {delay:g}s: {e}")
+        finally:
+            self._task = None
+
+    async def reconnect(self):
+        conn = await SupervisedConnection(partial(sqlite3.connect, self.path), self)
+        try:
+            await conn.probe()
+        except Exception:
+            await conn.close()
+            raise
+
+        old = self._connection
+        self._connection = conn
+        self.bot.db = instrument_connection(conn, self.name)
+        self.broken = False
+        self.reconnects += 1
+        logger.info(f"Database {self.name} reconnected to {self.path}")
+
+        if old is not None:
+            try:
+                await old.close()
+            except Exception:
+                pass
+
+    async def stop(self):
+        """Stop supervising before shutdown closes the connection, so the close is not taken for a failure"""
+        self._connection = None
+        if self._task:
+            self._task.cancel()
+            self._task = None
@@ -5,9 +5,16 @@ import discord
 from discord.ext import commands
 from datetime import datetime, timezone
 import asyncio
+from utils.db_supervisor import DatabaseUnavailableError
 
 logger = logging.getLogger('discord')
 
+def unwrap_error(error: Exception) -> Exception:
+    """The exception a command actually raised, beneath discord.py's invoke and hybrid wrappers"""
+    while getattr(error, 'original', None) is not None:
+        error = error.original
+    return error
+
 class GlobalErrorHandler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -93,6 +100,11 @@ class GlobalErrorHandler(commands.Cog):
         if isinstance(error, ignored):
             return
 
+        original = unwrap_error(error)
+        if isinstance(original, DatabaseUnavailableError):
+            await self.handle_database_error(ctx, original)
+            return
+
         logger.error(f"Command error in {ctx.command}: {error}")
         logger.error(traceback.format_exc())
 
@@ -227,6 +239,11 @@ class GlobalErrorHandler(commands.Cog):
     async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
         """Handle all application command errors globally"""
         
+        original = unwrap_error(error)
+        if isinstance(original, DatabaseUnavailableError):
+            await self.handle_database_error(interaction, original)
+            return
+
         logger.error(f"App command error: {error}")
         logger.error(traceback.format_exc())
 
@@ -318,14 +335,20 @@ class GlobalErrorHandler(commands.Cog):
 
     async def handle_database_error(self, ctx, error: Exception):
         """Handle database-specific errors"""
-        logger.error(f"Database error: {error}")
-        logger.error(traceback.format_exc())
+        if isinstance(error, DatabaseUnavailableError):
+            # The circuit breaker is open; the trip was already logged once, so skip the traceback for each rejection
+            logger.warning(f"Database error: {error}")
+            retry = f"<:icons_clock:1382701751206936697> **Try again in:** {max(error.retry_after, 1):.0f} seconds"
+        else:
+            logger.error(f"Database error: {error}")
+            logger.error(traceback.format_exc())
+            retry = f"<:icons_refresh:1382701477759549523> Please try again in a moment."
         
         embed = self.create_error_embed(
             "Database Connection Error",
             f"**Unable to connect to the database.**\n\n"
             f"<:disk_icons:1384042698192715899> This is usually temporary and resolves quickly.\n\n"
-            f"<:icons_refresh:1382701477759549523> Please try again in a moment.",
+            f"{retry}",
             "database"
         )
         
@@ -0,0 +1,131 @@
+"""Stream a guild's tickets and ratings into gzip-compressed CSV or JSONL files.
+
+    python -m utils.export bot.db --guild 123456789012345678 --since 2025-01-01 --format csv
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import aiosqlite
+
+from utils.config import config
+from utils.timestamps import day_bounds_ms, iso_sql
+
+logger = logging.getLogger('discord')
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+TICKET_EXPORT_COLUMNS = f"""
+    ticket_number, channel_id, creator_id, category, subject, description, priority, status, claimed_by,
+    {iso_sql('created_at_ms')} AS created_at, {iso_sql('closed_at_ms')} AS closed_at,
+    {iso_sql('first_staff_response_at')} AS first_staff_response_at, message_count
+"""
+
+# Timestamps are written as ISO 8601 UTC, which sorts chronologically; the date range is an index range scan on
+# (guild_id, created_at_ms) in both the live and the archive table
+EXPORT_QUERIES = {
+    'tickets': f"""
+        SELECT {TICKET_EXPORT_COLUMNS} FROM ticket_instances
+        WHERE guild_id = ?1 AND created_at_ms >= ?2 AND created_at_ms < ?3
+        UNION ALL
+        SELECT {TICKET_EXPORT_COLUMNS} FROM ticket_archive
+        WHERE guild_id = ?1 AND created_at_ms >= ?2 AND created_at_ms < ?3
+        ORDER BY created_at
+    """,
+    'ratings': f"""
+        SELECT ticket_number, user_id, rating, feedback, staff_member, {iso_sql('created_at_ms')} AS created_at
+        FROM ticket_ratings
+        WHERE guild_id = ? AND created_at_ms >= ? AND created_at_ms < ?
+        ORDER BY created_at_ms
+    """,
+}
+
+class ExportWriter:
+    """Appends row batches to a gzip file; called through asyncio.to_thread so compression stays off the loop"""
+
+    def __init__(self, path: str, columns, fmt: str):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.rows = 0
+        self._file = gzip.open(path, 'wt', encoding='utf-8', newline='')
+        self._csv = None
+        if fmt == 'csv':
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(columns)
+
+    def write(self, rows):
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.writelines(json.dumps(dict(zip(self.columns, row)), default=str) + "\n" for row in rows)
+        self.rows += len(rows)
+
+    def close(self):
+        self._file.close()
+
+def parse_date(value: str):
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+async def export_table(db, table: str, guild_id: int, bounds, fmt: str, directory: str, batch_size: int) -> ExportWriter:
+    """Copy one table through fetchmany batches, so at most batch_size rows are held in memory"""
+    path = os.path.join(directory, f"{table}-{guild_id}.{fmt}.gz")
+    async with db.execute(EXPORT_QUERIES[table], (guild_id, *bounds)) as cur:
+        columns = [column[0] for column in cur.description]
+        writer = await asyncio.to_thread(ExportWriter, path, columns, fmt)
+        try:
+            while True:
+                rows = await cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                await asyncio.to_thread(writer.write, rows)
+        finally:
+            await asyncio.to_thread(writer.close)
+    return writer
+
+async def export_guild(db, guild_id: int, directory: str, fmt: str = 'csv', since: datetime = None,
+                       until: datetime = None, batch_size: int = None):
+    """Export tickets and ratings of one guild; returns the ExportWriter of each file written"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(EXPORT_FORMATS)}")
+
+    bounds = day_bounds_ms(since, until)
+    batch_size = batch_size or config.EXPORT_BATCH_SIZE
+    return [
+        await export_table(db, table, guild_id, bounds, fmt, directory, batch_size)
+        for table in EXPORT_QUERIES
+    ]
+
+async def main(args):
+    os.makedirs(args.output, exist_ok=True)
+    start = time.perf_counter()
+    db = await aiosqlite.connect(f"file:{args.path}?mode=ro", uri=True)
+    try:
+        writers = await export_guild(db, args.guild, args.output, args.format, parse_date(args.since),
+                                     parse_date(args.until), args.batch_size)
+    finally:
+        await db.close()
+
+    print(f"Exported guild {args.guild} in {time.perf_counter() - start:.1f}s")
+    for writer in writers:
+        print(f"  {writer.path:<50}{writer.rows:>10,} rows{os.path.getsize(writer.path) / 1e6:>10,.2f} MB")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', default=config.DATABASE_PATH, help="Database to read, opened read-only")
+    parser.add_argument('--guild', type=int, required=True, help="Guild whose tickets are exported")
+    parser.add_argument('--since', help="First day to include, YYYY-MM-DD")
+    parser.add_argument('--until', help="Last day to include, YYYY-MM-DD")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--output', default='.', help="Directory the .gz files are written to")
+    parser.add_argument('--batch-size', type=int, default=config.EXPORT_BATCH_SIZE, help="Rows fetched per round trip")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
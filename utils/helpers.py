@@ -1,10 +1,11 @@
 import logging
 import discord
-import time
 import re
 import io
 from datetime import datetime, timezone
 from typing import Tuple
+from utils.stats import apply_ticket_counter_delta
+from utils.timestamps import now_ms
 
 logger = logging.getLogger('discord')
 
@@ -18,37 +19,21 @@ def utc_to_ist(dt: datetime) -> datetime:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
 
-async def check_rate_limit(bot, user_id: int, cooldown_seconds: int = 60) -> bool:
+async def check_rate_limit(bot, guild_id: int, user_id: int, bucket: str = 'ticket') -> float:
     """
     Check if user is rate limited.
-    Returns True if user IS rate limited (should be blocked)
-    Returns False if user is NOT rate limited (can proceed)
+    Returns the seconds left if user IS rate limited (should be blocked)
+    Returns 0 if user is NOT rate limited (can proceed)
     """
     try:
-        current_time = time.time()
-        async with bot.db.cursor() as cur:
-            await cur.execute("SELECT last_ticket_time FROM rate_limits WHERE user_id = ?", (user_id,))
-            result = await cur.fetchone()
-
-            if result:
-                last_time = result[0]
-                if current_time - last_time < cooldown_seconds:
-                    return True  # User IS rate limited
-
-            return False  # User is NOT rate limited
+        return bot.rate_limiter.retry_after(bucket, guild_id, user_id)
     except Exception as e:
         logger.error(f"Error checking rate limit: {e}")
-        return False  # Allow on error
+        return 0  # Allow on error
 
-async def set_rate_limit(bot, user_id: int):
+async def set_rate_limit(bot, guild_id: int, user_id: int, bucket: str = 'ticket'):
     try:
-        current_time = time.time()
-        async with bot.db.cursor() as cur:
-            await cur.execute(
-                "INSERT OR REPLACE INTO rate_limits (user_id, last_ticket_time) VALUES (?, ?)",
-                (user_id, current_time)
-            )
-            await bot.db.commit()
+        bot.rate_limiter.record(bucket, guild_id, user_id)
     except Exception as e:
         logger.error(f"Error setting rate limit: {e}")
 
@@ -297,11 +282,16 @@ async def create_ticket_channel(bot, guild, creator, category, subject, descript
         async with bot.db.cursor() as cur:
             await cur.execute("""
                 INSERT INTO ticket_instances 
-                (guild_id, channel_id, creator_id, ticket_number, category, status, created_at)
+                (guild_id, channel_id, creator_id, ticket_number, category, status, created_at_ms)
                 VALUES (?, ?, ?, ?, ?, 'open', ?)
-            """, (guild.id, channel.id, creator.id, ticket_number, category, 'open', datetime.now()))
+            """, (guild.id, channel.id, creator.id, ticket_number, category, now_ms()))
+            await apply_ticket_counter_delta(cur, guild.id, opened=1)
             await bot.db.commit()
 
+        bot.stats_cache.ticket_opened(guild.id)
+        bot.ticket_activity.track(channel.id)
+        bot.sla.track(channel.id, guild.id, creator.id)
+
         embed = discord.Embed(
             title=f"<:Ticket_icons:1382703084815257610> Ticket #{ticket_number:04d}",
             description=f"**Category:** {category}\n**Subject:** {subject}\n**Description:** {description}",
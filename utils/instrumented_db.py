@@ -0,0 +1,210 @@
+import logging
+import re
+import time
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+import aiosqlite
+
+from utils.aiosqlite_adapter import contextmanager, run_in_connection_thread, sqlite_connection
+from utils.config import config
+from utils.log_pipeline import log_pipeline
+from utils.metrics import DB_QUERY_LATENCY, DB_WINDOW, statement_label
+
+logger = logging.getLogger('discord')
+slow_query_logger = logging.getLogger('ticketbot.slow_queries')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """Normalise a statement so calls that differ only in literals or IN-list length group together"""
+    normalised = _STRING_RE.sub('?', sql)
+    normalised = _NUMBER_RE.sub('?', normalised)
+    normalised = _WHITESPACE_RE.sub(' ', normalised).strip()
+    return _IN_LIST_RE.sub('(?+)', normalised)
+
+def parameter_shape(parameters, many: bool = False) -> str:
+    """Types of the bound parameters, never their values"""
+    if many:
+        rows = list(parameters)
+        first = parameter_shape(rows[0]) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if not parameters:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+class StatementStats:
+    __slots__ = ('calls', 'total_seconds', 'max_seconds', 'slow_calls')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.slow_calls = 0
+
+    @property
+    def average_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+class QueryStats:
+    """Per-fingerprint totals for every statement run through an instrumented connection"""
+
+    def __init__(self):
+        self.statements = {}
+        self.plans = {}
+
+    def record(self, database: str, sql: str, elapsed: float, slow: bool) -> StatementStats:
+        key = (database, fingerprint(sql))
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats()
+
+        stats.calls += 1
+        stats.total_seconds += elapsed
+        if elapsed > stats.max_seconds:
+            stats.max_seconds = elapsed
+        if slow:
+            stats.slow_calls += 1
+        return stats
+
+    def top(self, limit: int = 10, order_by: str = 'total'):
+        sort_keys = {
+            'total': lambda item: item[1].total_seconds,
+            'average': lambda item: item[1].average_seconds,
+            'max': lambda item: item[1].max_seconds,
+            'calls': lambda item: item[1].calls,
+        }
+        return sorted(self.statements.items(), key=sort_keys[order_by], reverse=True)[:limit]
+
+    def reset(self):
+        self.statements.clear()
+        self.plans.clear()
+
+query_stats = QueryStats()
+
+async def explain(conn: aiosqlite.Connection, database: str, sql: str, parameters):
+    """EXPLAIN QUERY PLAN output for a statement, computed once per fingerprint"""
+    key = (database, fingerprint(sql))
+    if key in query_stats.plans:
+        return query_stats.plans[key]
+
+    plan = None
+    if sql.lstrip()[:7].upper().startswith(_EXPLAINABLE):
+        try:
+            async with conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ()) as cur:
+                plan = "\n".join(f"{'  ' * (row[1] != 0)}{row[-1]}" for row in await cur.fetchall())
+        except Exception as e:
+            plan = f"unavailable: {e}"
+
+    query_stats.plans[key] = plan
+    return plan
+
+async def log_slow_query(conn, database: str, sql: str, parameters, elapsed: float, many: bool = False):
+    explain_parameters = parameters
+    if many:
+        explain_parameters = parameters[0] if parameters else ()
+
+    plan = await explain(conn, database, sql, explain_parameters)
+    slow_query_logger.warning(
+        f"{elapsed * 1000:.1f}ms [{database}] {fingerprint(sql)}\n"
+        f"  params: {parameter_shape(parameters, many)}\n"
+        f"  plan:\n    {(plan or 'n/a').replace(chr(10), chr(10) + '    ')}"
+    )
+
+class InstrumentedCursor(aiosqlite.Cursor):
+    """aiosqlite cursor that times every statement it runs"""
+
+    def __init__(self, conn, cursor, database: str):
+        super().__init__(conn, cursor)
+        self.database = database
+
+    def _observe(self, sql: str, elapsed: float) -> bool:
+        slow = elapsed * 1000 >= config.SLOW_QUERY_THRESHOLD_MS > 0
+        query_stats.record(self.database, sql, elapsed, slow)
+        DB_WINDOW.add(elapsed)
+        DB_QUERY_LATENCY.observe(elapsed, self.database, statement_label(sql))
+        return slow
+
+    async def execute(self, sql, parameters=None):
+        start = time.perf_counter()
+        try:
+            await super().execute(sql, parameters)
+        except Exception:
+            self._observe(sql, time.perf_counter() - start)
+            raise
+
+        elapsed = time.perf_counter() - start
+        if self._observe(sql, elapsed):
+            await log_slow_query(self._conn, self.database, sql, parameters, elapsed)
+        return self
+
+    async def executemany(self, sql, parameters):
+        if config.SLOW_QUERY_THRESHOLD_MS > 0 and not isinstance(parameters, (list, tuple)):
+            parameters = list(parameters)
+
+        start = time.perf_counter()
+        try:
+            await super().executemany(sql, parameters)
+        except Exception:
+            self._observe(sql, time.perf_counter() - start)
+            raise
+
+        elapsed = time.perf_counter() - start
+        if self._observe(sql, elapsed):
+            await log_slow_query(self._conn, self.database, sql, parameters, elapsed, many=True)
+        return self
+
+class InstrumentedConnection:
+    """Wraps an aiosqlite connection so cursors and commits are timed; everything else is passed through"""
+
+    def __init__(self, conn: aiosqlite.Connection, database: str):
+        self._conn = conn
+        self.database = database
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    @contextmanager
+    async def cursor(self):
+        cursor = await run_in_connection_thread(self._conn, lambda: sqlite_connection(self._conn).cursor())
+        return InstrumentedCursor(self._conn, cursor, self.database)
+
+    @contextmanager
+    async def execute(self, sql, parameters=None):
+        cursor = await self.cursor()
+        return await cursor.execute(sql, parameters)
+
+    async def commit(self):
+        start = time.perf_counter()
+        try:
+            await self._conn.commit()
+        finally:
+            elapsed = time.perf_counter() - start
+            query_stats.record(self.database, 'COMMIT', elapsed, elapsed * 1000 >= config.SLOW_QUERY_THRESHOLD_MS > 0)
+            DB_QUERY_LATENCY.observe(elapsed, self.database, 'COMMIT')
+
+    async def close(self):
+        await self._conn.close()
+
+def setup_slow_query_log():
+    if config.SLOW_QUERY_THRESHOLD_MS <= 0 or slow_query_logger.handlers:
+        return
+    handler = RotatingFileHandler(config.SLOW_QUERY_LOG, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+    slow_query_logger.addHandler(log_pipeline.handler(handler))
+    slow_query_logger.setLevel(logging.WARNING)
+    slow_query_logger.propagate = False
+
+def instrument_connection(conn: aiosqlite.Connection, database: str):
+    """Return the connection wrapped for timing, or unchanged when metrics and query stats are both off"""
+    if not config.METRICS_ENABLED and config.SLOW_QUERY_THRESHOLD_MS <= 0:
+        return conn
+    setup_slow_query_log()
+    return InstrumentedConnection(conn, database)
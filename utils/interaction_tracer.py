@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+
+import discord
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('discord')
+
+INTERACTION_DEADLINE = 3.0
+# Every InteractionResponse method that counts as the first response
+RESPONSE_METHODS = ('defer', 'send_message', 'edit_message', 'send_modal', 'pong', 'autocomplete', 'launch_activity')
+
+# Handlers that answer with a modal cannot be deferred first
+MODAL_HANDLERS = {
+    'ticket_category_select',
+    'ticket_button_*',
+    'panel_customization_btn',
+    'setup_panel_customization_btn',
+    'rating_select_new',
+}
+
+DYNAMIC_PREFIXES = ('ticket_button_',)
+GENERATED_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+FIRST_RESPONSE_LATENCY = metrics.histogram(
+    'ticketbot_interaction_first_response_seconds', 'Time from interaction creation to its first response',
+    ('handler',), buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 5.0)
+)
+DEADLINE_MISSES = metrics.counter(
+    'ticketbot_interaction_deadline_misses_total', 'Interactions not answered within 3 seconds', ('handler',)
+)
+AUTO_DEFERS = metrics.counter(
+    'ticketbot_interaction_auto_defers_total', 'Interactions deferred by the auto-defer guard', ('handler',)
+)
+
+def handler_name(interaction: discord.Interaction) -> str:
+    """Stable, low-cardinality name for whatever will handle the interaction"""
+    if interaction.type == discord.InteractionType.application_command:
+        command = interaction.command
+        if command is not None:
+            return f"/{command.qualified_name}"
+        return f"/{(interaction.data or {}).get('name', 'unknown')}"
+
+    custom_id = (interaction.data or {}).get('custom_id')
+    if not custom_id:
+        return interaction.type.name
+
+    for prefix in DYNAMIC_PREFIXES:
+        if custom_id.startswith(prefix):
+            return f"{prefix}*"
+    if GENERATED_ID_RE.match(custom_id):
+        return f"{interaction.type.name}:generated"
+    return custom_id
+
+class InteractionTracer:
+    """Records time-to-first-response per handler and optionally defers slow interactions before the deadline.
+
+    The first response is seen by the patched InteractionResponse methods; the deadline and the auto-defer
+    are call_at timers, so an interaction costs two timer handles rather than a polling task."""
+
+    def __init__(self, bot, auto_defer: bool = False, budget: float = 2.0, exclude=()):
+        self.bot = bot
+        self.auto_defer = auto_defer
+        self.budget = budget
+        self.exclude = MODAL_HANDLERS | set(exclude)
+        self.misses = Counter()
+        self.auto_deferred = Counter()
+
+    def install(self):
+        self.bot.add_listener(self.on_interaction, 'on_interaction')
+        patch_interaction_response()
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        if interaction.type not in (
+            discord.InteractionType.application_command,
+            discord.InteractionType.component,
+            discord.InteractionType.modal_submit,
+        ):
+            return
+        if interaction.response.is_done():
+            return
+
+        loop = asyncio.get_running_loop()
+        age = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        started_at = loop.time() - min(max(age, 0.0), INTERACTION_DEADLINE)
+        handler = handler_name(interaction)
+
+        timers = [loop.call_at(started_at + INTERACTION_DEADLINE, self._deadline_passed, interaction, handler)]
+        if self.auto_defer and handler not in self.exclude:
+            timers.append(loop.call_at(started_at + self.budget, self._budget_spent, interaction, handler))
+        interaction.extras['trace'] = (self, handler, started_at, timers)
+
+    def responded(self, interaction: discord.Interaction):
+        """Called by the patched response methods after the first response went through"""
+        _, handler, started_at, timers = interaction.extras.pop('trace')
+        for timer in timers:
+            timer.cancel()
+        FIRST_RESPONSE_LATENCY.observe(asyncio.get_running_loop().time() - started_at, handler)
+
+    def _deadline_passed(self, interaction: discord.Interaction, handler: str):
+        if interaction.response.is_done() or interaction.extras.pop('trace', None) is None:
+            return
+        self.misses[handler] += 1
+        DEADLINE_MISSES.inc(handler)
+        logger.warning(f"Interaction {handler} was not answered within {INTERACTION_DEADLINE:.0f}s")
+
+    def _budget_spent(self, interaction: discord.Interaction, handler: str):
+        if not interaction.response.is_done():
+            asyncio.create_task(self._defer(interaction, handler))
+
+    async def _defer(self, interaction: discord.Interaction, handler: str):
+        try:
+            interaction.extras['auto_deferred'] = True
+            if interaction.type == discord.InteractionType.application_command:
+                # The handler's reply fills in this message, so it must not be public when the reply was meant to be ephemeral
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            else:
+                await interaction.response.defer()
+            self.auto_deferred[handler] += 1
+            AUTO_DEFERS.inc(handler)
+            logger.info(f"Auto-deferred interaction {handler} after {self.budget}s")
+        except discord.InteractionResponded:
+            pass
+        except discord.HTTPException as e:
+            logger.warning(f"Auto-defer failed for {handler}: {e}")
+
+_patched = False
+
+def patch_interaction_response():
+    """Report first responses to the tracer and route responses of auto-deferred interactions to their followup equivalents"""
+    global _patched
+    if _patched:
+        return
+    _patched = True
+
+    response_cls = discord.InteractionResponse
+
+    def traced(original):
+        async def method(self, *args, **kwargs):
+            first = not self.is_done()
+            result = await original(self, *args, **kwargs)
+            trace = self._parent.extras.get('trace')
+            if first and trace is not None and self.is_done():
+                trace[0].responded(self._parent)
+            return result
+        method.__name__ = original.__name__
+        method.__doc__ = original.__doc__
+        return method
+
+    original_defer = response_cls.defer
+    original_send_message = response_cls.send_message
+    original_edit_message = response_cls.edit_message
+
+    async def defer(self, **kwargs):
+        if self._parent.extras.get('auto_deferred') and self.is_done():
+            return None
+        return await original_defer(self, **kwargs)
+
+    async def send_message(self, *args, **kwargs):
+        if self._parent.extras.get('auto_deferred') and self.is_done():
+            kwargs.pop('delete_after', None)
+            return await self._parent.followup.send(*args, **kwargs)
+        return await original_send_message(self, *args, **kwargs)
+
+    async def edit_message(self, **kwargs):
+        if self._parent.extras.get('auto_deferred') and self.is_done():
+            kwargs.pop('delete_after', None)
+            kwargs.pop('suppress_embeds', None)
+            return await self._parent.edit_original_response(**kwargs)
+        return await original_edit_message(self, **kwargs)
+
+    response_cls.defer = defer
+    response_cls.send_message = send_message
+    response_cls.edit_message = edit_message
+    for name in RESPONSE_METHODS:
+        if hasattr(response_cls, name):
+            setattr(response_cls, name, traced(getattr(response_cls, name)))
@@ -0,0 +1,77 @@
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from datetime import datetime, timezone
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class CallSiteSampler(logging.Filter):
+    """Lets every call site log `burst` INFO-or-lower records per window, then one in `rate`"""
+
+    def __init__(self, burst: int = 20, rate: int = 100, window: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.rate = rate
+        self.window = window
+        self.sites = {}
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        state = self.sites.get(site)
+        if state is None or now - state[0] >= self.window:
+            state = self.sites[site] = [now, 0]
+
+        state[1] += 1
+        count = state[1]
+        if count <= self.burst or (count - self.burst) % self.rate == 0:
+            return True
+
+        self.dropped += 1
+        return False
+
+class LogPipeline:
+    """Formats records on the caller and hands them to a background thread that does the I/O"""
+
+    def __init__(self):
+        self.listeners = []
+
+    def handler(self, *handlers, sampler: CallSiteSampler = None) -> logging.handlers.QueueHandler:
+        """A QueueHandler whose records are written to `handlers` by a dedicated listener thread"""
+        record_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(record_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        self.listeners.append(listener)
+
+        queue_handler = logging.handlers.QueueHandler(record_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        if sampler is not None:
+            queue_handler.addFilter(sampler)
+        return queue_handler
+
+    def stop(self):
+        """Flush everything still queued; safe to call more than once"""
+        while self.listeners:
+            self.listeners.pop().stop()
+
+log_pipeline = LogPipeline()
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from utils.metrics import metrics, RollingWindow
+
+logger = logging.getLogger('ticketbot.loop')
+
+LOOP_LAG = metrics.histogram(
+    'ticketbot_event_loop_lag_seconds', 'Delay between when the lag probe should wake and when it did',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+LOOP_STALLS = metrics.counter(
+    'ticketbot_event_loop_stalls_total', 'Times the event loop was blocked longer than the stall threshold'
+)
+
+class LoopLagMonitor:
+    """Samples event-loop lag and, in debug mode, captures the stack of whatever blocks the loop"""
+
+    def __init__(self, interval: float = 0.5, window: int = 1200, debug: bool = False, threshold_ms: float = 100.0):
+        self.interval = interval
+        self.lag = RollingWindow(window)
+        self.debug = debug
+        self.threshold = threshold_ms / 1000
+        self.stalls = 0
+        self.last_beat = time.monotonic()
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+        self._loop_thread_id = None
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._sample_loop())
+
+        if self.debug:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._stopped.set()
+
+    async def _sample_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.last_beat = time.monotonic()
+            self.lag.add(lag)
+            LOOP_LAG.observe(lag)
+
+    def percentiles(self):
+        """p50, p95 and p99 lag in seconds over the rolling window"""
+        return self.lag.percentiles(50, 95, 99)
+
+    def _watch(self):
+        """Runs in its own thread so it can see the loop while the loop cannot see itself"""
+        deadline = self.interval + self.threshold
+        reported_beat = None
+        while not self._stopped.wait(min(self.threshold / 2, 0.05)):
+            beat = self.last_beat
+            blocked_for = time.monotonic() - beat
+            if blocked_for < deadline or beat == reported_beat:
+                continue
+
+            reported_beat = beat
+            self.stalls += 1
+            LOOP_STALLS.inc()
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable\n"
+            logger.warning(
+                f"Event loop blocked for {(blocked_for - self.interval) * 1000:.0f}ms+, "
+                f"stack of the loop thread:\n{stack}"
+            )
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from utils.aiosqlite_adapter import run_in_connection_thread, sqlite_connection
+
+logger = logging.getLogger('discord')
+
+INCREMENTAL_VACUUM_PAGES = 256
+# Rows ANALYZE samples per index, so a first ANALYZE of a large file stays in the tens of milliseconds
+ANALYSIS_LIMIT = 1000
+
+class MaintenanceReport:
+    """What one maintenance run did to one database file"""
+
+    def __init__(self, database: str):
+        self.database = database
+        self.finished_at = None
+        self.steps = []
+        self.skipped = []
+        self.notes = []
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    @property
+    def locked_seconds(self) -> float:
+        # Every step runs on the bot's own connection, so other statements queue behind it for its whole duration
+        return sum(seconds for _, seconds in self.steps)
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def summary(self) -> str:
+        steps = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.steps) or "nothing to do"
+        text = f"{self.database}: {steps}; {self.reclaimed_bytes / 1e6:.2f} MB reclaimed, locked {self.locked_seconds:.2f}s"
+        if self.skipped:
+            text += f"; out of budget before {', '.join(self.skipped)}"
+        return text
+
+def files_size(path: str) -> int:
+    """The database plus its WAL, which is where checkpointing reclaims space"""
+    return sum(os.path.getsize(name) for name in (path, f"{path}-wal") if os.path.exists(name))
+
+async def run(conn, sql: str):
+    """Execute and drain a statement; single-column results come back as a plain value"""
+    async with conn.execute(sql) as cur:
+        rows = await cur.fetchall()
+    return rows[0][0] if rows and len(rows[0]) == 1 else rows
+
+async def pragma(conn, statement: str):
+    return await run(conn, f"PRAGMA {statement}")
+
+def database_connections(bot):
+    """(name, connection) of every database the bot keeps open; triggers.db belongs to the triggers cog"""
+    triggers = bot.get_cog('TriggerSystem')
+    return [
+        ('bot', bot.db),
+        ('triggers', getattr(triggers, 'triggers_db', None)),
+    ]
+
+async def database_path(conn) -> str:
+    return next(row[2] for row in await pragma(conn, "database_list") if row[1] == 'main')
+
+async def when_idle(conn, work):
+    """Run work(sqlite3 connection) on the connection's own thread; None when another coroutine has a transaction open.
+
+    VACUUM and a TRUNCATE checkpoint fail inside a transaction, and executescript() would commit someone else's
+    half-done one, so the check and the work share one thread hop."""
+    def run_if_idle():
+        raw = sqlite_connection(conn)
+        if raw.in_transaction:
+            return None
+        return work(raw)
+
+    return await run_in_connection_thread(conn, run_if_idle)
+
+async def maintain_database(conn, database: str, budget: float, vacuum_max_bytes: int) -> MaintenanceReport:
+    """Refresh planner statistics, return free pages to the filesystem and checkpoint the WAL within `budget` seconds"""
+    report = MaintenanceReport(database)
+    deadline = time.perf_counter() + budget
+    path = await database_path(conn)
+    report.bytes_before = files_size(path)
+
+    async def step(name, work):
+        if time.perf_counter() >= deadline:
+            report.skipped.append(name)
+            return
+        start = time.perf_counter()
+        try:
+            await work()
+        finally:
+            report.steps.append((name, time.perf_counter() - start))
+
+    async def analyze():
+        await pragma(conn, f"analysis_limit = {ANALYSIS_LIMIT}")
+        has_statistics = await run(conn, "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        # optimize only re-analyses tables whose statistics are stale, a first run needs a full ANALYZE
+        await run(conn, "PRAGMA optimize" if has_statistics else "ANALYZE")
+
+    async def vacuum():
+        free_pages = await pragma(conn, "freelist_count")
+        if not free_pages:
+            return
+
+        if await pragma(conn, "auto_vacuum") == 2:
+            # execute() steps incremental_vacuum once, freeing a single page; executescript() runs it to the end
+            script = f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});"
+            while free_pages and time.perf_counter() < deadline:
+                if await when_idle(conn, lambda raw: raw.executescript(script)) is None:
+                    report.notes.append("incremental vacuum stopped, another write was in progress")
+                    break
+                free_pages = await pragma(conn, "freelist_count")
+        elif report.bytes_before <= vacuum_max_bytes:
+            # Files created before incremental vacuum was enabled need one full VACUUM to switch over
+            if await when_idle(conn, lambda raw: raw.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")) is not None:
+                report.notes.append("switched to incremental vacuum")
+            else:
+                report.notes.append("VACUUM postponed, another write was in progress")
+        else:
+            report.notes.append(f"{free_pages} free pages, auto_vacuum is off and the file is too large to VACUUM here")
+
+    async def checkpoint():
+        if await pragma(conn, "journal_mode") != 'wal':
+            return
+        result = await when_idle(conn, lambda raw: raw.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+        if result is None:
+            report.notes.append("WAL checkpoint postponed, another write was in progress")
+        elif result[0]:
+            report.notes.append("WAL checkpoint was blocked by a reader")
+
+    await step('analyze', analyze)
+    await step('vacuum', vacuum)
+    await step('checkpoint', checkpoint)
+
+    report.bytes_after = files_size(path)
+    report.finished_at = datetime.now(timezone.utc)
+    return report
+
+def in_window(window, hour: int) -> bool:
+    """window is (start hour, end hour) in UTC and may wrap past midnight; None means any time"""
+    if window is None:
+        return True
+    start, end = window
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+def parse_window(value: str):
+    if not value:
+        return None
+    start, end = (int(hour) % 24 for hour in value.split('-'))
+    return start, end
+
+class DatabaseMaintenance:
+    """Runs maintain_database on bot.db and triggers.db once per interval, inside the configured quiet hours"""
+
+    def __init__(self, bot, interval: int = 86400, window: str = '3-6', budget: float = 5.0, vacuum_max_mb: float = 100):
+        self.bot = bot
+        self.interval = interval
+        self.window = parse_window(window)
+        self.budget = budget
+        self.vacuum_max_bytes = int(vacuum_max_mb * 1e6)
+        self.last_run = None
+        self.reports = {}
+        self._task = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def due(self, now: float) -> bool:
+        if self.last_run is not None and now - self.last_run < self.interval:
+            return False
+        return in_window(self.window, datetime.now(timezone.utc).hour)
+
+    async def _maintenance_loop(self):
+        while True:
+            await asyncio.sleep(min(self.interval, 900))
+            if self.due(time.time()):
+                await self.run()
+
+    async def run(self):
+        self.last_run = time.time()
+        for database, conn in database_connections(self.bot):
+            if conn is None:
+                continue
+            try:
+                report = await maintain_database(conn, database, self.budget, self.vacuum_max_bytes)
+                self.reports[database] = report
+                logger.info(f"Database maintenance {report.summary()}")
+                for note in report.notes:
+                    logger.info(f"Database maintenance {database}: {note}")
+            except Exception as e:
+                logger.error(f"Error maintaining {database} database: {e}")
+        return self.reports
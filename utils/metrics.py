@@ -0,0 +1,327 @@
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from functools import lru_cache
+
+import aiohttp
+
+logger = logging.getLogger('discord')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_labels(labelnames, values) -> str:
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=(), function=None):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self.values = {}
+
+    def collect(self) -> dict:
+        """Current values keyed by label tuple, read from the callback when one is set"""
+        if self.function is None:
+            return self.values
+        result = self.function()
+        return result if isinstance(result, dict) else {(): result}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.collect().items():
+            # "None" is not a valid sample value and would make the scraper reject the whole page
+            if value is None:
+                continue
+            lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        if not self.registry.enabled:
+            return
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        if not self.registry.enabled:
+            return
+        self.values[labels] = value
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        if not self.registry.enabled:
+            return
+
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+
+        counts = state[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = format_labels(self.labelnames + ('le',), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(self.labelnames + ('le',), labels + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class RollingWindow:
+    """The most recent samples of a measurement; appends are O(1), percentiles are computed on read"""
+
+    def __init__(self, size: int = 1024):
+        self.samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, value: float):
+        self.samples.append(value)
+
+    def percentiles(self, *quantiles):
+        """Nearest-rank percentiles (0-100) of the current window, or None for each when empty"""
+        if not self.samples:
+            return [None] * len(quantiles)
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(q / 100 * last)))] for q in quantiles]
+
+class MetricsRegistry:
+    """Holds every metric and serves them in the Prometheus text format"""
+
+    def __init__(self):
+        self.enabled = False
+        self.metrics = []
+        self._server = None
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=(), function=None) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames, function))
+
+    def gauge(self, name, documentation, labelnames=(), function=None) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                logger.error(f"Error collecting metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.warning(f"Error serving metrics request: {e}")
+        finally:
+            writer.close()
+
+    async def start_server(self, host: str, port: int):
+        self.enabled = True
+        self._server = await asyncio.start_server(self._handle, host, port)
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+
+    async def stop_server(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+metrics = MetricsRegistry()
+
+COMMAND_LATENCY = metrics.histogram(
+    'ticketbot_command_duration_seconds', 'Hybrid command latency', ('command', 'status')
+)
+DB_QUERY_LATENCY = metrics.histogram(
+    'ticketbot_db_query_duration_seconds', 'SQLite statement latency', ('database', 'statement')
+)
+REST_LATENCY = metrics.histogram(
+    'ticketbot_discord_rest_duration_seconds', 'Discord REST request latency', ('method', 'route')
+)
+REST_RATE_LIMITS = metrics.counter(
+    'ticketbot_discord_rest_429_total', 'Discord REST responses with status 429', ('method', 'route')
+)
+
+# Recent samples for on-demand percentiles in /ping and /diagnostics; kept even when metrics are off
+REST_WINDOW = RollingWindow(2048)
+DB_WINDOW = RollingWindow(2048)
+
+def quantile_samples(values, quantiles=('0.5', '0.95', '0.99')) -> dict:
+    """Gauge values keyed by quantile label, leaving out the quantiles an empty window has no value for"""
+    return {(quantile,): value for quantile, value in zip(quantiles, values) if value is not None}
+
+def format_ms(seconds) -> str:
+    if seconds is None:
+        return "N/A"
+    milliseconds = seconds * 1000
+    return f"{milliseconds:.1f}ms" if milliseconds < 10 else f"{milliseconds:.0f}ms"
+
+def format_percentiles(p50, p95, p99) -> str:
+    if p50 is None:
+        return "no data yet"
+    return f"p50 {format_ms(p50)} • p95 {format_ms(p95)} • p99 {format_ms(p99)}"
+
+async def measure_db_round_trip(bot):
+    """Time a trivial query on the main connection; None if it fails"""
+    try:
+        start = time.perf_counter()
+        async with bot.db.execute("SELECT 1") as cur:
+            await cur.fetchone()
+        return time.perf_counter() - start
+    except Exception as e:
+        logger.error(f"Database round trip failed: {e}")
+        return None
+
+_TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?)\s+([\w.]+)', re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def statement_label(sql: str) -> str:
+    """Low-cardinality label for a statement: its verb and the first table it touches"""
+    words = sql.split(None, 1)
+    if not words:
+        return 'EMPTY'
+    verb = words[0].upper()
+    match = _TABLE_RE.search(sql)
+    return f"{verb} {match.group(1)}" if match else verb
+
+_API_PREFIX_RE = re.compile(r'^/api/v\d+')
+_SNOWFLAKE_RE = re.compile(r'/\d{15,21}(?=/|$)')
+_TOKEN_RE = re.compile(r'/(webhooks|interactions)/\{id\}/[^/]+')
+_REACTION_RE = re.compile(r'/reactions/[^/]+')
+
+@lru_cache(maxsize=1024)
+def rest_route(path: str) -> str:
+    route = _API_PREFIX_RE.sub('', path)
+    route = _SNOWFLAKE_RE.sub('/{id}', route)
+    route = _TOKEN_RE.sub(r'/\1/{id}/{token}', route)
+    return _REACTION_RE.sub('/reactions/{emoji}', route)
+
+def create_http_trace() -> aiohttp.TraceConfig:
+    """aiohttp trace hooks that time every Discord REST request"""
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        route = rest_route(params.url.path)
+        elapsed = time.perf_counter() - context.start
+        REST_WINDOW.add(elapsed)
+        REST_LATENCY.observe(elapsed, params.method, route)
+        if params.response.status == 429:
+            REST_RATE_LIMITS.inc(params.method, route)
+
+    async def on_request_exception(session, context, params):
+        REST_LATENCY.observe(time.perf_counter() - context.start, params.method, rest_route(params.url.path))
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+def register_bot_gauges(bot):
+    """Gauges that are read from the bot's in-memory state at scrape time"""
+    metrics.gauge(
+        'ticketbot_open_tickets', 'Open tickets being tracked',
+        function=lambda: len(bot.ticket_activity.tickets)
+    )
+    metrics.gauge(
+        'ticketbot_pending_tasks', 'Pending asyncio tasks',
+        function=lambda: len(asyncio.all_tasks())
+    )
+    metrics.gauge(
+        'ticketbot_cache_entries', 'Entries held in in-memory caches', ('cache',),
+        function=lambda: {
+            ('guilds',): len(bot.guilds),
+            ('users',): len(bot.users),
+            ('member_counters',): len(bot.stats_cache.members),
+            ('ticket_counters',): len(bot.stats_cache.tickets),
+            ('rate_limit_keys',): len(bot.rate_limiter.hits),
+            ('pending_renames',): len(bot.rename_queue.pending),
+        }
+    )
+    metrics.gauge(
+        'ticketbot_event_loop_lag_quantile_seconds', 'Event loop lag over the recent sampling window', ('quantile',),
+        function=lambda: quantile_samples(bot.loop_monitor.percentiles())
+    )
+    metrics.counter(
+        'ticketbot_channel_renames_total', 'Channel renames handled by the rename queue', ('result',),
+        function=lambda: {
+            ('applied',): bot.rename_queue.applied,
+            ('dropped',): bot.rename_queue.dropped,
+            ('failed',): bot.rename_queue.failed,
+        }
+    )
+    metrics.gauge(
+        'ticketbot_database_breaker_state', 'Database circuit breaker state, 1 for the current one', ('database', 'state'),
+        function=lambda: {
+            (bot.db_supervisor.name, state): int(bot.db_supervisor.state == state) for state in ('closed', 'half_open', 'open')
+        }
+    )
+    metrics.counter(
+        'ticketbot_database_breaker_events_total', 'Database failures, breaker trips, fail-fast rejections and reconnects',
+        ('database', 'event'),
+        function=lambda: {
+            (bot.db_supervisor.name, 'failure'): bot.db_supervisor.failures,
+            (bot.db_supervisor.name, 'trip'): bot.db_supervisor.trips,
+            (bot.db_supervisor.name, 'rejected'): bot.db_supervisor.rejected,
+            (bot.db_supervisor.name, 'reconnect'): bot.db_supervisor.reconnects,
+        }
+    )
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger('discord')
+
+class RateLimitPolicy:
+    __slots__ = ('burst', 'window')
+
+    def __init__(self, burst: int = 1, window: float = 60.0):
+        self.burst = burst
+        self.window = window
+
+DEFAULT_POLICY = RateLimitPolicy()
+
+class SlidingWindowRateLimiter:
+    """In-memory sliding-window limiter keyed by (bucket, guild, user) with per-guild policies"""
+
+    def __init__(self, bot, snapshot_interval: int = 60):
+        self.bot = bot
+        self.snapshot_interval = snapshot_interval
+        self.hits = {}
+        self.policies = {}
+        self.dirty = False
+        self._task = None
+
+    async def load(self):
+        """Restore hits that are still inside their window from the last snapshot"""
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    "SELECT guild_id, rate_limit_burst, rate_limit_window FROM tickets"
+                )
+                for guild_id, burst, window in await cur.fetchall():
+                    self.policies[guild_id] = RateLimitPolicy(burst or DEFAULT_POLICY.burst, window or DEFAULT_POLICY.window)
+
+                await cur.execute(
+                    "SELECT bucket, guild_id, user_id, hit_at FROM rate_limit_hits ORDER BY hit_at"
+                )
+                rows = await cur.fetchall()
+
+            now = time.time()
+            for bucket, guild_id, user_id, hit_at in rows:
+                if now - hit_at < self.get_policy(guild_id).window:
+                    self.hits.setdefault((bucket, guild_id, user_id), deque()).append(hit_at)
+
+            logger.info(f"Restored {len(self.hits)} rate limit keys")
+        except Exception as e:
+            logger.error(f"Error loading rate limit snapshot: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.snapshot()
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            self.evict()
+            await self.snapshot()
+
+    def get_policy(self, guild_id: int) -> RateLimitPolicy:
+        return self.policies.get(guild_id, DEFAULT_POLICY)
+
+    def set_policy(self, guild_id: int, burst: int, window: float):
+        self.policies[guild_id] = RateLimitPolicy(burst, window)
+
+    def _prune(self, key, window: float, now: float):
+        hits = self.hits.get(key)
+        if hits is None:
+            return None
+
+        while hits and now - hits[0] >= window:
+            hits.popleft()
+
+        if not hits:
+            del self.hits[key]
+            return None
+        return hits
+
+    def retry_after(self, bucket: str, guild_id: int, user_id: int) -> float:
+        """Seconds until the key may act again; 0 if it is not limited"""
+        policy = self.get_policy(guild_id)
+        now = time.time()
+        hits = self._prune((bucket, guild_id, user_id), policy.window, now)
+        if hits is None or len(hits) < policy.burst:
+            return 0.0
+        return policy.window - (now - hits[-policy.burst])
+
+    def record(self, bucket: str, guild_id: int, user_id: int):
+        self.hits.setdefault((bucket, guild_id, user_id), deque()).append(time.time())
+        self.dirty = True
+
+    def evict(self):
+        """Drop keys whose hits have all left their window"""
+        now = time.time()
+        for key in list(self.hits):
+            self._prune(key, self.get_policy(key[1]).window, now)
+
+    async def snapshot(self):
+        if not self.dirty:
+            return
+
+        self.dirty = False
+        rows = [
+            (bucket, guild_id, user_id, hit_at)
+            for (bucket, guild_id, user_id), hits in self.hits.items()
+            for hit_at in hits
+        ]
+
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute("DELETE FROM rate_limit_hits")
+                await cur.executemany(
+                    "INSERT INTO rate_limit_hits (bucket, guild_id, user_id, hit_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                await self.bot.db.commit()
+        except Exception as e:
+            self.dirty = True
+            logger.error(f"Error saving rate limit snapshot: {e}")
@@ -1,7 +1,7 @@
 import discord
 import logging
-from datetime import datetime, timezone
 from utils.helpers import utc_to_gmt
+from utils.timestamps import days_ago_ms, now_ms
 
 logger = logging.getLogger('discord')
 
@@ -123,7 +123,7 @@ class FeedbackModal(discord.ui.Modal):
             async with self.bot.db.cursor() as cur:
                 await cur.execute("""
                     INSERT OR REPLACE INTO ticket_ratings 
-                    (guild_id, ticket_number, user_id, rating, feedback, staff_member, created_at)
+                    (guild_id, ticket_number, user_id, rating, feedback, staff_member, created_at_ms)
                     VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (
                     self.guild_id, 
@@ -132,7 +132,7 @@ class FeedbackModal(discord.ui.Modal):
                     self.rating, 
                     feedback_text, 
                     staff_name, 
-                    datetime.now(timezone.utc).isoformat()
+                    now_ms()
                 ))
                 await self.bot.db.commit()
             
@@ -244,8 +244,8 @@ class FeedbackModal(discord.ui.Modal):
             async with self.bot.db.cursor() as cur:
                 await cur.execute("""
                     SELECT AVG(rating), COUNT(*) FROM ticket_ratings 
-                    WHERE guild_id = ? AND created_at >= datetime('now', '-30 days')
-                """, (self.guild_id,))
+                    WHERE guild_id = ? AND created_at_ms >= ?
+                """, (self.guild_id, days_ago_ms(30)))
                 avg_rating, total_ratings = await cur.fetchone()
 
                 if avg_rating:
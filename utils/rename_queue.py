@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import discord
+
+logger = logging.getLogger('discord')
+
+class ChannelRenameQueue:
+    """Coalesces channel renames so only the latest name is sent, within Discord's per-channel rename limit"""
+
+    def __init__(self, bot, limit: int = 2, window: float = 600.0):
+        self.bot = bot
+        self.limit = limit
+        self.window = window
+        self.pending = {}
+        self.waiters = {}
+        self.history = {}
+        self.tasks = {}
+        self.applied = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def pending_name(self, channel) -> str:
+        """Name the channel will have once queued renames are applied"""
+        pending = self.pending.get(channel.id)
+        return pending[1] if pending else channel.name
+
+    def retry_after(self, channel_id: int) -> float:
+        history = self.history.get(channel_id)
+        if not history:
+            return 0.0
+
+        now = time.monotonic()
+        while history and now - history[0] >= self.window:
+            history.popleft()
+
+        if len(history) < self.limit:
+            return 0.0
+        return self.window - (now - history[0])
+
+    def request(self, channel, name: str, reason: str = None) -> float:
+        """Queue a rename and return how many seconds until it is expected to be applied"""
+        if channel.id in self.pending:
+            self.dropped += 1
+            self._resolve(channel.id, None)
+        elif name == channel.name:
+            return 0.0
+
+        self.pending[channel.id] = (channel, name, reason)
+
+        task = self.tasks.get(channel.id)
+        if task is None or task.done():
+            self.tasks[channel.id] = asyncio.create_task(self._worker(channel.id))
+
+        return self.retry_after(channel.id)
+
+    def outcome(self, channel) -> asyncio.Future:
+        """Resolves with the new name once the queued rename is applied, with None if a later rename replaced it,
+        or raises the HTTPException Discord rejected it with"""
+        future = asyncio.get_running_loop().create_future()
+        if channel.id in self.pending:
+            self.waiters.setdefault(channel.id, []).append(future)
+        else:
+            future.set_result(channel.name)
+        return future
+
+    @staticmethod
+    def _settle(futures, name: str = None, error: Exception = None):
+        for future in futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(name)
+
+    def _resolve(self, channel_id: int, name: str = None, error: Exception = None):
+        self._settle(self.waiters.pop(channel_id, ()), name, error)
+
+    def forget(self, channel_id: int):
+        """Drop queued renames for a channel that is being deleted"""
+        if self.pending.pop(channel_id, None):
+            self.dropped += 1
+        for future in self.waiters.pop(channel_id, ()):
+            future.cancel()
+        self.history.pop(channel_id, None)
+        task = self.tasks.pop(channel_id, None)
+        if task:
+            task.cancel()
+
+    async def _worker(self, channel_id: int):
+        try:
+            while channel_id in self.pending:
+                delay = self.retry_after(channel_id)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                channel, name, reason = self.pending.pop(channel_id)
+                # Requests made while the edit is in flight queue up behind it with their own waiters
+                waiters = self.waiters.pop(channel_id, ())
+                if name == channel.name:
+                    self._settle(waiters, name)
+                    continue
+
+                self.history.setdefault(channel_id, deque()).append(time.monotonic())
+                try:
+                    await channel.edit(name=name, reason=reason)
+                    self.applied += 1
+                    self._settle(waiters, name)
+                except discord.NotFound as e:
+                    self.pending.pop(channel_id, None)
+                    self._settle(waiters, error=e)
+                    self._resolve(channel_id, error=e)
+                    break
+                except discord.HTTPException as e:
+                    self.failed += 1
+                    logger.warning(f"Could not rename channel {channel_id}: {e}")
+                    self._settle(waiters, error=e)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self.tasks.get(channel_id) is asyncio.current_task():
+                del self.tasks[channel_id]
+
+    async def stop(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+        self.tasks.clear()
+        for futures in self.waiters.values():
+            for future in futures:
+                future.cancel()
+        self.waiters.clear()
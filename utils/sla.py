@@ -0,0 +1,186 @@
+import logging
+import time
+
+from utils.metrics import RollingWindow
+
+logger = logging.getLogger('discord')
+
+class AwaitingTicket:
+    __slots__ = ('guild_id', 'creator_id', 'created_at')
+
+    def __init__(self, guild_id, creator_id, created_at):
+        self.guild_id = guild_id
+        self.creator_id = creator_id
+        self.created_at = created_at
+
+class GuildSLA:
+    """Recent first-response and resolution times of one guild, bucketed per category and priority"""
+
+    def __init__(self, sample_size: int):
+        self.sample_size = sample_size
+        self.first_response = {}
+        self.resolution = {}
+
+    def add(self, buckets: dict, category, priority, seconds: float):
+        for key in (('all', None), ('category', category or "Unknown"), ('priority', priority or "Medium")):
+            window = buckets.get(key)
+            if window is None:
+                window = buckets[key] = RollingWindow(self.sample_size)
+            window.add(seconds)
+
+class SLATracker:
+    """Stamps the first staff reply of every open ticket and keeps per-guild SLA rollups in memory"""
+
+    def __init__(self, bot, sample_size: int = 1000):
+        self.bot = bot
+        self.sample_size = sample_size
+        self.awaiting = {}
+        self.support_roles = {}
+        self.guilds = {}
+        self.stamped = 0
+
+    async def load(self):
+        """Cache support roles and the open tickets nobody from staff has answered yet"""
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute("""
+                    SELECT guild_id, role_id FROM tickets WHERE role_id IS NOT NULL
+                    UNION
+                    SELECT guild_id, role_id FROM additional_support_roles
+                """)
+                roles = {}
+                for guild_id, role_id in await cur.fetchall():
+                    roles.setdefault(guild_id, set()).add(role_id)
+
+                await cur.execute("""
+                    SELECT channel_id, guild_id, creator_id, created_at_ms / 1000.0
+                    FROM ticket_instances
+                    WHERE status = 'open' AND first_staff_response_at IS NULL
+                """)
+                rows = await cur.fetchall()
+
+            self.support_roles = {guild_id: frozenset(role_ids) for guild_id, role_ids in roles.items()}
+            self.awaiting = {
+                channel_id: AwaitingTicket(guild_id, creator_id, created_at or time.time())
+                for channel_id, guild_id, creator_id, created_at in rows
+            }
+            logger.info(f"Tracking first responses for {len(self.awaiting)} open tickets")
+        except Exception as e:
+            logger.error(f"Error loading SLA state: {e}")
+
+    def track(self, channel_id: int, guild_id: int, creator_id: int):
+        self.awaiting[channel_id] = AwaitingTicket(guild_id, creator_id, time.time())
+
+    def forget(self, channel_id: int):
+        self.awaiting.pop(channel_id, None)
+
+    def forget_support_roles(self, guild_id: int):
+        """Support roles changed; they are read again on the next staff check in this guild"""
+        self.support_roles.pop(guild_id, None)
+
+    def forget_guild(self, guild_id: int):
+        self.support_roles.pop(guild_id, None)
+        self.guilds.pop(guild_id, None)
+
+    async def get_support_roles(self, guild_id: int) -> frozenset:
+        role_ids = self.support_roles.get(guild_id)
+        if role_ids is not None:
+            return role_ids
+
+        async with self.bot.db.cursor() as cur:
+            await cur.execute("""
+                SELECT role_id FROM tickets WHERE guild_id = ? AND role_id IS NOT NULL
+                UNION
+                SELECT role_id FROM additional_support_roles WHERE guild_id = ?
+            """, (guild_id, guild_id))
+            role_ids = frozenset(row[0] for row in await cur.fetchall())
+
+        self.support_roles[guild_id] = role_ids
+        return role_ids
+
+    async def is_staff(self, member) -> bool:
+        permissions = getattr(member, 'guild_permissions', None)
+        if permissions is None:
+            return False
+        if permissions.administrator:
+            return True
+
+        role_ids = await self.get_support_roles(member.guild.id)
+        return any(role.id in role_ids for role in member.roles)
+
+    async def record_message(self, message) -> bool:
+        """O(1) for every message except the first staff reply of a ticket, which is written once"""
+        ticket = self.awaiting.get(message.channel.id)
+        if ticket is None or message.author.bot or message.author.id == ticket.creator_id:
+            return False
+
+        try:
+            if not await self.is_staff(message.author):
+                return False
+
+            if self.awaiting.pop(message.channel.id, None) is None:
+                return False
+
+            responded_at = message.created_at.timestamp()
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    "UPDATE ticket_instances SET first_staff_response_at = ? WHERE channel_id = ? AND first_staff_response_at IS NULL",
+                    (int(responded_at * 1000), message.channel.id)
+                )
+                await cur.execute("SELECT category, priority FROM ticket_instances WHERE channel_id = ?", (message.channel.id,))
+                rows = await cur.fetchall()
+                await self.bot.db.commit()
+
+            self.stamped += 1
+            rollup = self.guilds.get(ticket.guild_id)
+            if rollup is not None and rows:
+                rollup.add(rollup.first_response, rows[0][0], rows[0][1], max(responded_at - ticket.created_at, 0.0))
+            return True
+        except Exception as e:
+            logger.error(f"Error recording first staff response in {message.channel.id}: {e}")
+            return False
+
+    def ticket_closed(self, guild_id: int, channel_id: int, category, priority, resolution_seconds=None):
+        self.awaiting.pop(channel_id, None)
+        rollup = self.guilds.get(guild_id)
+        if rollup is not None and resolution_seconds is not None and resolution_seconds >= 0:
+            rollup.add(rollup.resolution, category, priority, resolution_seconds)
+
+    async def get_guild(self, guild_id: int) -> GuildSLA:
+        """Rollups for the guild's most recent tickets, archived ones included, read from the database once and then kept up to date"""
+        rollup = self.guilds.get(guild_id)
+        if rollup is not None:
+            return rollup
+
+        async with self.bot.db.cursor() as cur:
+            await cur.execute("""
+                SELECT id, category, priority,
+                    (first_staff_response_at - created_at_ms) / 1000.0,
+                    CASE WHEN status = 'closed' THEN (closed_at_ms - created_at_ms) / 1000.0 END
+                FROM ticket_instances
+                WHERE guild_id = ?1
+                UNION ALL
+                SELECT id, category, priority,
+                    (first_staff_response_at - created_at_ms) / 1000.0,
+                    CASE WHEN status = 'closed' THEN (closed_at_ms - created_at_ms) / 1000.0 END
+                FROM ticket_archive
+                WHERE guild_id = ?1
+                ORDER BY id DESC
+                LIMIT ?2
+            """, (guild_id, self.sample_size))
+            rows = await cur.fetchall()
+
+        rollup = GuildSLA(self.sample_size)
+        for _, category, priority, first_response, resolution in reversed(rows):
+            if first_response is not None and first_response >= 0:
+                rollup.add(rollup.first_response, category, priority, first_response)
+            if resolution is not None and resolution >= 0:
+                rollup.add(rollup.resolution, category, priority, resolution)
+
+        self.guilds[guild_id] = rollup
+        return rollup
+
+    def awaiting_in(self, guild_id: int):
+        """(count, oldest created_at) of the guild's open tickets still waiting for a staff reply"""
+        waiting = [ticket.created_at for ticket in self.awaiting.values() if ticket.guild_id == guild_id]
+        return len(waiting), min(waiting, default=None)
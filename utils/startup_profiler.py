@@ -0,0 +1,106 @@
+import importlib._bootstrap
+import json
+import platform
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Only the standard library is imported here so the import timer can be installed before discord is loaded
+
+class StartupProfiler:
+    """Wall time per boot phase and, in profile mode, import time per module"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = []
+        self.imports = {}
+        self.time_to_ready = None
+        self.enabled = False
+        self._import_stack = []
+        self._original_find_and_load = None
+
+    def install(self):
+        """Time every module import from here on; costs a few microseconds per import"""
+        if self._original_find_and_load is not None:
+            return
+        self.enabled = True
+        self._original_find_and_load = importlib._bootstrap._find_and_load
+        importlib._bootstrap._find_and_load = self._timed_find_and_load
+
+    def uninstall(self):
+        if self._original_find_and_load is not None:
+            importlib._bootstrap._find_and_load = self._original_find_and_load
+            self._original_find_and_load = None
+
+    def _timed_find_and_load(self, name, import_):
+        # The import machinery looks _find_and_load up on every call, so patching it sees every first import
+        self._import_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_find_and_load(name, import_)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += elapsed
+            self.imports[name] = (elapsed - children, elapsed)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started_at, time.perf_counter() - start))
+
+    def mark(self, name: str):
+        """Record a phase that ran outside our code, from the end of the last phase until now"""
+        last_end = max((offset + duration for _, offset, duration in self.phases), default=0.0)
+        now = time.perf_counter() - self.started_at
+        self.phases.append((name, last_end, now - last_end))
+
+    def mark_ready(self) -> float:
+        if self.time_to_ready is None:
+            self.time_to_ready = time.perf_counter() - self.started_at
+            self.uninstall()
+        return self.time_to_ready
+
+    def slowest_imports(self, limit: int = 15):
+        """(module, self seconds, cumulative seconds), slowest self time first"""
+        return sorted(((name, own, total) for name, (own, total) in self.imports.items()), key=lambda item: item[1], reverse=True)[:limit]
+
+    def own_import_seconds(self, packages) -> float:
+        return sum(own for name, (own, _) in self.imports.items() if name.split('.')[0] in packages)
+
+    def report(self, budget: float) -> str:
+        lines = [f"Time to ready: {self.time_to_ready:.2f}s (budget {budget:.2f}s, "
+                 f"{'within budget' if self.time_to_ready <= budget else f'{self.time_to_ready - budget:.2f}s over'})"]
+        lines.append(f"  {'phase':<34}{'starts at':>11}{'took':>10}")
+        for name, offset, duration in self.phases:
+            lines.append(f"  {name:<34}{offset:>10.3f}s{duration:>9.3f}s")
+
+        if self.imports:
+            own_code = self.own_import_seconds(('cogs', 'views', 'utils'))
+            lines.append(f"  {len(self.imports)} modules imported in {sum(own for own, _ in self.imports.values()):.3f}s, "
+                         f"{own_code:.3f}s of it in cogs/, views/ and utils/")
+            lines.append(f"  {'slowest imports':<42}{'self':>9}{'cumulative':>12}")
+            for name, own, total in self.slowest_imports():
+                lines.append(f"  {name:<42}{own * 1000:>7.1f}ms{total * 1000:>10.1f}ms")
+        return "\n".join(lines)
+
+    def write_history(self, path: str, budget: float, **extra):
+        """Append this boot to a JSON-lines file so time to ready can be compared release over release"""
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'time_to_ready': round(self.time_to_ready, 4),
+            'budget': budget,
+            'python': platform.python_version(),
+            'phases': {name: round(duration, 4) for name, _, duration in self.phases},
+            'import_seconds': round(sum(own for own, _ in self.imports.values()), 4),
+            'slowest_imports': {name: round(own, 4) for name, own, _ in self.slowest_imports()},
+            **extra,
+        }
+        with open(path, 'a', encoding='utf-8') as history:
+            history.write(json.dumps(entry) + "\n")
+
+startup_profiler = StartupProfiler()
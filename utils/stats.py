@@ -0,0 +1,268 @@
+import asyncio
+import logging
+
+logger = logging.getLogger('discord')
+
+# Recounts one guild, archived tickets included, in a single statement so a concurrent ticket write can never be half applied
+SEED_TICKET_COUNTERS_SQL = """
+    INSERT OR REPLACE INTO guild_ticket_counters
+        (guild_id, open_count, closed_count, categories, resolution_seconds, resolved, reconciled_at)
+    SELECT
+        ?1,
+        COALESCE(SUM(status = 'open'), 0),
+        COALESCE(SUM(status = 'closed'), 0),
+        (SELECT COUNT(*) FROM ticket_categories WHERE guild_id = ?1),
+        COALESCE(SUM(CASE WHEN status = 'closed' AND closed_at_ms IS NOT NULL AND created_at_ms IS NOT NULL
+            THEN (closed_at_ms - created_at_ms) / 1000.0 END), 0),
+        COUNT(CASE WHEN status = 'closed' AND closed_at_ms IS NOT NULL AND created_at_ms IS NOT NULL
+            THEN 1 END),
+        CURRENT_TIMESTAMP
+    FROM (
+        SELECT status, created_at_ms, closed_at_ms FROM ticket_instances WHERE guild_id = ?1
+        UNION ALL
+        SELECT status, created_at_ms, closed_at_ms FROM ticket_archive WHERE guild_id = ?1
+    )
+"""
+
+class GuildMemberCounters:
+    __slots__ = ('total', 'bots')
+
+    def __init__(self, total=0, bots=0):
+        self.total = total
+        self.bots = bots
+
+    @property
+    def humans(self) -> int:
+        return self.total - self.bots
+
+class GuildTicketCounters:
+    __slots__ = ('open', 'closed', 'categories', 'resolution_seconds', 'resolved')
+
+    def __init__(self, open_count=0, closed=0, categories=0, resolution_seconds=0.0, resolved=0):
+        self.open = open_count
+        self.closed = closed
+        self.categories = categories
+        self.resolution_seconds = resolution_seconds
+        self.resolved = resolved
+
+    @property
+    def total(self) -> int:
+        return self.open + self.closed
+
+    @property
+    def average_resolution_seconds(self):
+        if not self.resolved:
+            return None
+        return self.resolution_seconds / self.resolved
+
+async def apply_ticket_counter_delta(cur, guild_id: int, opened=0, closed=0, categories=0, resolution_seconds=None):
+    """Adjust a guild's guild_ticket_counters row inside the caller's transaction; call it before the commit"""
+    resolved = 1 if resolution_seconds is not None and resolution_seconds >= 0 else 0
+    await cur.execute("""
+        UPDATE guild_ticket_counters
+        SET open_count = MAX(open_count + ?, 0),
+            closed_count = closed_count + ?,
+            categories = MAX(categories + ?, 0),
+            resolution_seconds = resolution_seconds + ?,
+            resolved = resolved + ?
+        WHERE guild_id = ?
+    """, (opened, closed, categories, resolution_seconds if resolved else 0, resolved, guild_id))
+
+    if cur.rowcount == 0:
+        # First write for this guild: count it from scratch, which already includes the caller's change
+        await cur.execute(SEED_TICKET_COUNTERS_SQL, (guild_id,))
+
+class StatsCache:
+    """Per-guild member and ticket counters kept up to date from gateway events"""
+
+    def __init__(self, bot, reconcile_interval: int = 3600):
+        self.bot = bot
+        self.reconcile_interval = reconcile_interval
+        self.members = {}
+        self.tickets = {}
+        self.hits = 0
+        self.misses = 0
+        self.repaired = 0
+        self._task = None
+
+    def seed_members(self, guild) -> GuildMemberCounters:
+        """Count the cached members of a guild once; later changes are applied incrementally"""
+        counters = GuildMemberCounters()
+        for member in guild.members:
+            counters.total += 1
+            if member.bot:
+                counters.bots += 1
+
+        self.members[guild.id] = counters
+        return counters
+
+    async def get_member_counters(self, guild) -> GuildMemberCounters:
+        counters = self.members.get(guild.id)
+        if counters is not None:
+            self.hits += 1
+            return counters
+
+        self.misses += 1
+        if not guild.chunked:
+            try:
+                await guild.chunk()
+            except Exception as e:
+                logger.warning(f"Failed to chunk guild {guild.id} before seeding member stats: {e}")
+
+        return self.seed_members(guild)
+
+    def member_joined(self, member):
+        counters = self.members.get(member.guild.id)
+        if counters is None:
+            return
+
+        counters.total += 1
+        if member.bot:
+            counters.bots += 1
+
+    def member_left(self, member):
+        counters = self.members.get(member.guild.id)
+        if counters is None:
+            return
+
+        counters.total = max(counters.total - 1, 0)
+        if member.bot:
+            counters.bots = max(counters.bots - 1, 0)
+
+    def forget_guild(self, guild_id: int):
+        self.members.pop(guild_id, None)
+        self.tickets.pop(guild_id, None)
+
+    async def get_ticket_counters(self, guild_id: int) -> GuildTicketCounters:
+        counters = self.tickets.get(guild_id)
+        if counters is not None:
+            self.hits += 1
+            return counters
+
+        self.misses += 1
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(
+                "SELECT open_count, closed_count, categories, resolution_seconds, resolved FROM guild_ticket_counters WHERE guild_id = ?",
+                (guild_id,)
+            )
+            row = await cur.fetchone()
+            if row is None:
+                await cur.execute(SEED_TICKET_COUNTERS_SQL, (guild_id,))
+                await self.bot.db.commit()
+                await cur.execute(
+                    "SELECT open_count, closed_count, categories, resolution_seconds, resolved FROM guild_ticket_counters WHERE guild_id = ?",
+                    (guild_id,)
+                )
+                row = await cur.fetchone()
+
+        counters = GuildTicketCounters(*row)
+        self.tickets[guild_id] = counters
+        return counters
+
+    def ticket_opened(self, guild_id: int):
+        counters = self.tickets.get(guild_id)
+        if counters is not None:
+            counters.open += 1
+
+    def ticket_closed(self, guild_id: int, resolution_seconds=None):
+        counters = self.tickets.get(guild_id)
+        if counters is None:
+            return
+
+        counters.open = max(counters.open - 1, 0)
+        counters.closed += 1
+        if resolution_seconds is not None and resolution_seconds >= 0:
+            counters.resolution_seconds += resolution_seconds
+            counters.resolved += 1
+
+    def categories_changed(self, guild_id: int, delta: int):
+        counters = self.tickets.get(guild_id)
+        if counters is not None:
+            counters.categories = max(counters.categories + delta, 0)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            await self.reconcile()
+
+    async def reconcile(self) -> int:
+        """Recount every guild, archive included, and repair guild_ticket_counters rows that drifted or were never written"""
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute("""
+                    SELECT guild_id, SUM(open_count), SUM(closed_count), SUM(categories), SUM(resolution_seconds), SUM(resolved)
+                    FROM (
+                        SELECT guild_id,
+                            status = 'open' AS open_count,
+                            status = 'closed' AS closed_count,
+                            0 AS categories,
+                            CASE WHEN status = 'closed' AND closed_at_ms IS NOT NULL AND created_at_ms IS NOT NULL
+                                THEN (closed_at_ms - created_at_ms) / 1000.0 ELSE 0 END AS resolution_seconds,
+                            status = 'closed' AND closed_at_ms IS NOT NULL AND created_at_ms IS NOT NULL AS resolved
+                        FROM (
+                            SELECT guild_id, status, created_at_ms, closed_at_ms FROM ticket_instances
+                            UNION ALL
+                            SELECT guild_id, status, created_at_ms, closed_at_ms FROM ticket_archive
+                        )
+                        UNION ALL
+                        SELECT guild_id, 0, 0, 1, 0, 0 FROM ticket_categories
+                    )
+                    GROUP BY guild_id
+                """)
+                actual = {row[0]: row[1:] for row in await cur.fetchall()}
+
+                await cur.execute(
+                    "SELECT guild_id, open_count, closed_count, categories, resolution_seconds, resolved FROM guild_ticket_counters"
+                )
+                stored = {row[0]: row[1:] for row in await cur.fetchall()}
+
+                repairs = [
+                    guild_id for guild_id in actual.keys() | stored.keys()
+                    if not counters_match(stored.get(guild_id), actual.get(guild_id, (0, 0, 0, 0.0, 0)))
+                ]
+                if repairs:
+                    await cur.executemany(SEED_TICKET_COUNTERS_SQL, [(guild_id,) for guild_id in repairs])
+                    await self.bot.db.commit()
+
+            for guild_id in repairs:
+                self.tickets.pop(guild_id, None)
+
+            self.repaired += len(repairs)
+            if repairs:
+                logger.info(f"Reconciled ticket counters: repaired {len(repairs)} of {len(actual)} guilds")
+            return len(repairs)
+        except Exception as e:
+            logger.error(f"Error reconciling ticket counters: {e}")
+            return 0
+
+def counters_match(stored, actual) -> bool:
+    if stored is None:
+        return False
+    # Resolution time is a float sum built up one close at a time, so allow for rounding
+    return tuple(stored[:3]) == tuple(actual[:3]) and stored[4] == actual[4] and abs(stored[3] - actual[3]) < 1
+
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "N/A"
+
+    seconds = int(seconds)
+    days, remainder = divmod(seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes = remainder // 60
+
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m"
+    return f"{seconds}s"
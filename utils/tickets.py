@@ -3,6 +3,10 @@ from typing import Optional, Tuple, Dict, Any
 import discord
 import re
 import asyncio
+from utils.stats import apply_ticket_counter_delta
+from utils.timestamps import from_ms, now_ms
+from utils.archive import NEXT_TICKET_NUMBER_SQL
+from utils.db_supervisor import DatabaseUnavailableError
 
 logger = logging.getLogger('discord')
 
@@ -60,7 +64,7 @@ async def get_ticket_info(bot, channel_id: int) -> Optional[Dict[str, Any]]:
         async with bot.db.cursor() as cur:
             await cur.execute("""
                 SELECT creator_id, ticket_number, category, subject, description, 
-                       priority, status, created_at, closed_at, claimed_by
+                       priority, status, created_at_ms, closed_at_ms, claimed_by, control_message_id
                 FROM ticket_instances 
                 WHERE channel_id = ?
             """, (channel_id,))
@@ -75,9 +79,10 @@ async def get_ticket_info(bot, channel_id: int) -> Optional[Dict[str, Any]]:
                     'description': result[4],
                     'priority': result[5],
                     'status': result[6],
-                    'created_at': result[7],
-                    'closed_at': result[8],
-                    'claimed_by': result[9]
+                    'created_at': from_ms(result[7]),
+                    'closed_at': from_ms(result[8]),
+                    'claimed_by': result[9],
+                    'control_message_id': result[10]
                 }
             return None
     except Exception as e:
@@ -86,15 +91,28 @@ async def get_ticket_info(bot, channel_id: int) -> Optional[Dict[str, Any]]:
 
 
 
-async def get_user_tickets(bot, guild_id: int, user_id: int) -> list:
+async def get_user_tickets(bot, guild_id: int, user_id: int, include_history: bool = False) -> list:
+    """A user's tickets, newest first; include_history adds the closed tickets moved to ticket_archive"""
     try:
         async with bot.db.cursor() as cur:
-            await cur.execute("""
-                SELECT channel_id, category, subject, priority, status, ticket_number, created_at
-                FROM ticket_instances 
-                WHERE guild_id = ? AND creator_id = ?
-                ORDER BY created_at DESC
-            """, (guild_id, user_id))
+            if include_history:
+                await cur.execute("""
+                    SELECT channel_id, category, subject, priority, status, ticket_number, created_at_ms
+                    FROM ticket_instances
+                    WHERE guild_id = ?1 AND creator_id = ?2
+                    UNION ALL
+                    SELECT channel_id, category, subject, priority, status, ticket_number, created_at_ms
+                    FROM ticket_archive
+                    WHERE guild_id = ?1 AND creator_id = ?2
+                    ORDER BY created_at_ms DESC
+                """, (guild_id, user_id))
+            else:
+                await cur.execute("""
+                    SELECT channel_id, category, subject, priority, status, ticket_number, created_at_ms
+                    FROM ticket_instances 
+                    WHERE guild_id = ? AND creator_id = ?
+                    ORDER BY created_at_ms DESC
+                """, (guild_id, user_id))
             results = await cur.fetchall()
 
             tickets = []
@@ -106,7 +124,7 @@ async def get_user_tickets(bot, guild_id: int, user_id: int) -> list:
                     'priority': row[3],
                     'status': row[4],
                     'ticket_number': row[5],
-                    'created_at': row[6]
+                    'created_at': from_ms(row[6])
                 })
             return tickets
     except Exception as e:
@@ -118,7 +136,7 @@ async def get_user_open_tickets(bot, guild_id: int, user_id: int) -> list:
         async with bot.db.cursor() as cur:
             await cur.execute("""
                 SELECT channel_id, category, subject, priority, status, 
-                       ticket_number, created_at
+                       ticket_number, created_at_ms
                 FROM ticket_instances 
                 WHERE guild_id = ? AND creator_id = ? AND status = 'open'
             """, (guild_id, user_id))
@@ -133,7 +151,7 @@ async def get_user_open_tickets(bot, guild_id: int, user_id: int) -> list:
                     'priority': row[3],
                     'status': row[4],
                     'ticket_number': row[5],
-                    'created_at': row[6]
+                    'created_at': from_ms(row[6])
                 })
             return tickets
     except Exception as e:
@@ -142,25 +160,13 @@ async def get_user_open_tickets(bot, guild_id: int, user_id: int) -> list:
 
 async def get_guild_ticket_stats(bot, guild_id: int) -> dict:
     try:
-        async with bot.db.cursor() as cur:
-            await cur.execute("SELECT COUNT(*) FROM ticket_instances WHERE guild_id = ?", (guild_id,))
-            total = (await cur.fetchone())[0]
-
-            await cur.execute("SELECT COUNT(*) FROM ticket_instances WHERE guild_id = ? AND status = 'open'", (guild_id,))
-            open_count = (await cur.fetchone())[0]
-
-            await cur.execute("SELECT COUNT(*) FROM ticket_instances WHERE guild_id = ? AND status = 'closed'", (guild_id,))
-            closed = (await cur.fetchone())[0]
-
-            await cur.execute("SELECT COUNT(*) FROM ticket_categories WHERE guild_id = ?", (guild_id,))
-            categories = (await cur.fetchone())[0]
-
-            return {
-                'total': total,
-                'open': open_count,
-                'closed': closed,
-                'categories': categories
-            }
+        counters = await bot.stats_cache.get_ticket_counters(guild_id)
+        return {
+            'total': counters.total,
+            'open': counters.open,
+            'closed': counters.closed,
+            'categories': counters.categories
+        }
     except Exception as e:
         logger.error(f"Error getting guild stats: {e}")
         return {'total': 0, 'open': 0, 'closed': 0, 'categories': 0}
@@ -182,18 +188,14 @@ async def get_ticket_log_channel(bot, guild_id: int):
 
 async def create_ticket_channel(bot, guild: discord.Guild, user: discord.Member, category_channel, category: str, subject: str, description: str, priority: str) -> Tuple[bool, str]:
     try:
-        if not await check_database_connection(bot):
-            return False, "Database connection failed. Please try again later."
-
-        from utils.database import get_ticket_role, get_ticket_category, get_ticket_log_channel, get_ping_role, ensure_database_connection
+        from utils.database import get_ticket_role, get_ticket_category, get_ticket_log_channel, get_ping_role, check_database_connection
 
-        if not await ensure_database_connection(bot):
+        if not check_database_connection(bot):
             return False, "Database connection failed. Please try again later."
-            
+
         async with bot.db.cursor() as cur:
-            await cur.execute("SELECT MAX(ticket_number) FROM ticket_instances WHERE guild_id = ?", (guild.id,))
-            result = await cur.fetchone()
-            ticket_number = (result[0] or 0) + 1
+            await cur.execute(NEXT_TICKET_NUMBER_SQL, (guild.id,))
+            ticket_number = (await cur.fetchone())[0]
 
         support_role_id = await get_ticket_role(bot, guild.id)
         category_id = await get_ticket_category(bot, guild.id)
@@ -251,42 +253,18 @@ async def create_ticket_channel(bot, guild: discord.Guild, user: discord.Member,
         async with bot.db.cursor() as cur:
             await cur.execute("""
                 INSERT INTO ticket_instances 
-                (guild_id, channel_id, creator_id, ticket_number, category, subject, description, priority, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'open')
-            """, (guild.id, channel.id, user.id, ticket_number, category, subject, description, priority))
+                (guild_id, channel_id, creator_id, ticket_number, category, subject, description, priority, status, created_at_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'open', ?)
+            """, (guild.id, channel.id, user.id, ticket_number, category, subject, description, priority, now_ms()))
+            await apply_ticket_counter_delta(cur, guild.id, opened=1)
             await bot.db.commit()
 
-        current_time = discord.utils.utcnow()
-        embed = discord.Embed(
-            title=f"<:Ticket_icons:1382703084815257610> Support Ticket",
-            description=f"**Welcome to your support ticket, {user.mention}!**\n\n"
-                       f"Our support team has been notified and will assist you shortly.\n"
-                       f"Please provide any additional details about your issue below.",
-            color=0x5865F2,
-            timestamp=current_time
-        )
+        bot.stats_cache.ticket_opened(guild.id)
+        bot.ticket_activity.track(channel.id)
+        bot.sla.track(channel.id, guild.id, user.id)
 
-        embed.add_field(
-            name="<:clipboard1:1383857546410070117> **Ticket Information**",
-            value=f"**Category:** {category}\n"
-                  f"**Subject:** {subject}\n"
-                  f"**Priority:** {get_priority_emoji(priority)} {priority}\n"
-                  f"**Created:** {discord.utils.format_dt(current_time, 'R')}",
-            inline=True
-        )
-
-        embed.add_field(
-            name="<:icon_write:1382704744782499882> **Issue Description**",
-            value=f"```{description[:200]}{'...' if len(description) > 200 else ''}```",
-            inline=False
-        )
-
-        embed.set_footer(
-            text="CodeX Support System • Ticket Management",
-            icon_url=bot.user.display_avatar.url
-        )
-
-        embed.set_image(url="https://i.ibb.co/8DjgL2Px/De-Watermark-ai-1750050237119.jpg")
+        current_time = discord.utils.utcnow()
+        embed = build_ticket_welcome_embed(bot, user.id, category, subject, description, priority, current_time)
 
         from views.ticket_views import TicketControlView
         ticket_data = {
@@ -301,7 +279,14 @@ async def create_ticket_channel(bot, guild: discord.Guild, user: discord.Member,
 
         view = TicketControlView(bot, ticket_data)
 
-        await channel.send(embed=embed, view=view)
+        control_message = await channel.send(embed=embed, view=view)
+
+        async with bot.db.cursor() as cur:
+            await cur.execute(
+                "UPDATE ticket_instances SET control_message_id = ? WHERE channel_id = ?",
+                (control_message.id, channel.id)
+            )
+            await bot.db.commit()
 
         if ping_role:
             await channel.send(f"{ping_role.mention} - New {priority.lower()} priority ticket!")
@@ -337,10 +322,7 @@ async def create_ticket_channel(bot, guild: discord.Guild, user: discord.Member,
             support_role_id, category_id = result
             support_role = guild.get_role(support_role_id) if support_role_id else None
 
-            await cur.execute("""
-                SELECT COALESCE(MAX(ticket_number), 0) + 1 
-                FROM ticket_instances WHERE guild_id = ?
-            """, (guild.id,))
+            await cur.execute(NEXT_TICKET_NUMBER_SQL, (guild.id,))
             ticket_number = (await cur.fetchone())[0]
 
             await cur.execute("SELECT emoji FROM ticket_categories WHERE guild_id = ? AND category_name = ?", (guild.id, category))
@@ -407,10 +389,14 @@ async def create_ticket_channel(bot, guild: discord.Guild, user: discord.Member,
 
             await cur.execute("""
                 INSERT INTO ticket_instances 
-                (guild_id, channel_id, creator_id, category, subject, description, priority, ticket_number, claimed_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (guild.id, channel.id, user.id, category, subject, description, priority, ticket_number, None))
+                (guild_id, channel_id, creator_id, category, subject, description, priority, ticket_number, claimed_by, created_at_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (guild.id, channel.id, user.id, category, subject, description, priority, ticket_number, None, now_ms()))
+            await apply_ticket_counter_delta(cur, guild.id, opened=1)
             await bot.db.commit()
+            bot.stats_cache.ticket_opened(guild.id)
+            bot.ticket_activity.track(channel.id)
+            bot.sla.track(channel.id, guild.id, user.id)
 
             if support_role:
                 try:
@@ -473,6 +459,8 @@ async def create_ticket_channel(bot, guild: discord.Guild, user: discord.Member,
 
             return True, channel.mention
 
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating ticket channel: {e}")
         return False, f"Failed to create ticket: {str(e)}"
@@ -500,15 +488,6 @@ async def get_ticket_limit(bot, guild_id: int) -> int:
         logger.error(f"Error getting ticket limit: {e}")
         return 3
 
-async def check_database_connection(bot):
-    try:
-        async with bot.db.cursor() as cur:
-            await cur.execute("SELECT 1")
-            return True
-    except Exception as e:
-        logger.error(f"Database connection check failed: {e}")
-        return False
-
 def get_priority_emoji(priority: str) -> str:
     priority_emojis = {
         "Low": "🟢",
@@ -518,6 +497,103 @@ def get_priority_emoji(priority: str) -> str:
     }
     return priority_emojis.get(priority, "🟡")
 
+def build_ticket_welcome_embed(bot, creator_id: int, category: str, subject: str, description: str, priority: str, created_at) -> discord.Embed:
+    """Build the welcome/control embed posted at the top of every ticket channel"""
+    description = description or ""
+    embed = discord.Embed(
+        title=f"<:Ticket_icons:1382703084815257610> Support Ticket",
+        description=f"**Welcome to your support ticket, <@{creator_id}>!**\n\n"
+                   f"Our support team has been notified and will assist you shortly.\n"
+                   f"Please provide any additional details about your issue below.",
+        color=0x5865F2,
+        timestamp=created_at
+    )
+
+    embed.add_field(
+        name="<:clipboard1:1383857546410070117> **Ticket Information**",
+        value=f"**Category:** {category}\n"
+              f"**Subject:** {subject}\n"
+              f"**Priority:** {get_priority_emoji(priority)} {priority}\n"
+              f"**Created:** {discord.utils.format_dt(created_at, 'R')}",
+        inline=True
+    )
+
+    embed.add_field(
+        name="<:icon_write:1382704744782499882> **Issue Description**",
+        value=f"```{description[:200]}{'...' if len(description) > 200 else ''}```",
+        inline=False
+    )
+
+    embed.set_footer(
+        text="CodeX Support System • Ticket Management",
+        icon_url=bot.user.display_avatar.url
+    )
+
+    embed.set_image(url="https://i.ibb.co/8DjgL2Px/De-Watermark-ai-1750050237119.jpg")
+    return embed
+
+async def update_ticket_control_message(bot, channel, view) -> bool:
+    """Re-render the stored control message from the database without scanning channel history"""
+    try:
+        ticket_info = await get_ticket_info(bot, channel.id)
+        if not ticket_info or not ticket_info['control_message_id']:
+            logger.warning(f"No control message recorded for ticket channel {channel.id}")
+            return False
+
+        from utils.helpers import utc_to_gmt
+        created_at = utc_to_gmt(ticket_info['created_at']) if ticket_info['created_at'] else discord.utils.utcnow()
+
+        embed = build_ticket_welcome_embed(
+            bot, ticket_info['creator_id'], ticket_info['category'], ticket_info['subject'],
+            ticket_info['description'], ticket_info['priority'], created_at
+        )
+
+        message = channel.get_partial_message(ticket_info['control_message_id'])
+        await message.edit(embed=embed, view=view)
+        return True
+    except discord.NotFound:
+        logger.warning(f"Control message for ticket channel {channel.id} no longer exists")
+        return False
+    except Exception as e:
+        logger.error(f"Error updating control message in channel {channel.id}: {e}")
+        return False
+
+async def backfill_control_message_ids(bot):
+    """Record the control message id of open tickets created before it was stored"""
+    try:
+        async with bot.db.cursor() as cur:
+            await cur.execute(
+                "SELECT channel_id FROM ticket_instances WHERE status = 'open' AND control_message_id IS NULL"
+            )
+            rows = await cur.fetchall()
+
+        backfilled = 0
+        for (channel_id,) in rows:
+            channel = bot.get_channel(channel_id)
+            if not channel:
+                continue
+
+            try:
+                async for message in channel.history(limit=5, oldest_first=True):
+                    if message.author == bot.user and message.embeds and message.components:
+                        async with bot.db.cursor() as cur:
+                            await cur.execute(
+                                "UPDATE ticket_instances SET control_message_id = ? WHERE channel_id = ?",
+                                (message.id, channel_id)
+                            )
+                            await bot.db.commit()
+                        backfilled += 1
+                        break
+            except (discord.Forbidden, discord.HTTPException) as e:
+                logger.warning(f"Could not backfill control message for channel {channel_id}: {e}")
+
+            await asyncio.sleep(0.5)
+
+        if backfilled:
+            logger.info(f"Backfilled control message ids for {backfilled} open tickets")
+    except Exception as e:
+        logger.error(f"Error backfilling control message ids: {e}")
+
 async def log_ticket_creation(bot, guild, channel, user, ticket_number, category, priority, subject, current_time):
     try:
         async with bot.db.cursor() as log_cur:
@@ -0,0 +1,36 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Every *_ms column holds integer milliseconds since the Unix epoch in UTC, so time windows are index range scans
+MS_PER_SECOND = 1000
+MS_PER_DAY = 86400 * MS_PER_SECOND
+
+def legacy_to_ms_sql(column: str) -> str:
+    """SQL expression converting the old text timestamps (CURRENT_TIMESTAMP, str(datetime), isoformat) to epoch ms"""
+    return f"CAST(ROUND((julianday({column}) - 2440587.5) * {MS_PER_DAY}) AS INTEGER)"
+
+def iso_sql(column: str) -> str:
+    """SQL expression rendering an epoch ms column as ISO 8601 UTC text, for exports"""
+    return f"strftime('%Y-%m-%dT%H:%M:%fZ', {column} / 1000.0, 'unixepoch')"
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+def to_ms(moment: datetime) -> int:
+    """Naive datetimes are taken to be UTC, like the text SQLite wrote with CURRENT_TIMESTAMP"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * MS_PER_SECOND)
+
+def from_ms(value: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value / MS_PER_SECOND, timezone.utc) if value is not None else None
+
+def days_ago_ms(days: float) -> int:
+    return now_ms() - int(days * MS_PER_DAY)
+
+def day_bounds_ms(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """[start, end) in epoch ms covering whole UTC days from since to until inclusive; open ends are unbounded"""
+    start = to_ms(since) if since else 0
+    end = to_ms(until + timedelta(days=1)) if until else 2 ** 63 - 1
+    return start, end
@@ -1,5 +1,6 @@
 import discord
 import logging
+import math
 from datetime import datetime, timezone
 from utils.helpers import sanitize_channel_name, utc_to_gmt
 
@@ -8,6 +9,7 @@ logger = logging.getLogger('discord')
 import discord
 import logging
 from utils.database import check_user_ticket_limit, is_user_blacklisted
+from utils.db_supervisor import DatabaseUnavailableError
 from utils.helpers import check_rate_limit, set_rate_limit
 
 logger = logging.getLogger('discord')
@@ -58,9 +60,10 @@ class TicketModal(discord.ui.Modal):
             from utils.helpers import check_rate_limit, set_rate_limit
 
             user_id = interaction.user.id
-            if await check_rate_limit(self.bot, user_id):
+            retry_after = await check_rate_limit(self.bot, self.guild_id, user_id)
+            if retry_after:
                 await interaction.followup.send(
-                    "<:icons_Wrong:1382701332955402341> You're creating tickets too quickly. Please wait 60 seconds before creating another ticket.",
+                    f"<:icons_Wrong:1382701332955402341> You're creating tickets too quickly. Please wait {math.ceil(retry_after)} seconds before creating another ticket.",
                     ephemeral=True
                 )
                 return
@@ -103,7 +106,7 @@ class TicketModal(discord.ui.Modal):
                 )
 
                 if success:
-                    await set_rate_limit(self.bot, user_id)
+                    await set_rate_limit(self.bot, self.guild_id, user_id)
                     await interaction.followup.send(
                         f"<:j_icons_Correct:1382701297987485706> {message}",
                         ephemeral=True
@@ -113,6 +116,8 @@ class TicketModal(discord.ui.Modal):
                         f"<:icons_Wrong:1382701332955402341> {message}",
                         ephemeral=True
                     )
+            except DatabaseUnavailableError:
+                raise
             except Exception as ticket_error:
                 logger.error(f"Error creating ticket: {ticket_error}")
                 await interaction.followup.send(
@@ -120,6 +125,10 @@ class TicketModal(discord.ui.Modal):
                     ephemeral=True
                 )
 
+        except DatabaseUnavailableError as e:
+            from utils.error_handler import GlobalErrorHandler
+            await GlobalErrorHandler(self.bot).handle_database_error(interaction, e)
+
         except Exception as e:
             logger.error(f"Error in ticket modal submission: {e}")
             try:
@@ -277,13 +286,16 @@ class TicketSetupModal(discord.ui.Modal):
                 await interaction.followup.send("<:icons_Wrong:1382701332955402341> Support role not found!", ephemeral=True)
                 return
 
+            # The replace rewrites the whole row, so carry over the rate limit /set-ratelimit configured
+            policy = self.bot.rate_limiter.get_policy(interaction.guild.id)
             async with self.bot.db.cursor() as cur:
                 await cur.execute("""
                     INSERT OR REPLACE INTO tickets 
-                    (guild_id, channel_id, role_id, log_channel_id)
-                    VALUES (?, ?, ?, ?)
-                """, (interaction.guild.id, channel_id, role_id, log_channel_id))
+                    (guild_id, channel_id, role_id, log_channel_id, rate_limit_burst, rate_limit_window)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (interaction.guild.id, channel_id, role_id, log_channel_id, policy.burst, policy.window))
                 await self.bot.db.commit()
+            self.bot.sla.forget_support_roles(interaction.guild.id)
 
             embed = discord.Embed(
                 title="<:j_icons_Correct:1382701297987485706> Setup Complete",
@@ -1,8 +1,10 @@
 import discord
 import logging
+import math
 from datetime import datetime, timezone
 from utils.helpers import check_rate_limit, set_rate_limit, utc_to_gmt
 from utils.database import get_user_open_tickets, get_ticket_categories
+from utils.db_supervisor import DatabaseUnavailableError
 from views.modals import TicketModal
 
 logger = logging.getLogger('discord')
@@ -79,9 +81,10 @@ class TicketCategorySelect(discord.ui.Select):
                 )
                 return
 
-            if await check_rate_limit(self.bot, interaction.user.id):
+            retry_after = await check_rate_limit(self.bot, interaction.guild.id, interaction.user.id)
+            if retry_after:
                 await interaction.response.send_message(
-                    "<:icons_Wrong:1382701332955402341> You're creating tickets too quickly. Please wait 60 seconds before creating another ticket.",
+                    f"<:icons_Wrong:1382701332955402341> You're creating tickets too quickly. Please wait {math.ceil(retry_after)} seconds before creating another ticket.",
                     ephemeral=True
                 )
                 return
@@ -116,6 +119,10 @@ class TicketCategorySelect(discord.ui.Select):
             await interaction.response.send_modal(modal)
             logger.info(f"Modal sent successfully for category {category}")
 
+        except DatabaseUnavailableError as e:
+            from utils.error_handler import GlobalErrorHandler
+            await GlobalErrorHandler(self.bot).handle_database_error(interaction, e)
+
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -188,9 +195,10 @@ class TicketCategoryButton(discord.ui.Button):
                 )
                 return
 
-            if await check_rate_limit(self.bot, interaction.user.id):
+            retry_after = await check_rate_limit(self.bot, interaction.guild.id, interaction.user.id)
+            if retry_after:
                 await interaction.response.send_message(
-                    "<:icons_Wrong:1382701332955402341> You're creating tickets too quickly. Please wait 60 seconds before creating another ticket.",
+                    f"<:icons_Wrong:1382701332955402341> You're creating tickets too quickly. Please wait {math.ceil(retry_after)} seconds before creating another ticket.",
                     ephemeral=True
                 )
                 return
@@ -225,6 +233,10 @@ class TicketCategoryButton(discord.ui.Button):
             await interaction.response.send_modal(modal)
             logger.info(f"Modal sent successfully for category {self.category}")
 
+        except DatabaseUnavailableError as e:
+            from utils.error_handler import GlobalErrorHandler
+            await GlobalErrorHandler(self.bot).handle_database_error(interaction, e)
+
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -9,6 +9,8 @@ from utils.helpers import (
     get_priority_emoji, send_error_embed, send_success_embed
 )
 from utils.database import get_user_open_tickets
+from utils.stats import apply_ticket_counter_delta
+from utils.timestamps import now_ms
 from views.modals import TicketModal
 from views.panel_views import TicketPanelView, TicketButtonView, TicketCategorySelect, TicketCategoryButton, TicketButtonPanelView
 
@@ -229,7 +231,7 @@ class TicketControlView(discord.ui.View):
                 ticket_info = await get_ticket_info(self.bot, interaction.channel.id)
 
 
-                created_time = discord.utils.parse_time(ticket_info['created_at']) if ticket_info and ticket_info.get('created_at') else discord.utils.utcnow()
+                created_time = ticket_info['created_at'] if ticket_info and ticket_info.get('created_at') else discord.utils.utcnow()
                 time_to_claim = discord.utils.utcnow() - created_time
                 claim_time_str = f"{time_to_claim.seconds//3600}h {(time_to_claim.seconds//60)%60}m"
 
@@ -328,63 +330,23 @@ class TicketControlView(discord.ui.View):
             
             priority_emoji = priority_emojis.get(priority, "🟡")
 
-            current_name = interaction.channel.name
+            current_name = self.bot.rename_queue.pending_name(interaction.channel)
             clean_name = re.sub(r'^[🟢🟡🟠🔴]\s*', '', current_name)
             new_name = f"{priority_emoji} {clean_name}"
-            
-            try:
-                await interaction.channel.edit(
-                    name=new_name,
-                    reason=f"Priority changed to {priority} by {interaction.user.display_name}"
-                )
-            except discord.HTTPException as e:
-                logger.warning(f"Could not rename channel: {e}")
+
+            self.bot.rename_queue.request(
+                interaction.channel,
+                new_name,
+                reason=f"Priority changed to {priority} by {interaction.user.display_name}"
+            )
 
             self.ticket_data['priority'] = priority
 
-            try:
-                async for message in interaction.channel.history(limit=50):
-                    if (message.author == self.bot.user and 
-                        message.embeds and 
-                        len(message.embeds) > 0 and
-                        ("Support Ticket" in message.embeds[0].title or "Ticket" in message.embeds[0].title) and
-                        message.components):
-                        
-                        embed = discord.Embed(
-                            title=message.embeds[0].title,
-                            description=message.embeds[0].description,
-                            color=message.embeds[0].color,
-                            timestamp=message.embeds[0].timestamp
-                        )
-                        
-                        for field in message.embeds[0].fields:
-                            if "Ticket Information" in field.name:
-                                field_lines = field.value.split('\n')
-                                updated_lines = []
-                                for line in field_lines:
-                                    if line.startswith('**Priority:**'):
-                                        updated_lines.append(f"**Priority:** {priority_emoji} {priority}")
-                                    else:
-                                        updated_lines.append(line)
-                                embed.add_field(name=field.name, value='\n'.join(updated_lines), inline=field.inline)
-                            else:
-                                embed.add_field(name=field.name, value=field.value, inline=field.inline)
-                        
-                        if message.embeds[0].image:
-                            embed.set_image(url=message.embeds[0].image.url)
-                        if message.embeds[0].footer:
-                            embed.set_footer(text=message.embeds[0].footer.text, icon_url=message.embeds[0].footer.icon_url)
-                        if message.embeds[0].thumbnail:
-                            embed.set_thumbnail(url=message.embeds[0].thumbnail.url)
-                        
-                        fresh_view = TicketControlView(self.bot, self.ticket_data, priority_used=True)
-                        
-                        await message.edit(embed=embed, view=fresh_view)
-                        logger.info(f"Successfully updated control panel embed with new priority: {priority}")
-                        break
-                        
-            except Exception as edit_error:
-                logger.warning(f"Could not update control menu embed: {edit_error}")
+            from utils.tickets import update_ticket_control_message
+            fresh_view = TicketControlView(self.bot, self.ticket_data, priority_used=True)
+            if await update_ticket_control_message(self.bot, interaction.channel, fresh_view):
+                logger.info(f"Successfully updated control panel embed with new priority: {priority}")
+            else:
                 try:
                     notification = await interaction.channel.send(
                         f"⚠️ **Priority updated to {priority_emoji} {priority}** (control panel refresh required)",
@@ -447,6 +409,14 @@ class PrioritySelectView(discord.ui.View):
 
             priority_emoji = get_priority_emoji(priority)
 
+            current_name = self.bot.rename_queue.pending_name(interaction.channel)
+            clean_name = re.sub(r'^[🟢🟡🟠🔴]\s*', '', current_name)
+            self.bot.rename_queue.request(
+                interaction.channel,
+                f"{priority_emoji} {clean_name}",
+                reason=f"Priority changed to {priority} by {interaction.user.display_name}"
+            )
+
             await interaction.response.send_message(
                 f"{priority_emoji} **Priority Updated**\nThis ticket has been set to **{priority}** priority.",
                 ephemeral=True
@@ -561,12 +531,15 @@ class SetupWizardView(discord.ui.View):
 
     async def finish_setup(self):
         try:
+            # The replace rewrites the whole row, so carry over the rate limit /set-ratelimit configured
+            policy = self.bot.rate_limiter.get_policy(self.guild_id)
             async with self.bot.db.cursor() as cur:
                 await cur.execute("""
                     INSERT OR REPLACE INTO tickets 
                     (guild_id, channel_id, role_id, category_id, log_channel_id, ping_role_id,
-                     embed_title, embed_description, embed_color, embed_footer, embed_image_url, panel_type, ticket_limit)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     embed_title, embed_description, embed_color, embed_footer, embed_image_url, panel_type, ticket_limit,
+                     rate_limit_burst, rate_limit_window)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     self.guild_id,
                     self.setup_data['channel_id'],
@@ -580,9 +553,12 @@ class SetupWizardView(discord.ui.View):
                     self.setup_data['embed_footer'],
                     self.setup_data['embed_image_url'],
                     self.setup_data['panel_type'],
-                    self.setup_data['ticket_limit']
+                    self.setup_data['ticket_limit'],
+                    policy.burst,
+                    policy.window
                 ))
                 await self.bot.db.commit()
+            self.bot.sla.forget_support_roles(self.guild_id)
 
             if self.guild_id in self.bot.active_setups:
                 del self.bot.active_setups[self.guild_id]
@@ -909,12 +885,15 @@ class TicketSetupView(discord.ui.View):
 
     async def finish_setup(self):
         try:
+            # The replace rewrites the whole row, so carry over the rate limit /set-ratelimit configured
+            policy = self.bot.rate_limiter.get_policy(self.ctx.guild.id)
             async with self.bot.db.cursor() as cur:
                 await cur.execute("""
                     INSERT OR REPLACE INTO tickets 
                     (guild_id, channel_id, role_id, log_channel_id,
-                     embed_title, embed_description, embed_color, embed_image_url, embed_footer, ticket_limit)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     embed_title, embed_description, embed_color, embed_image_url, embed_footer, ticket_limit,
+                     rate_limit_burst, rate_limit_window)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     self.ctx.guild.id,
                     self.setup_data['channel_id'],
@@ -925,9 +904,12 @@ class TicketSetupView(discord.ui.View):
                     self.setup_data['embed_color'],
                     self.setup_data['embed_image_url'],
                     self.setup_data['embed_footer'],
-                    self.setup_data['ticket_limit']
+                    self.setup_data['ticket_limit'],
+                    policy.burst,
+                    policy.window
                 ))
                 await self.bot.db.commit()
+            self.bot.sla.forget_support_roles(self.ctx.guild.id)
 
             if self.ctx.guild.id in self.bot.active_setups:
                 del self.bot.active_setups[self.ctx.guild.id]
@@ -1433,16 +1415,17 @@ class TicketChannelView(discord.ui.View):
                     inline=True
                 )
                 
-                message_count = 0
-                async for _ in interaction.channel.history(limit=None):
-                    message_count += 1
+                message_count = await self.bot.ticket_activity.get_message_count(interaction.channel)
+                activity = self.bot.ticket_activity.get(interaction.channel.id)
+                last_activity = discord.utils.format_dt(datetime.fromtimestamp(activity.last_message_at / 1000, timezone.utc), 'R') if activity and activity.last_message_at else "No messages yet"
                 
-                created_time = discord.utils.parse_time(ticket_info['created_at']) if ticket_info['created_at'] else discord.utils.utcnow()
+                created_time = ticket_info['created_at'] if ticket_info['created_at'] else discord.utils.utcnow()
                 duration = discord.utils.utcnow() - created_time
                 
                 embed.add_field(
                     name="📈 **Statistics**",
                     value=f"**💬 Messages:** {message_count}\n"
+                          f"**🕑 Last Activity:** {last_activity}\n"
                           f"**⏰ Duration:** {duration.days}d {duration.seconds//3600}h {(duration.seconds//60)%60}m\n"
                           f"**📅 Created:** {discord.utils.format_dt(created_time, 'F')}\n"
                           f"**🕒 Relative:** {discord.utils.format_dt(created_time, 'R')}",
@@ -1515,47 +1498,20 @@ class TicketChannelView(discord.ui.View):
 
                 self.ticket_data['priority'] = priority
 
-                current_name = interaction.channel.name
+                current_name = self.bot.rename_queue.pending_name(interaction.channel)
                 clean_name = re.sub(r'^[🟢🟡🟠🔴]\s*', '', current_name)
                 new_name = f"{priority_emoji} {clean_name}"
-                
-                try:
-                    await interaction.channel.edit(
-                        name=new_name,
-                        reason=f"Priority changed to {priority} by {interaction.user.display_name}"
-                    )
-                except discord.HTTPException as e:
-                    logger.warning(f"Could not rename channel: {e}")
 
-                try:
-                    async for message in interaction.channel.history(limit=50):
-                        if (message.author == self.bot.user and 
-                            message.embeds and 
-                            len(message.embeds) > 0 and
-                            "Support Ticket" in message.embeds[0].title and
-                            message.components):
-                            
-                            original_embed = message.embeds[0]
-                            
-                            for i, field in enumerate(original_embed.fields):
-                                if "Ticket Information" in field.name:
-                                    field_lines = field.value.split('\n')
-                                    updated_lines = []
-                                    for line in field_lines:
-                                        if line.startswith('**Priority:**'):
-                                            updated_lines.append(f"**Priority:** {priority_emoji} {priority}")
-                                        else:
-                                            updated_lines.append(line)
-                                    
-                                    original_embed.set_field_at(i, name=field.name, value='\n'.join(updated_lines), inline=field.inline)
-                                    break
-                            
-                            fresh_view = TicketChannelView(self.bot, self.ticket_data, priority_used=True)
-                            await message.edit(embed=original_embed, view=fresh_view)
-                            break
-                            
-                except Exception as edit_error:
-                    logger.warning(f"Could not update control panel embed: {edit_error}")
+                self.bot.rename_queue.request(
+                    interaction.channel,
+                    new_name,
+                    reason=f"Priority changed to {priority} by {interaction.user.display_name}"
+                )
+
+                from utils.tickets import update_ticket_control_message
+                fresh_view = TicketChannelView(self.bot, self.ticket_data, priority_used=True)
+                if not await update_ticket_control_message(self.bot, interaction.channel, fresh_view):
+                    logger.warning(f"Could not update control panel embed for channel {interaction.channel.id}")
 
                 embed = discord.Embed(
                     title=f"<:j_icons_Correct:1382701297987485706> Priority Updated",
@@ -1764,13 +1720,30 @@ class TicketCloseConfirmationView(discord.ui.View):
                         transcript_file.seek(0)
                         await log_channel.send(file=discord.File(transcript_file, filename=f"ticket-{ticket_number:04d}-transcript.txt"))
 
+            resolution = None
             async with self.bot.db.cursor() as cur:
                 await cur.execute(
-                    "UPDATE ticket_instances SET status = 'closed', closed_at = CURRENT_TIMESTAMP WHERE channel_id = ?",
-                    (channel.id,)
+                    "UPDATE ticket_instances SET status = 'closed', closed_at = CURRENT_TIMESTAMP, closed_at_ms = ? WHERE channel_id = ? AND status != 'closed'",
+                    (now_ms(), channel.id)
                 )
+                if cur.rowcount:
+                    await cur.execute(
+                        "SELECT (closed_at_ms - created_at_ms) / 1000.0, category, priority FROM ticket_instances WHERE channel_id = ?",
+                        (channel.id,)
+                    )
+                    # fetchall finishes the statement, a pending SELECT would make other coroutines' commits fail
+                    resolution = (await cur.fetchall())[0]
+                    await apply_ticket_counter_delta(cur, interaction.guild.id, opened=-1, closed=1, resolution_seconds=resolution[0])
                 await self.bot.db.commit()
 
+            if resolution is not None:
+                self.bot.stats_cache.ticket_closed(interaction.guild.id, resolution[0])
+                self.bot.sla.ticket_closed(interaction.guild.id, channel.id, resolution[1], resolution[2], resolution[0])
+            else:
+                self.bot.sla.forget(channel.id)
+            await self.bot.ticket_activity.forget(channel.id)
+            self.bot.rename_queue.forget(channel.id)
+
             await interaction.followup.send("<:j_icons_Correct:1382701297987485706> Ticket closed successfully.", ephemeral=True)
             await asyncio.sleep(1)
             await channel.delete(reason=f"Ticket #{ticket_number:04d} closed by {interaction.user}")